@@ -0,0 +1,75 @@
+"""Compare the SQLite connection profile with the SQLite defaults.
+
+Saves a test case with some performance points per transaction, just like
+:py:meth:`.Experiment.save` does for each test run, and prints how many test runs
+per second can be saved. The app keeps the connections to a SQLite database file
+in a pool, otherwise each transaction has to reopen the database and checkpoint
+the write-ahead log.
+
+Usage::
+
+    python benchmarks/sqlite_profile.py [runs]
+"""
+from __future__ import print_function
+from experimentum.Storage.SQLAlchemy.SQLitePlatform import set_pragmas
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool, QueuePool
+from timeit import time
+import shutil
+import sys
+import tempfile
+import os
+
+
+def benchmark(profile, pool=QueuePool, runs=1000, points=5):
+    """Save test runs in separate transactions.
+
+    Args:
+        profile (dict|bool): Pragmas of the profile or False to use the SQLite defaults.
+        pool (sqlalchemy.pool.Pool, optional): Defaults to QueuePool. Connection pool class.
+        runs (int, optional): Defaults to 1000. Number of test runs.
+        points (int, optional): Defaults to 5. Performance points per test run.
+
+    Returns:
+        float: test runs per second
+    """
+    folder = tempfile.mkdtemp()
+    engine = create_engine('sqlite:///' + os.path.join(folder, 'benchmark.db'), poolclass=pool)
+    if profile is not False:
+        set_pragmas(engine, profile)
+
+    try:
+        engine.execute('CREATE TABLE testcases (id INTEGER PRIMARY KEY, iteration INTEGER)')
+        engine.execute(
+            'CREATE TABLE performance '
+            '(id INTEGER PRIMARY KEY, label TEXT, time FLOAT, test_id INTEGER)'
+        )
+
+        start = time.time()
+        for iteration in range(runs):
+            with engine.begin() as conn:
+                test_id = conn.execute(
+                    'INSERT INTO testcases (iteration) VALUES (?)', iteration
+                ).lastrowid
+                conn.execute(
+                    'INSERT INTO performance (label, time, test_id) VALUES (?, ?, ?)',
+                    [('point', 0.1, test_id) for _ in range(points)]
+                )
+
+        return runs / (time.time() - start)
+    finally:
+        engine.dispose()
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    profiles = [
+        ('SQLite defaults without connection pool (previous)', False, NullPool),
+        ('SQLite defaults', False, QueuePool),
+        ('experimentum profile (WAL, synchronous=NORMAL)', {}, QueuePool),
+        ('experimentum profile with synchronous=OFF', {'synchronous': 'OFF'}, QueuePool),
+    ]
+
+    for name, profile, pool in profiles:
+        print('{:<55} {:>10.1f} runs/s'.format(name, benchmark(profile, pool, runs)))
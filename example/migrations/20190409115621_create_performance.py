@@ -17,6 +17,7 @@ class CreatePerformance(Migration):
             table.float('time')
             table.float('memory')
             table.float('peak_memory')
+            table.text('timeline').nullable()
             table.integer('test_id')
             table.foreign('test_id')\
                 .references('id').on('testcases')\
@@ -7,7 +7,7 @@ class PerformanceRepository(AbstractRepository.implementation):
     __table__ = 'performance'
     __relationships__ = {}
 
-    def __init__(self, label, level, type, time, memory, peak_memory):
+    def __init__(self, label, level, type, time, memory, peak_memory, timeline=None):
         """Set attributes."""
         self.label = label
         self.level = level
@@ -15,3 +15,4 @@ class PerformanceRepository(AbstractRepository.implementation):
         self.time = time
         self.memory = memory
         self.peak_memory = peak_memory
+        self.timeline = timeline
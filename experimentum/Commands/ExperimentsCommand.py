@@ -15,6 +15,13 @@ Options:
 --config=file       Use alternative config file *(relative to experiments folder)*.
 --progress          Toggle visibility of the progress bar.
 --n=number          Run the experiment *n* times.
+--workers=number    Spread the test runs across *number* worker processes.
+--buffer            Save the results in batches in a background thread.
+--memory=sampler    Memory sampler to use: uss *(default)*, rss, tracemalloc or off.
+--streaming         Keep only running statistics of the measuring points to save memory.
+--monitor=seconds   Sample the memory every *seconds* in a background thread to record
+                    the real peak memory and a memory timeline of each point.
+--sql               Time the SQL statements of the data store per repository method.
 --hide_performance  Hides the performance table.
 -h, --help          Show the help message.
 
@@ -40,9 +47,28 @@ from experimentum.Experiments import Experiment
     '--n': {
         'type': int, 'default': 100, 'help': 'Run the experiment *n* times.'
     },
+    '--workers': {
+        'type': int, 'default': 1, 'help': 'Spread the test runs across *n* worker processes.'
+    },
     '--config': {
         'type': str, 'help': 'Use alternative config file relative to experiments folder.'
     },
+    '--buffer': {
+        'action': 'store_true', 'help': 'Save the results in batches in a background thread.'
+    },
+    '--memory': {
+        'type': str, 'default': 'uss', 'choices': ['uss', 'rss', 'tracemalloc', 'off'],
+        'help': 'Memory sampler to measure the memory usage.'
+    },
+    '--monitor': {
+        'type': float, 'help': 'Sample the memory every *n* seconds to record the real peak memory.'
+    },
+    '--streaming': {
+        'action': 'store_true', 'help': 'Keep only running statistics of the measuring points.'
+    },
+    '--sql': {
+        'action': 'store_true', 'help': 'Time the SQL statements per repository method.'
+    },
     '--progress': {
         'action': 'store_true', 'help': 'Toggle visibility of the progress bar'
     },
@@ -68,6 +94,24 @@ def run(app, args):
     if args.hide_performance is True:
         experiment.hide_performance = True
 
+    if hasattr(args, 'buffer') and args.buffer is True:
+        experiment.buffered = True
+
+    if hasattr(args, 'workers') and args.workers > 1:
+        experiment.workers = args.workers
+
+    if hasattr(args, 'memory') and args.memory != 'uss':
+        experiment.performance.set_sampler(args.memory)
+
+    if hasattr(args, 'streaming') and args.streaming is True:
+        experiment.performance.streaming = True
+
+    if hasattr(args, 'monitor') and args.monitor is not None:
+        experiment.performance.set_monitor(args.monitor)
+
+    if hasattr(args, 'sql') and args.sql is True:
+        experiment.profile_queries = True
+
     experiment.start(args.n)
 
 
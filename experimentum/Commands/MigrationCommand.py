@@ -36,9 +36,26 @@ Running Migrations
 To run the latest outstanding :py:class:`.Migration`, just use the ``migration:up`` command.
 To revert the last :py:class:`.Migration` operation, just use the ``migration:down`` command.
 
+To run all outstanding migrations at once, use ``migration:up --all``, or
+``migration:up --to <revision>`` to run all migrations up to and including a revision. If the
+database supports transactional DDL (SQLite, PostgreSQL, SQL Server), the migrations run in
+one transaction, which is rolled back if one of them fails.
+
 To roll back all migrations and then execute all migrations, just use the ``migration:refresh``
 command. This command effectively re-creates your entire database.
 
+To replace all migrations with a single snapshot migration, use the ``migration:squash``
+command. It compiles the final schema of all migrations into one migration which creates
+the tables directly, so a fresh database is set up without replaying every alter. Running
+the snapshot records the revisions of all squashed migrations, and the squashed migration
+files are moved into the ``squashed`` folder of your migrations.
+
+Options:
+
+==========  ===================================================
+``--name``  Name of the snapshot (default: squashed_migrations)
+==========  ===================================================
+
 To see the status of the migrations, just use the ``migration:status`` command.
 This would output something like this::
 
@@ -80,15 +97,28 @@ def refresh(app):
 
 @command(
     'Upgrade the oldes migration which needs to be upgraded.',
+    arguments={
+        '--all': {
+            'action': 'store_true',
+            'help': 'Upgrade all outstanding migrations in one transaction.'
+        },
+        '--to': {
+            'type': str, 'help': 'Upgrade all migrations up to this revision in one transaction.'
+        }
+    },
     help='Upgrade oldest migration.'
 )
-def up(app):
+def up(app, args):
     """Upgrade the oldes migration which needs to be upgraded.
 
     Arguments:
         app (App): Main Service Container
+        args (dict): Additional args
     """
-    app.make('migrator').up()
+    if args.all or args.to:
+        app.make('migrator').upgrade(args.to)
+    else:
+        app.make('migrator').up()
 
 
 @command(
@@ -117,3 +147,18 @@ def make(app, args):
         args (dict): Additional args
     """
     app.make('migrator').make(args.name.lower())
+
+
+@command(
+    'Squash all migrations into a single snapshot migration.',
+    arguments={'--name': {'default': 'squashed_migrations', 'help': 'Name of the snapshot'}},
+    help='Squash all migrations.'
+)
+def squash(app, args):
+    """Squash all migrations into a single snapshot migration.
+
+    Arguments:
+        app (App): Main Service Container
+        args (dict): Additional args
+    """
+    app.make('migrator').squash(args.name.lower())
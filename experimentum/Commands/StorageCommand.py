@@ -0,0 +1,67 @@
+"""Storage CLI commands to inspect the data store.
+
+Analyzing the queries
+---------------------
+Use the ``storage:analyze`` command to find missing indexes. It explains the queries which
+look up rows by the columns of a foreign key or of a repository relationship, i.e. the
+queries which load related entries and cascade deletes, and checks whether an index
+starts with these columns. SQLite, MySQL and PostgreSQL show the query plan of each lookup,
+all other databases are only checked for the indexes.
+
+For every missing index the command prints the migration code which adds it::
+
+    with self.schema.table('testcases') as table:
+        table.index('experiment_id')
+
+Options:
+
+-h, --help  Show the help message.
+"""
+from tabulate import tabulate
+from termcolor import colored
+from experimentum.cli import print_failure
+from experimentum.Commands import command
+
+
+@command(
+    'Explain the foreign key and relationship queries and recommend missing indexes.',
+    help='Recommend missing indexes.'
+)
+def analyze(app):
+    """Explain the lookups of the foreign keys and relationships and recommend missing indexes.
+
+    Args:
+        app (App): App Service Container.
+    """
+    try:
+        lookups = app.make('store').analyze(app.repositories.all())
+    except NotImplementedError as exc:
+        print_failure(exc, 1)
+
+    headers = [
+        colored('Table', 'yellow'),
+        colored('Columns', 'yellow'),
+        colored('Query Plan', 'yellow'),
+        colored('Indexed?', 'yellow')
+    ]
+    data = [[
+        colored(lookup['table'], 'cyan'),
+        colored(', '.join(lookup['columns']), 'cyan'),
+        '\n'.join(lookup['plan']) or '-',
+        colored('No', 'red') if lookup['missing'] else colored('Yes', 'green')
+    ] for lookup in lookups]
+
+    print(tabulate(data, headers=headers, tablefmt='psql'))
+
+    missing = [lookup for lookup in lookups if lookup['missing']]
+    if len(missing) == 0:
+        print(colored('› No missing indexes found.', 'green'))
+        return
+
+    print(colored('› Add the missing indexes with a new migration:', 'yellow'))
+    for lookup in missing:
+        columns = [str(col) for col in lookup['columns']]
+        columns = columns[0] if len(columns) == 1 else columns
+        print("\n    with self.schema.table({!r}) as table:\n        table.index({!r})".format(
+            str(lookup['table']), columns
+        ))
@@ -2,7 +2,8 @@
 # flake8: noqa
 from .AbstractCommand import command, AbstractCommand
 from .CommandManager import CommandManager
-from .MigrationCommand import status, refresh, up, down, make
+from .MigrationCommand import status, refresh, up, down, make, squash
 from .ExperimentsCommand import run
 from .PlotCommand import generate
+from .StorageCommand import analyze
 from .WebGUICommand import start
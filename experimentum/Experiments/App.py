@@ -55,15 +55,17 @@ import logging.handlers
 from collections import OrderedDict
 from sqlalchemy import create_engine
 from sqlalchemy.engine.url import URL
+from sqlalchemy.pool import QueuePool
 from experimentum.cli import print_failure
 from experimentum.Config import Config, Loader
 from experimentum.Commands import CommandManager, MigrationCommand, ExperimentsCommand,\
-    PlotCommand, WebGUICommand
+    PlotCommand, StorageCommand, WebGUICommand
 from experimentum.Experiments import Experiment
 from experimentum.Storage.AbstractStore import AbstractStore
 from experimentum.Storage.AbstractRepository import RepositoryLoader
 from experimentum.Storage.Migrations import Migrator, Blueprint, Schema
 from experimentum.Storage.SQLAlchemy import Store, Repository
+from experimentum.Storage.SQLAlchemy.SQLitePlatform import set_pragmas
 from experimentum.Plots import Factory
 from experimentum.WebGUI import Server
 
@@ -173,13 +175,64 @@ class App(object):
         self.store = Store(self)
 
         db_args = {}
-        if datastore['drivername'] == 'sqlite':
+        sqlite = datastore['drivername'] == 'sqlite'
+        in_memory = sqlite and datastore.get('database') in (None, '', ':memory:')
+        if sqlite:
             db_args['connect_args'] = {'check_same_thread': False}
 
-        self.store.set_engine(
-            create_engine(URL(**datastore), **db_args)
+        # Keep SQLite connections open, otherwise each commit reopens the database file
+        if sqlite and not in_memory:
+            db_args['poolclass'] = QueuePool
+
+        # Connection pool, in-memory SQLite databases do not use a pool with a fixed size
+        pool = self.config.get('storage.pool', {})
+        options = {'recycle': 'pool_recycle', 'pre_ping': 'pool_pre_ping'}
+        if not in_memory:
+            options.update({
+                'size': 'pool_size', 'max_overflow': 'max_overflow', 'timeout': 'pool_timeout'
+            })
+
+        for key, arg in options.items():
+            if pool.get(key) is not None:
+                db_args[arg] = pool[key]
+
+        engine = create_engine(URL(**datastore), **db_args)
+
+        # Tune SQLite connections, unless the profile is disabled
+        profile = self.config.get('storage.sqlite', {})
+        if sqlite and profile is not False:
+            set_pragmas(engine, profile)
+
+        # In-memory databases are empty on each start, so there is nothing worth caching
+        cache, revision = None, ''
+        if not in_memory and self.config.get('storage.metadata_cache', True):
+            cache, revision = self._metadata_cache()
+
+        self.store.set_engine(engine, cache=cache, revision=revision)
+        self.store.set_session_policy(
+            self.config.get('storage.session.policy', 'expunge'),
+            self.config.get('storage.session.recycle_after', 100)
         )
 
+    def _metadata_cache(self):
+        """Get the path of the metadata cache and the current migration revision.
+
+        The cache is stored next to the ``.version`` file of the migrations, so a migration
+        which changes the revision also invalidates the cache.
+
+        Returns:
+            tuple: Path of the cache file and the revision(s) in the ``.version`` file.
+        """
+        path = _path_join(self.root, self.config.get('storage.migrations.path', 'migrations'))
+        version = os.path.join(path, '.version')
+        revision = ''
+
+        if os.path.isfile(version):
+            with open(version, 'r') as filehandler:
+                revision = filehandler.read()
+
+        return os.path.join(path, '.metadata'), revision
+
     def make(self, alias, *args, **kwargs):
         """Create an instance of an aliased class.
 
@@ -260,7 +313,9 @@ class App(object):
         commands['migration:up'] = MigrationCommand.up
         commands['migration:down'] = MigrationCommand.down
         commands['migration:make'] = MigrationCommand.make
+        commands['migration:squash'] = MigrationCommand.squash
         commands['plot:generate'] = PlotCommand.generate
+        commands['storage:analyze'] = StorageCommand.analyze
         commands['webgui'] = WebGUICommand.start
 
         return commands
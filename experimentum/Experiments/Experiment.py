@@ -78,16 +78,77 @@ from __future__ import print_function
 import os
 import glob
 import subprocess
+import multiprocessing
 import json
 from datetime import datetime
 from six import add_metaclass
 from abc import abstractmethod, ABCMeta
 from experimentum.Config import Config
 from experimentum.Experiments import Performance
+from experimentum.Experiments.ResultWriter import ResultWriter
 from experimentum.cli import print_progress, print_failure
 from experimentum.utils import get_basenames, load_class, find_files
 
 
+# Experiment instance of a worker process, see _init_worker
+_WORKER_EXPERIMENT = None
+
+
+def _init_worker(experiment):
+    """Set the experiment which is run by the worker process.
+
+    Args:
+        experiment (Experiment): Experiment to run.
+    """
+    global _WORKER_EXPERIMENT
+    _WORKER_EXPERIMENT = experiment
+
+
+def _get_fork_context():
+    """Get a multiprocessing context which forks the worker processes.
+
+    The workers must be forked, because the app and its data store can not be pickled.
+
+    Returns:
+        object: multiprocessing context or None if forking is not supported.
+    """
+    # Python 2 always forks on posix systems
+    if not hasattr(multiprocessing, 'get_context'):
+        return multiprocessing
+
+    try:
+        return multiprocessing.get_context('fork')
+    except ValueError:
+        return None
+
+
+def _run_iteration(iteration):
+    """Run a single test run of the experiment in a worker process.
+
+    Each test run gets its own :py:class:`.Performance` instance, so only the
+    measuring points of the test run are send back to the main process. Its memory
+    monitor is stopped after the test run, so no sampling threads are left behind.
+
+    Args:
+        iteration (int): Number of test run iteration.
+
+    Returns:
+        tuple: Result of the test run and dataframes of the measuring points.
+    """
+    experiment = _WORKER_EXPERIMENT
+    monitor = experiment.performance.monitor
+    experiment.performance = Performance(experiment.performance.sampler)
+    if monitor is not None:
+        experiment.performance.set_monitor(monitor.interval, monitor.timeline_size)
+
+    try:
+        result = experiment.execute()
+    finally:
+        experiment.performance.stop_monitor()
+
+    return result, experiment.performance.get_frames()
+
+
 class Script(object):
 
     """Call another script to run algorithms for your experiment.
@@ -159,6 +220,10 @@ class Experiment(object):
         config (Config): Hold the experiment configuration.
         show_progress (bool): Flag to show/hide the progress bar.
         hide_performance (bool): Flag to show/hide the performance table.
+        workers (int): Number of worker processes which run the test runs.
+        buffered (bool): Flag to save the results in batches in a background thread.
+        writer (ResultWriter): Background writer for the results if buffered.
+        profile_queries (bool): Flag to time the SQL statements of the data store.
         config_file (str): Config file to load.
         repos (dict): Experiment and Testcast Repo to save results.
     """
@@ -176,6 +241,11 @@ class Experiment(object):
         self.config = Config()
         self.show_progress = False
         self.hide_performance = False
+        self.workers = 1
+        self.buffered = False
+        self.writer = None
+        self.profile_queries = False
+        self._save_timeline = True
         self.repos = {'experiment': None, 'testcase': None}
         self._path = path
 
@@ -214,21 +284,51 @@ class Experiment(object):
 
         # Load experiment stats
         repo = app.repositories.get('ExperimentRepository')
-        rows = repo.all()
-        for exp in rows:
-            idx = exp.name.lower()
-
+        for idx, name, count, config_file in Experiment._count_runs(repo):
             # Exp file does not exist anymore
             if idx not in data:
-                data[idx] = {'count': 0, 'name': exp.name, 'missing': True}
+                data[idx] = {'count': 0, 'name': name, 'missing': True}
 
-            data[idx]['count'] += 1
+            data[idx]['count'] += count
 
-            if exp.config_file:
-                data[idx]['config_file'] = exp.config_file
+            if config_file:
+                data[idx]['config_file'] = config_file
 
         return data
 
+    @staticmethod
+    def _count_runs(repo):
+        """Count the runs of each experiment and get the config file of the latest run.
+
+        The runs are counted by the data store with a single ``GROUP BY`` query over the
+        name and config file, so the runs do not have to be loaded. The totals and the
+        config file of the latest run with a config file are derived from its groups.
+
+        Args:
+            repo (AbstractRepository): Experiment Repository.
+
+        Returns:
+            list: Lowercase name, name, number of runs and config file of each experiment
+        """
+        runs = {}
+        latest = {}
+        for name, config_file, count, last_id in repo.get(
+            select=['name', 'config_file', ['count', 'id'], ['max', 'id']],
+            group_by=['name', 'config_file']
+        ):
+            idx = name.lower()
+            prev_name, prev_count = runs.get(idx, (name, 0))
+            runs[idx] = (min(prev_name, name), prev_count + count)
+
+            # Config file of the latest run with a config file
+            if config_file and last_id > latest.get(idx, (0, None))[0]:
+                latest[idx] = (last_id, config_file)
+
+        return [
+            (idx, name, count, latest.get(idx, (0, None))[1])
+            for idx, (name, count) in sorted(runs.items())
+        ]
+
     @staticmethod
     def load(app, path, name):
         """Load and initialize an experiment class.
@@ -306,37 +406,145 @@ class Experiment(object):
         Args:
             steps (int, optional): Defaults to 10. How many tests runs should be executed.
         """
+        # Time the SQL statements, including the ones which create the experiment
+        if self.profile_queries:
+            self._start_query_profiler()
+
         # Booting
         with self.performance.point('Booting Experiment'):
             self.boot()
 
+        self._check_timeline()
+
+        # Save results in the background
+        if self.buffered:
+            self._start_writer()
+
         # Running tests
-        for iteration in self.performance.iterate(1, steps):
-            # Reset test state
-            result = None
-            self.reset()
-
-            # Run experiment
-            with self.performance.point('Runing Experiment'):
-                result = self.run()
-
-            # Save Results
-            if result:
-                self.save(result, iteration)
-            else:
-                msg = 'Experiment returned an empty result. Are you sure this is correct?'
-                self.app.log.warning(msg)
-                print('[WARNING]: ' + msg)
+        self._run_tests(steps)
 
-            if self.show_progress:
-                print_progress(iteration, steps, prefix='Progress:', suffix='Complete')
+        self.performance.stop_monitor()
+
+        # Save all remaining results before the experiment is finished
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except Exception as exc:
+                self._abort(exc)
 
         # Finished Experiment
         self.repos['experiment'].finished = datetime.now()
         self.repos['experiment'].update()
+        self.performance.stop_query_profiler()
         if self.hide_performance is False:
             self.performance.results()
 
+    def _start_query_profiler(self):
+        """Time the SQL statements of the data store, if it supports it."""
+        profiler = self.app.make('store').profile()
+        if profiler is None:
+            msg = 'The data store can not time its SQL statements.'
+            self.app.log.warning(msg)
+            print('[WARNING]: ' + msg)
+        else:
+            self.performance.set_query_profiler(profiler)
+
+    def _check_timeline(self):
+        """Check if the memory timeline of a monitor can be saved.
+
+        The timeline is only saved if the performance repository has a timeline attribute.
+        """
+        self._save_timeline = self.performance.monitor is None or self._has_timeline()
+        if not self._save_timeline:
+            msg = 'The memory timeline is not saved, add a timeline column and attribute ' \
+                'to the performance repository.'
+            self.app.log.warning(msg)
+            print('[WARNING]: ' + msg)
+
+    def _start_writer(self):
+        """Start the writer which saves the results in the background."""
+        self.writer = ResultWriter(
+            self.repos['testcase'],
+            batch_size=self.app.config.get('app.experiments.buffer.batch_size', 100),
+            flush_interval=self.app.config.get('app.experiments.buffer.flush_interval', 1.0),
+            max_queue=self.app.config.get('app.experiments.buffer.max_queue', 1000)
+        ).start()
+
+    def _run_tests(self, steps):
+        """Run the test runs, either serially or in a pool of worker processes.
+
+        Args:
+            steps (int): How many tests runs should be executed.
+        """
+        context = _get_fork_context() if self.workers > 1 else None
+        if self.workers > 1 and context is None:
+            msg = 'Worker processes are not supported on this platform, running serially.'
+            self.app.log.warning(msg)
+            print('[WARNING]: ' + msg)
+
+        if context is not None:
+            self._start_parallel(context, steps)
+        else:
+            for iteration in self.performance.iterate(1, steps):
+                self._finish_iteration(self.execute(), iteration, steps)
+
+    def execute(self):
+        """Reset the test state and run a single test of the experiment.
+
+        Returns:
+            dict: Result of experiment test run.
+        """
+        # Reset test state
+        result = None
+        self.reset()
+
+        # Run experiment
+        with self.performance.point('Runing Experiment'):
+            result = self.run()
+
+        return result
+
+    def _start_parallel(self, context, steps):
+        """Spread the test runs across a pool of worker processes.
+
+        The workers only run the tests, while the results and measuring points are
+        send back and saved in iteration order by the main process. Therefore the
+        results of the test runs must be picklable.
+
+        Args:
+            context (multiprocessing.context.BaseContext): Context to create the pool with.
+            steps (int): How many tests runs should be executed.
+        """
+        pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self,))
+        try:
+            results = pool.imap(_run_iteration, range(1, steps + 1))
+            for iteration in self.performance.iterate(1, steps):
+                result, frames = next(results)
+                self.performance.add_frames(frames)
+                self._finish_iteration(result, iteration, steps)
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _finish_iteration(self, result, iteration, steps):
+        """Save the result of a test run and show the progress.
+
+        Args:
+            result (dict): Result of experiment test run.
+            iteration (int): Number of test run iteration.
+            steps (int): How many tests runs are executed.
+        """
+        # Save Results
+        if result:
+            self.save(result, iteration)
+        else:
+            msg = 'Experiment returned an empty result. Are you sure this is correct?'
+            self.app.log.warning(msg)
+            print('[WARNING]: ' + msg)
+
+        if self.show_progress:
+            print_progress(iteration, steps, prefix='Progress:', suffix='Complete')
+
     def save(self, result, iteration):
         """Save the test results in the data store.
 
@@ -350,14 +558,43 @@ class Experiment(object):
             'performances': []
         }
         data.update(result)
-        data['performances'].extend(self.performance.export())
+        data['performances'].extend(self.performance.export(current_iteration=True))
+
+        if not self._save_timeline:
+            for performance in data['performances']:
+                performance.pop('timeline', None)
 
         try:
-            self.repos['testcase'].from_dict(data).create()
+            if self.writer is not None:
+                self.writer.put(data)
+            else:
+                self.repos['testcase'].from_dict(data).create().release()
         except Exception as exc:
-            for msg in str(exc).split('\n'):
-                print_failure(msg)
-            raise SystemExit(-1)
+            self._abort(exc)
+
+    def _has_timeline(self):
+        """Check if the performance repository has a timeline attribute.
+
+        Returns:
+            boolean: Whether the memory timeline of the points can be saved.
+        """
+        relation = getattr(self.repos['testcase'], '__relationships__', {}).get('performances')
+
+        return relation is None or hasattr(relation[0], 'timeline')
+
+    @staticmethod
+    def _abort(exc):
+        """Print the error which occurred while saving the results and exit.
+
+        Args:
+            exc (Exception): Error while saving.
+
+        Raises:
+            SystemExit: always
+        """
+        for msg in str(exc).split('\n'):
+            print_failure(msg)
+        raise SystemExit(-1)
 
     @abstractmethod
     def reset(self):
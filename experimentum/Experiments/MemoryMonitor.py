@@ -0,0 +1,106 @@
+"""Record the real peak memory of the open measuring points in a background thread.
+
+A :py:class:`.Point` only measures the memory usage when it starts and when it stops, so
+any transient spike in between is lost. The :py:class:`.MemoryMonitor` samples the memory
+usage in a fixed interval and updates the peak memory and the memory timeline of every
+point which is currently open.
+
+The timeline of a point is kept compact: if it gets longer than ``timeline_size``, two
+neighbouring samples are merged into the one with the higher memory usage, so the peak
+is never lost.
+
+The peak memory is saved in the ``peak_memory`` column of the performance table. The
+timeline is exported as a JSON string and saved in the nullable ``timeline`` text column,
+which the quickstart adds to the performance migration and repository. Older projects need
+a migration which adds the column and a ``timeline`` attribute of the performance
+repository, otherwise the experiment warns that the timeline is not saved::
+
+    with self.schema.table('performance') as table:
+        table.text('timeline').nullable()
+
+Example:
+
+.. code-block:: python
+
+    performance = Performance('rss')
+    performance.set_monitor(0.005)  # sample every 5 ms
+
+    with performance.point('Task') as point:
+        pass
+
+    print(point.peak_memory, point.timeline)
+"""
+import threading
+import time
+
+
+class MemoryMonitor(object):
+
+    """Sample the memory usage of the open measuring points in a background thread.
+
+    Attributes:
+        sampler (MemorySampler): Sampler to measure the memory consumption.
+        interval (float): Seconds between two samples.
+        timeline_size (int): Maximum number of samples in the timeline of a point.
+    """
+
+    def __init__(self, sampler, interval=0.01, timeline_size=100):
+        """Init monitor.
+
+        Args:
+            sampler (MemorySampler): Sampler to measure the memory consumption.
+            interval (float, optional): Defaults to 0.01. Seconds between two samples.
+            timeline_size (int, optional): Defaults to 100. Maximum number of samples in
+                the timeline of a point.
+        """
+        self.sampler = sampler
+        self.interval = interval
+        self.timeline_size = timeline_size
+        self._points = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def watch(self, point):
+        """Record the memory usage of a point until it is unwatched.
+
+        The sampling thread is started with the first watched point.
+
+        Args:
+            point (Point): Measuring point.
+        """
+        with self._lock:
+            self._points.append(point)
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='experimentum-memory-monitor')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def unwatch(self, point):
+        """Stop recording the memory usage of a point.
+
+        Args:
+            point (Point): Measuring point.
+        """
+        with self._lock:
+            if point in self._points:
+                self._points.remove(point)
+
+    def stop(self):
+        """Stop the sampling thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        """Sample the memory usage until the monitor is stopped."""
+        while not self._stop.wait(self.interval):
+            memory = self.sampler.sample()
+            now = time.time()
+
+            with self._lock:
+                for point in self._points:
+                    point.record(now, memory, self.timeline_size)
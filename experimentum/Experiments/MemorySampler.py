@@ -0,0 +1,228 @@
+"""Memory samplers which determine the memory usage of the current process.
+
+Determining the memory usage is not free. The default :py:class:`.USSSampler` parses
+``/proc/self/smaps`` which can take milliseconds and may take longer than the code you
+want to measure. Therefore you can choose between several samplers, depending on how
+precise and how cheap the measurement has to be:
+
+===============  ===================================================================
+Name             Description
+===============  ===================================================================
+``uss``          Unique Set Size via psutil. Most accurate, but the most expensive.
+``rss``          Resident Set Size read from ``/proc/self/statm``. Cheap.
+``tracemalloc``  Memory allocated by python objects via :py:mod:`tracemalloc`.
+``off``          Do not measure the memory usage at all.
+===============  ===================================================================
+
+Example:
+
+.. code-block:: python
+
+    performance = Performance('rss')
+    print(performance.sampler.overhead())  # average seconds per sample
+"""
+import time
+import psutil
+import os
+
+# psutil process handle of the current process, see get_process
+_PROCESS = None
+
+
+def get_process():
+    """Get a cached psutil process handle of the current process.
+
+    The handle is recreated after a fork, so that it always refers to the current process.
+
+    Returns:
+        psutil.Process: current process
+    """
+    global _PROCESS
+    if _PROCESS is None or _PROCESS.pid != os.getpid():
+        _PROCESS = psutil.Process(os.getpid())
+
+    return _PROCESS
+
+
+class MemorySampler(object):
+
+    """Base class of the memory samplers.
+
+    Attributes:
+        name (str): Name of the sampler.
+    """
+    name = None
+
+    def __init__(self):
+        """Init sampler."""
+        self._overhead = None
+
+    def sample(self):
+        """Return the memory usage of the current process.
+
+        Raises:
+            NotImplementedError: if method is not implemented by derived class.
+
+        Returns:
+            int: used bytes.
+        """
+        raise NotImplementedError('Must implement sample method!')
+
+    def overhead(self, repeat=100):
+        """Measure how long a single sample takes on average.
+
+        The overhead is only measured once and then cached.
+
+        Args:
+            repeat (int, optional): Defaults to 100. How many samples are taken.
+
+        Returns:
+            float: seconds per sample
+        """
+        if self._overhead is None:
+            start = time.time()
+            for _ in range(repeat):
+                self.sample()
+            self._overhead = (time.time() - start) / repeat
+
+        return self._overhead
+
+
+class USSSampler(MemorySampler):
+
+    """Unique Set Size of the process, i.e. the memory which would be freed if it terminated.
+
+    Note:
+        Thanks to Fabian Pedregosa for his overview of different ways to
+        determine the memory usage in python.
+        http://fa.bianp.net/blog/2013/different-ways-to-get-memory-consumption-or-lessons-learned-from-memory_profiler
+    """
+    name = 'uss'
+
+    def sample(self):
+        """Return the unique set size of the current process.
+
+        Returns:
+            int: used bytes.
+        """
+        return get_process().memory_full_info().uss
+
+
+class RSSSampler(MemorySampler):
+
+    """Resident Set Size of the process.
+
+    Reads ``/proc/self/statm`` directly if available, otherwise it falls back to psutil.
+    """
+    name = 'rss'
+    statm = '/proc/self/statm'
+
+    def __init__(self):
+        """Init sampler and determine the page size."""
+        super(RSSSampler, self).__init__()
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self._use_statm = os.path.isfile(self.statm)
+
+    def sample(self):
+        """Return the resident set size of the current process.
+
+        Returns:
+            int: used bytes.
+        """
+        if self._use_statm:
+            with open(self.statm, 'rb') as statm:
+                return int(statm.read().split()[1]) * self._page_size
+
+        return get_process().memory_info().rss
+
+
+class TracemallocSampler(MemorySampler):
+
+    """Size of the memory blocks currently allocated by python.
+
+    Starts tracing the memory allocations if :py:mod:`tracemalloc` is not tracing yet.
+    Memory allocated outside of the python allocator (e.g. by C extensions) is not included.
+    """
+    name = 'tracemalloc'
+
+    def __init__(self):
+        """Init sampler and start tracing.
+
+        Raises:
+            TypeError: if tracemalloc is not available.
+        """
+        super(TracemallocSampler, self).__init__()
+        try:
+            import tracemalloc
+        except ImportError:
+            raise TypeError('Memory sampler tracemalloc requires Python 3.4 or newer.')
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        self._tracemalloc = tracemalloc
+
+    def sample(self):
+        """Return the size of the traced memory blocks.
+
+        Returns:
+            int: used bytes.
+        """
+        return self._tracemalloc.get_traced_memory()[0]
+
+
+class NullSampler(MemorySampler):
+
+    """Does not measure the memory usage at all."""
+    name = 'off'
+
+    def sample(self):
+        """Return no memory usage.
+
+        Returns:
+            int: always 0
+        """
+        return 0
+
+
+SAMPLERS = {
+    sampler.name: sampler
+    for sampler in [USSSampler, RSSSampler, TracemallocSampler, NullSampler]
+}
+
+
+def get_sampler(name):
+    """Create a memory sampler by its name.
+
+    Args:
+        name (str): Name of the sampler, i.e. uss, rss, tracemalloc or off.
+
+    Raises:
+        TypeError: if the sampler does not exist.
+
+    Returns:
+        MemorySampler: memory sampler
+    """
+    if name not in SAMPLERS:
+        raise TypeError('Memory sampler {} does not exist.'.format(name))
+
+    return SAMPLERS[name]()
+
+
+def benchmark_samplers(repeat=100):
+    """Measure the overhead of all available memory samplers.
+
+    Args:
+        repeat (int, optional): Defaults to 100. How many samples are taken per sampler.
+
+    Returns:
+        dict: seconds per sample for each sampler name
+    """
+    result = {}
+    for name in sorted(SAMPLERS):
+        try:
+            result[name] = get_sampler(name).overhead(repeat)
+        except TypeError:
+            continue
+
+    return result
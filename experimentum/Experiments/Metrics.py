@@ -0,0 +1,128 @@
+"""Calculate the statistics of the measuring points with NumPy.
+
+The time and memory values of all iterations of a point group are stacked into a
+``(iterations, points)`` array, so every statistic is calculated for all points of the
+group in a single vectorized operation.
+
+The following metrics are calculated for time and memory, e.g. ``mean_time`` and
+``mean_memory``:
+
+===========  ==========================================================
+Name         Description
+===========  ==========================================================
+``mean``     Mean value.
+``median``   Median value.
+``std``      Population standard deviation.
+``min``      Smallest value.
+``max``      Largest value.
+``p50``      50th percentile.
+``p90``      90th percentile.
+``p99``      99th percentile.
+``mad``      Median absolute deviation.
+``ci_low``   Lower bound of the bootstrap confidence interval of the mean.
+``ci_high``  Upper bound of the bootstrap confidence interval of the mean.
+===========  ==========================================================
+
+Additionally ``count`` contains the number of iterations.
+"""
+import numpy as np
+
+#: Percentiles which are calculated for time and memory
+PERCENTILES = (50, 90, 99)
+
+# Maximum number of values which are resampled at once by the bootstrap
+_BOOTSTRAP_CHUNK = 1000000
+
+
+def bootstrap_ci(values, resamples=1000, confidence=0.95, seed=None):
+    """Calculate the bootstrap confidence interval of the mean for each column.
+
+    Args:
+        values (numpy.ndarray): Values with the shape ``(iterations, points)``.
+        resamples (int, optional): Defaults to 1000. Number of bootstrap resamples.
+        confidence (float, optional): Defaults to 0.95. Confidence level.
+        seed (int, optional): Defaults to None. Seed of the random number generator.
+
+    Returns:
+        tuple: Lower and upper bounds of each column
+    """
+    count = values.shape[0]
+    if count < 2 or resamples < 1:
+        mean = values.mean(axis=0)
+        return mean, mean
+
+    # Each resample holds count values of every column
+    random = np.random.RandomState(seed)
+    chunk = max(1, _BOOTSTRAP_CHUNK // (count * values[0].size))
+    means = []
+
+    for start in range(0, resamples, chunk):
+        size = min(chunk, resamples - start)
+        idx = random.randint(0, count, size=(size, count))
+        means.append(values[idx].mean(axis=1))
+
+    means = np.concatenate(means)
+    alpha = (1 - confidence) / 2.0
+
+    low = np.percentile(means, 100 * alpha, axis=0)
+    high = np.percentile(means, 100 * (1 - alpha), axis=0)
+
+    return low, high
+
+
+def describe(values, resamples=1000, confidence=0.95, seed=None):
+    """Calculate the metrics of each column.
+
+    Args:
+        values (numpy.ndarray): Values with the shape ``(iterations, points)``.
+        resamples (int, optional): Defaults to 1000. Number of bootstrap resamples.
+        confidence (float, optional): Defaults to 0.95. Confidence level.
+        seed (int, optional): Defaults to None. Seed of the random number generator.
+
+    Returns:
+        dict: Array of each metric with one value per column.
+    """
+    percentiles = np.percentile(values, PERCENTILES, axis=0)
+    median = np.median(values, axis=0)
+    ci_low, ci_high = bootstrap_ci(values, resamples, confidence, seed)
+
+    metrics = {
+        'mean': values.mean(axis=0),
+        'median': median,
+        'std': values.std(axis=0),
+        'min': values.min(axis=0),
+        'max': values.max(axis=0),
+        'mad': np.median(np.abs(values - median), axis=0),
+        'ci_low': ci_low,
+        'ci_high': ci_high
+    }
+
+    for percentile, value in zip(PERCENTILES, percentiles):
+        metrics['p{}'.format(percentile)] = value
+
+    return metrics
+
+
+def calc_metrics(row, resamples=1000, confidence=0.95, seed=None):
+    """Calculate metrics for time and memory of a group of points.
+
+    Args:
+        row (list): Dataframes of the same points of all iterations.
+        resamples (int, optional): Defaults to 1000. Number of bootstrap resamples.
+        confidence (float, optional): Defaults to 0.95. Confidence level.
+        seed (int, optional): Defaults to None. Seed of the random number generator.
+
+    Returns:
+        list: Metrics of time and memory for each point
+    """
+    metrics = [{'count': len(row)} for _ in row[-1]['Time']]
+
+    for column, suffix in [('Time', 'time'), ('Memory', 'memory')]:
+        values = np.array([frame[column] for frame in row], dtype=float)
+        result = describe(values, resamples, confidence, seed)
+
+        for name, value in result.items():
+            for idx, point in enumerate(metrics):
+                point['{}_{}'.format(name, suffix)] = float(value[idx])
+
+    return metrics
@@ -25,16 +25,27 @@ from __future__ import print_function
 from contextlib import contextmanager
 from timeit import time
 from termcolor import colored
+from experimentum.Experiments.MemorySampler import MemorySampler, USSSampler, get_sampler
+from experimentum.Experiments.MemoryMonitor import MemoryMonitor
+from experimentum.Experiments.Metrics import PERCENTILES, calc_metrics
 import collections
+import json
 import math
-import psutil
-import os
+import numpy as np
 import tabulate
 tabulate.PRESERVE_WHITESPACE = True
 
+# Sampler which is used by points without a specific memory sampler
+_DEFAULT_SAMPLER = USSSampler()
+
+# Metrics which can or can not be calculated from running statistics
+STREAMING_METRICS = ['mean', 'std', 'min', 'max']
+UNAVAILABLE_METRICS = ['median', 'mad', 'ci_low', 'ci_high'] + \
+    ['p{}'.format(percentile) for percentile in PERCENTILES]
+
 
 def memory_usage():
-    """Return the memory usage of the current process.
+    """Return the memory usage (unique set size) of the current process.
 
     Note:
         Thanks to Fabian Pedregosa for his overview of different ways to
@@ -44,16 +55,15 @@ def memory_usage():
     Returns:
         float: used bytes.
     """
-    process = psutil.Process(os.getpid())
-
-    # return process.get_memory_info()[0] / float(2 ** 20)
-    # return process.memory_info()[0]
-    return process.memory_full_info().uss
+    return _DEFAULT_SAMPLER.sample()
 
 
 def _to_df(point, level=0):
     """Transfrom point to dataframe dict layout.
 
+    The point tree is walked once in depth-first order, so each point is followed by
+    its messages and its subpoints.
+
     Args:
         point (dict): Point
         level (int, optional): Defaults to 0. Level
@@ -62,59 +72,67 @@ def _to_df(point, level=0):
         dict
     """
     data = {
-        'Label': [point['label']],
-        'Time': [point['difference_time']],
-        'Memory': [point['difference_memory']],
-        'Peak Memory': [point['peak_memory']],
-        'Level': [level],
-        'Type': ['point'],
-        'ID': [point['id']],
-        'Key': ['{}_{}_{}'.format(point['id'], level, point['label'])]
+        'Label': [], 'Time': [], 'Memory': [], 'Peak Memory': [], 'Level': [], 'Type': [],
+        'ID': [], 'Key': [], 'Timeline': []
     }
+    stack = [(point, level)]
 
-    for msg in point['messages']:
-        data['Label'].append(msg[1])
-        data['Time'].append(msg[0])
+    while stack:
+        point, level = stack.pop()
+        if not isinstance(point, dict):
+            point = point.to_dict()
+
+        data['Label'].append(point['label'])
+        data['Time'].append(point['difference_time'])
         data['Memory'].append(point['difference_memory'])
         data['Peak Memory'].append(point['peak_memory'])
         data['Level'].append(level)
-        data['Type'].append('message')
+        data['Type'].append('point')
         data['ID'].append(point['id'])
-        data['Key'].append('{}_{}_{}'.format(point['id'], level, msg[1]))
-
-    for subpoint in point['subpoints']:
-        _point = subpoint.to_dict()
-        result = _to_df(_point, level+1)
-        data['Label'].extend(result['Label'])
-        data['Time'].extend(result['Time'])
-        data['Memory'].extend(result['Memory'])
-        data['Peak Memory'].extend(result['Peak Memory'])
-        data['Level'].extend(result['Level'])
-        data['Type'].extend(result['Type'])
-        data['ID'].extend(result['ID'])
-        data['Key'].extend(result['Key'])
+        data['Key'].append('{}_{}_{}'.format(point['id'], level, point['label']))
+        data['Timeline'].append(json.dumps(point['timeline']) if point['timeline'] else None)
+
+        for msg in point['messages']:
+            data['Label'].append(msg[1])
+            data['Time'].append(msg[0])
+            data['Memory'].append(point['difference_memory'])
+            data['Peak Memory'].append(point['peak_memory'])
+            data['Level'].append(level)
+            data['Type'].append('message')
+            data['ID'].append(point['id'])
+            data['Key'].append('{}_{}_{}'.format(point['id'], level, msg[1]))
+            data['Timeline'].append(None)
+
+        # Push in reverse order, so that the first subpoint is exported first
+        stack.extend((subpoint, level + 1) for subpoint in reversed(point['subpoints']))
 
     return data
 
 
-def _calc_metrics(row):
-    """Calculate metrics for time and memory.
+def _stats_metrics(stats):
+    """Get the metrics for time and memory of running statistics.
+
+    Metrics which need all values, e.g. the median, can not be calculated and are None.
 
     Args:
-        row (list): List of points
+        stats (list): Running statistics of time and memory for each point
 
     Returns:
-        set: Mean Time, STD Time, Mean Memory, STD Memory
+        list: Metrics of time and memory for each point, see :py:mod:`.Metrics`
     """
-    times = list(zip(*[points['Time'] for points in row]))
-    mean_time = list(map(Performance.mean, times))
-    std_time = list(map(Performance.standard_deviation, times))
+    metrics = []
+    for times, memory in stats:
+        point = {'count': times.count}
+        for suffix, values in [('time', times), ('memory', memory)]:
+            for name in STREAMING_METRICS:
+                point['{}_{}'.format(name, suffix)] = getattr(values, name)
 
-    memory = list(zip(*[points['Memory'] for points in row]))
-    mean_memory = list(map(Performance.mean, memory))
-    std_memory = list(map(Performance.standard_deviation, memory))
+            for name in UNAVAILABLE_METRICS:
+                point['{}_{}'.format(name, suffix)] = None
 
-    return list(zip(mean_time, std_time, mean_memory, std_memory))
+        metrics.append(point)
+
+    return metrics
 
 
 def _transform_points(points, attrs):
@@ -227,6 +245,9 @@ class Formatter(object):
         headers = [
            colored('Label', 'cyan', attrs=['bold']),
            colored('Time', 'cyan', attrs=['bold']),
+           colored('Median Time', 'cyan', attrs=['bold']),
+           colored('p90 / p99 Time', 'cyan', attrs=['bold']),
+           colored('95% CI Time', 'cyan', attrs=['bold']),
            colored('Memory', 'cyan', attrs=['bold']),
            colored('Peak Memory', 'cyan', attrs=['bold'])
         ]
@@ -255,12 +276,113 @@ class Formatter(object):
             data.append([
                 colored(label['format'].format(row['label']), attrs=label['attrs']),
                 u'{} (± {})'.format(colored(time['val'], attrs=time['attrs']), time['std']),
+                self._format_metrics(u'{} (MAD {})', row, 'median_time', 'mad_time'),
+                self._format_metrics(u'{} / {}', row, 'p90_time', 'p99_time'),
+                self._format_metrics(u'{} – {}', row, 'ci_low_time', 'ci_high_time'),
                 memory['frmt'].format(colored(memory['val'], attrs=memory['attrs']), memory['std']),
                 colored(memory['peak'], attrs=memory['attrs'])
             ])
 
         return tabulate.tabulate(data, headers, tablefmt=tablefmt)
 
+    def _format_metrics(self, frmt, row, *keys):
+        """Format time metrics of a point which may not be available.
+
+        Args:
+            frmt (str): Format string with a placeholder for each metric.
+            row (dict): Point with metrics.
+            *keys (str): Names of the metrics.
+
+        Returns:
+            str: formatted metrics or -- if a metric is not available
+        """
+        values = [row.get(key) for key in keys]
+        if any(value is None for value in values):
+            return '--'
+
+        return frmt.format(*[self.time_to_human(value) for value in values])
+
+    def print_queries(self, queries, tablefmt='psql'):
+        """Print the timed SQL statements in human-readable format.
+
+        Args:
+            queries (dict): Exported statistics of a query profiler.
+            tablefmt (str, optional): Defaults to 'psql'. Table format for :mod:`tabulate`
+        """
+        print(self.get_query_table(queries, tablefmt))
+
+    def get_query_table(self, queries, tablefmt='psql'):
+        """Get the SQL statements per caller and the slowest statements as tables.
+
+        Args:
+            queries (dict): Exported statistics of a query profiler.
+            tablefmt (str, optional): Defaults to 'psql'. Table format for :mod:`tabulate`
+
+        Returns:
+            str: Query tables
+        """
+        headers = [
+           colored('Repository Method', 'cyan', attrs=['bold']),
+           colored('Statements', 'cyan', attrs=['bold']),
+           colored('Total Time', 'cyan', attrs=['bold']),
+           colored('Mean Time', 'cyan', attrs=['bold']),
+           colored('Max Time', 'cyan', attrs=['bold'])
+        ]
+        data = [[
+            colored(u'› {}'.format(row['caller']), attrs=['bold']),
+            row['count'],
+            colored(self.time_to_human(row['total_time']), attrs=['bold']),
+            self.time_to_human(row['mean_time']),
+            self.time_to_human(row['max_time'])
+        ] for row in queries['callers']]
+
+        # Summary of all statements
+        count = sum(row['count'] for row in queries['callers'])
+        total = sum(row['total_time'] for row in queries['callers'])
+        data.append([
+            colored('Total', attrs=['bold']), count,
+            colored(self.time_to_human(total), attrs=['bold']),
+            self.time_to_human(total / count) if count else '--', '--'
+        ])
+
+        headers_slowest = [
+           colored('Slowest Statement', 'cyan', attrs=['bold']),
+           colored('Repository Method', 'cyan', attrs=['bold']),
+           colored('Time', 'cyan', attrs=['bold'])
+        ]
+        slowest = [[
+            row['statement'] if len(row['statement']) <= 80 else row['statement'][:77] + '...',
+            row['caller'],
+            colored(self.time_to_human(row['time']), attrs=['bold'])
+        ] for row in queries['slowest']]
+
+        return '\n'.join([
+            tabulate.tabulate(data, headers, tablefmt=tablefmt),
+            tabulate.tabulate(slowest, headers_slowest, tablefmt=tablefmt)
+        ])
+
+    def print_sampler(self, sampler):
+        """Print the used memory sampler and its overhead per sample.
+
+        Args:
+            sampler (MemorySampler): Memory sampler.
+        """
+        print(self.get_sampler_info(sampler))
+
+    def get_sampler_info(self, sampler):
+        """Get the used memory sampler and its overhead per sample.
+
+        Args:
+            sampler (MemorySampler): Memory sampler.
+
+        Returns:
+            str: Memory sampler info
+        """
+        return u'Memory Sampler: {} ({} per sample)'.format(
+            colored(sampler.name, attrs=['bold']),
+            self.time_to_human(sampler.overhead())
+        )
+
     @staticmethod
     def format_number(value, decimals, unit):
         """Round a number and add a unit.
@@ -292,28 +414,56 @@ class Point(object):
         stop_time (float): Endpoint Timestamp.
         start_memory (int): Memory consumption on start.
         stop_memory (int): Memory consumption on end.
+        peak_memory (int): Highest memory consumption recorded by a :py:class:`.MemoryMonitor`.
+        timeline (list): Memory timeline recorded by a monitor as ``[seconds, bytes]`` pairs.
         messages (list): List of optional messages.
         subpoints (list): List of optional subpoints.
+        sampler (MemorySampler): Sampler to measure the memory consumption.
     """
 
-    def __init__(self, label, iter_id=None):
+    def __init__(self, label, iter_id=None, sampler=None):
         """Set the current time and memory consumption and default values for other attributes.
 
         Args:
             label (str): Label of the point.
             iter_id (int): Id to keep track of same points when iterating.
+            sampler (MemorySampler, optional): Defaults to None. Sampler to measure the
+                memory consumption, uses the unique set size if omitted.
         """
         self.label = label
         self.id = iter_id
+        self.sampler = sampler if sampler is not None else _DEFAULT_SAMPLER
         self.start_time = time.time()
         self.stop_time = 0
-        self.start_memory = memory_usage()
+        self.start_memory = self.sampler.sample()
         self.stop_memory = 0
+        self.peak_memory = self.start_memory
+        self.timeline = []
         self.messages = []
         self.subpoints = []
 
         self._last_msg = self.start_time
 
+    def record(self, timestamp, memory, limit=100):
+        """Record a memory sample taken while the point is open.
+
+        If the timeline gets longer than the limit, neighbouring samples are merged into the
+        one with the higher memory usage, so that the timeline stays compact and keeps its peaks.
+
+        Args:
+            timestamp (float): Time when the sample was taken.
+            memory (int): Memory consumption.
+            limit (int, optional): Defaults to 100. Maximum number of samples in the timeline.
+        """
+        self.peak_memory = max(self.peak_memory, memory)
+        self.timeline.append([round(timestamp - self.start_time, 6), memory])
+
+        if len(self.timeline) > limit:
+            self.timeline = [
+                max(self.timeline[idx:idx + 2], key=lambda sample: sample[1])
+                for idx in range(0, len(self.timeline), 2)
+            ]
+
     def message(self, msg):
         """Set a message associated with the point.
 
@@ -339,7 +489,8 @@ class Point(object):
             'start_memory': self.start_memory,
             'stop_memory': self.stop_memory,
             'difference_memory': self.stop_memory - float(self.start_memory),
-            'peak_memory': max(self.stop_memory, self.start_memory),
+            'peak_memory': max(self.peak_memory, self.stop_memory, self.start_memory),
+            'timeline': self.timeline,
             'messages': self.messages,
             'subpoints': self.subpoints
         }
@@ -353,6 +504,59 @@ class Point(object):
         return _to_df(self.to_dict())
 
 
+class RunningStats(object):
+
+    """Running mean, variance, min and max of a series of values.
+
+    Uses Welford's algorithm, so the values do not have to be kept in memory.
+
+    Attributes:
+        count (int): Number of values.
+        mean (float): Mean of the values.
+        min (float): Smallest value.
+        max (float): Largest value.
+    """
+
+    def __init__(self):
+        """Init empty statistics."""
+        self.count = 0
+        self.mean = 0.0
+        self.min = None
+        self.max = None
+        self._m2 = 0.0
+
+    def add(self, value):
+        """Add a value to the statistics.
+
+        Args:
+            value (float): New value.
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    @property
+    def variance(self):
+        """Population variance of the values.
+
+        Returns:
+            float: Variance
+        """
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        """Population standard deviation of the values.
+
+        Returns:
+            float: Standard Deviation
+        """
+        return math.sqrt(self.variance)
+
+
 class Performance(object):
 
     """Easily measure the performance of your python scripts.
@@ -361,13 +565,39 @@ class Performance(object):
         points (list): List of measuring points
         iteration (int): Number of current iteration
         formatter (Formatter): Formatter to output human readable results
+        sampler (MemorySampler): Sampler to measure the memory consumption of the points
+        monitor (MemoryMonitor): Optional monitor to record the real peak memory of the points
+        queries (QueryProfiler): Optional profiler which times the SQL statements of the
+            data store per repository method.
+        streaming (bool): Flag to fold finished points into running statistics and discard
+            them, so that the memory usage does not grow with the number of iterations.
     """
 
-    def __init__(self):
-        """Set measuring points list and default formatter."""
+    def __init__(self, memory='uss', streaming=False):
+        """Set measuring points list, default formatter and memory sampler.
+
+        Args:
+            memory (str|MemorySampler, optional): Defaults to 'uss'. Memory sampler or its name.
+            streaming (bool, optional): Defaults to False. Keep only running statistics
+                of the finished points.
+        """
         self.points = []
         self.iteration = 0
+        self.monitor = None
+        self.queries = None
+        self.streaming = streaming
         self.set_formatter(Formatter())
+        self.set_sampler(memory)
+
+        # Dataframes of finished points grouped by key and the ones of the current iteration
+        self._frames = collections.OrderedDict()
+        self._current = []
+
+        # Running statistics of time and memory for each point of a group (streaming mode)
+        self._stats = {}
+
+        # Points which are currently open, the innermost point is the last one
+        self._stack = []
 
     def set_formatter(self, formatter):
         """Set a formatter for human readable output.
@@ -377,6 +607,53 @@ class Performance(object):
         """
         self.formatter = formatter
 
+    def set_sampler(self, sampler):
+        """Set the sampler which measures the memory consumption.
+
+        Args:
+            sampler (str|MemorySampler): Memory sampler or its name, i.e. uss, rss,
+                tracemalloc or off.
+
+        Raises:
+            TypeError: if the sampler does not exist.
+        """
+        if not isinstance(sampler, MemorySampler):
+            sampler = get_sampler(sampler)
+
+        self.sampler = sampler
+        if self.monitor is not None:
+            self.monitor.sampler = sampler
+
+    def set_monitor(self, interval, timeline_size=100):
+        """Record the peak memory and a memory timeline of the points in a background thread.
+
+        Args:
+            interval (float): Seconds between two memory samples.
+            timeline_size (int, optional): Defaults to 100. Maximum number of samples
+                in the timeline of a point.
+        """
+        self.stop_monitor()
+        self.monitor = MemoryMonitor(self.sampler, interval, timeline_size)
+
+    def stop_monitor(self):
+        """Stop the background thread of the memory monitor, if there is one."""
+        if self.monitor is not None:
+            self.monitor.stop()
+
+    def set_query_profiler(self, profiler):
+        """Set the profiler which times the SQL statements of the data store.
+
+        Args:
+            profiler (QueryProfiler): Started profiler, e.g. of :py:meth:`.Store.profile`.
+        """
+        self.stop_query_profiler()
+        self.queries = profiler
+
+    def stop_query_profiler(self):
+        """Stop timing the SQL statements, if there is a query profiler."""
+        if self.queries is not None:
+            self.queries.stop()
+
     def iterate(self, start, stop):
         """Iterate over multiple performance points to later calculate avg and standard deviation.
 
@@ -390,6 +667,7 @@ class Performance(object):
         current = start
         while current <= stop:
             self.iteration = 0
+            self._current = []
             yield current
             current += 1
 
@@ -411,12 +689,19 @@ class Performance(object):
         """
         try:
             self.iteration += 1
-            point = Point(label, self.iteration)
+            point = Point(label, self.iteration, self.sampler)
 
-            if len(self.points) and self.points[-1].stop_time == 0:
-                self.points[-1].subpoints.append(point)
-            else:
+            # Attach the point to the innermost open point
+            root = not self._stack
+            if root:
                 self.points.append(point)
+            else:
+                self._stack[-1].subpoints.append(point)
+
+            self._stack.append(point)
+
+            if self.monitor is not None:
+                self.monitor.watch(point)
 
             yield point
 
@@ -424,45 +709,99 @@ class Performance(object):
             print('Exception: {}'.format(exc))
         finally:
             point.stop_time = time.time()
-            point.stop_memory = memory_usage()
+            point.stop_memory = self.sampler.sample()
+            self._stack.pop()
+
+            if self.monitor is not None:
+                self.monitor.unwatch(point)
+
+            if root:
+                self._add_frame(point.to_df())
+
+                if self.streaming:
+                    self.points.pop()
+
+    def _add_frame(self, frame):
+        """Add the dataframe of a finished point to its group and the current iteration.
+
+        In streaming mode the dataframe is folded into the running statistics of its group
+        and only the dataframe of the last iteration is kept.
+
+        Args:
+            frame (dict): Dataframe of a finished point
+        """
+        key = '|'.join(frame['Key'])
+        self._current.append(key)
+
+        if not self.streaming:
+            self._frames.setdefault(key, []).append(frame)
+            return
+
+        self._frames[key] = [frame]
+        stats = self._stats.setdefault(
+            key, [(RunningStats(), RunningStats()) for _ in frame['Key']]
+        )
+        for (times, memory), _time, _memory in zip(stats, frame['Time'], frame['Memory']):
+            times.add(_time)
+            memory.add(_memory)
 
-    def export(self, metrics=False):
+    def get_frames(self):
+        """Get the dataframes of the measuring points of the current iteration.
+
+        Returns:
+            list: Dataframes of the points
+        """
+        return [self._frames[key][-1] for key in self._current]
+
+    def add_frames(self, frames):
+        """Add dataframes of points measured by another profiler to the current iteration.
+
+        Args:
+            frames (list): Dataframes of the points, see :py:meth:`.get_frames`
+        """
+        for frame in frames:
+            self._add_frame(frame)
+
+    def export(self, metrics=False, current_iteration=False):
         """Export the measuring points as a dictionary.
 
+        The dataframes of the points are built once when a point is finished, so
+        exporting does not depend on the number of iterations which already ran.
+        If a memory monitor is set, each point also contains its memory ``timeline`` as
+        a JSON string.
+
         Args:
             metrics (bool, optional). Defaults to False. Whether or not metrics should be calculated
+            current_iteration (bool, optional): Defaults to False. Only export the points
+                of the current iteration.
 
         Returns:
             dict: Measuring points
         """
-        # Build grouped Dataframe of points
-        frames = [point.to_df() for point in self.points]
-        result = collections.OrderedDict()
-        for frame in frames:
-            key = '|'.join(frame['Key'])
-            if key in result:
-                result[key].append(frame)
-            else:
-                result[key] = [frame]
+        keys = self._current if current_iteration else self._frames.keys()
+        attrs = ['Label', 'Level', 'Type', 'Time', 'Memory', 'Peak Memory']
+
+        # The memory timeline is only recorded by a monitor
+        if self.monitor is not None:
+            attrs.append('Timeline')
 
         # Transform to ouput format
         data = []
-        for row in result.values():
+        for key in keys:
+            row = self._frames[key]
             # Only last iteration
-            points = _transform_points(
-                row[-1], ['Label', 'Level', 'Type', 'Time', 'Memory', 'Peak Memory']
-            )
+            points = _transform_points(row[-1], attrs)
 
             # Calculate metrics for time and memory
             if metrics:
-                metrics = _calc_metrics(row)
+                if self.streaming:
+                    values = _stats_metrics(self._stats[key])
+                else:
+                    values = calc_metrics(row)
 
                 # add metrics to each point
-                for idx, point in enumerate(points):
-                    point['mean_time'] = metrics[idx][0]
-                    point['std_time'] = metrics[idx][1]
-                    point['mean_memory'] = metrics[idx][2]
-                    point['std_memory'] = metrics[idx][3]
+                for point, value in zip(points, values):
+                    point.update(value)
 
             # add points to data list
             data.extend(points)
@@ -470,13 +809,17 @@ class Performance(object):
         return data
 
     def results(self):
-        """Print the performance results in a human-readable format."""
+        """Print the performance results, the memory sampler and the timed SQL statements."""
         self.formatter.print_table(self.export(metrics=True))
+        self.formatter.print_sampler(self.sampler)
+
+        if self.queries is not None:
+            self.formatter.print_queries(self.queries.export())
 
     # Mean and Standard Deviation
     @staticmethod
     def mean(values):
-        """Calculate Mean of values.
+        """Calculate Mean of values with NumPy.
 
         Args:
             values (list): List of values
@@ -484,11 +827,11 @@ class Performance(object):
         Returns:
             float: Mean value
         """
-        return sum(values) / float(len(values))
+        return float(np.mean(np.asarray(values, dtype=float)))
 
     @staticmethod
     def standard_deviation(numbers):
-        """Calculate the standard deviation.
+        """Calculate the population standard deviation with NumPy.
 
         Args:
             numbers (list): List of numbers
@@ -496,7 +839,4 @@ class Performance(object):
         Returns:
             float: Standard Deviation
         """
-        mean = Performance.mean(numbers)
-        return math.sqrt(
-            Performance.mean([math.pow(number - mean, 2) for number in numbers])
-        )
+        return float(np.std(np.asarray(numbers, dtype=float)))
@@ -0,0 +1,138 @@
+"""Write the results of the test runs in the background.
+
+Saving each test run directly blocks the experiment until the data store has committed
+the results, which adds latency between test runs and disturbs the next measurement.
+The :py:class:`.ResultWriter` queues the results and saves them in batches in a background
+thread instead. A batch is saved once it is full or once it is older than the flush interval.
+
+If the queue is full, adding a new result blocks until the writer has caught up, so the
+memory usage stays bounded even when the data store is slower than the experiment.
+
+Example::
+
+    writer = ResultWriter(TestCaseRepository, batch_size=100, flush_interval=1.0)
+    writer.start()
+    writer.put({'iteration': 1, 'performances': [...]})
+    writer.close()  # saves all remaining results
+"""
+import time
+import threading
+from six.moves import queue
+
+# Marks the end of the queue
+_STOP = object()
+
+
+class ResultWriter(object):
+
+    """Save test run results in batches in a background thread.
+
+    Attributes:
+        repo (AbstractRepository): Repository class which saves the results.
+        batch_size (int): Maximum number of results per batch.
+        flush_interval (float): Maximum number of seconds a result waits in a batch.
+        queue (queue.Queue): Queue of results waiting to be saved.
+        error (Exception): Error which occurred while saving a batch.
+    """
+
+    def __init__(self, repo, batch_size=100, flush_interval=1.0, max_queue=1000):
+        """Set up the writer.
+
+        Args:
+            repo (AbstractRepository): Repository class which saves the results.
+            batch_size (int, optional): Defaults to 100. Maximum number of results per batch.
+            flush_interval (float, optional): Defaults to 1.0. Maximum number of seconds
+                a result waits in a batch.
+            max_queue (int, optional): Defaults to 1000. Maximum number of queued results.
+        """
+        self.repo = repo
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.error = None
+        self._thread = threading.Thread(target=self._run, name='experimentum-result-writer')
+        self._thread.daemon = True
+
+    def start(self):
+        """Start the background thread.
+
+        Returns:
+            ResultWriter: self instance for method chaining.
+        """
+        self._thread.start()
+        return self
+
+    def put(self, result):
+        """Queue a result, blocks while the queue is full.
+
+        Args:
+            result (dict): Result of a test run.
+
+        Raises:
+            Exception: if saving a previous batch failed.
+        """
+        self._raise_error()
+        self.queue.put(result)
+
+    def close(self):
+        """Save all queued results and stop the background thread.
+
+        Raises:
+            Exception: if saving a batch failed.
+        """
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join()
+
+        self._raise_error()
+
+    def _raise_error(self):
+        """Raise the error which occurred while saving a batch.
+
+        Raises:
+            Exception: if saving a batch failed.
+        """
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        """Collect queued results into batches and save them."""
+        batch = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0, deadline - time.time())
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._flush(batch)
+                return
+
+            if item is not None:
+                batch.append(item)
+                deadline = deadline or time.time() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline and time.time() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch):
+        """Save a batch of results.
+
+        After an error no further batches are saved, but the queue is still
+        drained so that no producer blocks forever.
+
+        Args:
+            batch (list): Results to save.
+        """
+        if not batch or self.error is not None:
+            return
+
+        try:
+            self.repo.bulk_create(batch)
+        except Exception as exc:
+            self.error = exc
@@ -144,11 +144,21 @@ class Plot(AbstractPlot):
     def plotting(self):
         """Generate the plot, i.e. add labels, titles, legend etc and draw the plot.
 
+        The tests of the experiments are eagerly loaded with the ``selectin`` strategy,
+        so that iterating over them in :py:meth:`.data` does not execute one query per
+        test. Their performances are only loaded when they are accessed. Use the ``load``
+        option of the plot config to change the loading strategies, e.g.
+        ``"load": {"tests": "selectin", "tests.performances": "selectin"}`` to also load
+        the performances.
+
         Returns:
             matplotlib.pyplot: Plot object
         """
         self.plot.figure()
-        exps = self.repo.get(['name', self.config.get('experiment')])
+        exps = self.repo.get(
+            ['name', self.config.get('experiment')],
+            load=self.config.get('load', {'tests': 'selectin'})
+        )
         plot_data = self.data(exps)
 
         if isinstance(plot_data, list):
@@ -71,6 +71,13 @@ There are several methods for querying data, like :py:meth:`~.Repository.find`,
     for user in users:
         print(user.id, user.name, user.fullname, user.addresses)
 
+    # Conditions support in, not in, between, like, is (null) and nested and/or groups,
+    # also on the columns of related repositories
+    users = UserRepository.get(where=[
+        ['id', 'in', [1, 2, 3]],
+        ['or', [['fullname', 'is', None], ['addresses.email', 'like', '%@world.com']]]
+    ])
+
     # Get the first user which satisfies a certain condition
     user = UserRepository.first(where=['name', 'John'])
     print(user.id, user.name, user.fullname, user.addresses)
@@ -108,6 +115,60 @@ deleting data, like :py:meth:`~.Repository.create`, :py:meth:`~.Repository.updat
     user = UserRepository.find(1)
     user.delete()
 
+Relationships are loaded lazily by default, i.e. each access of ``user.addresses`` executes
+a query. Pass the ``load`` argument to :py:meth:`~.Repository.get`, :py:meth:`~.Repository.first`,
+:py:meth:`~.Repository.find` or :py:meth:`~.Repository.all` to load them eagerly with the
+``selectin``, ``joined`` or ``subquery`` strategy. It is either one strategy for all
+relationships or a strategy for each relationship path. The default strategy of a relationship
+can be set as the second item of its ``__relationships__`` entry::
+
+    users = UserRepository.all(load='selectin')  # loads the users and their addresses
+    users = UserRepository.get(['name', 'John'], load={'addresses': 'joined'})
+
+    __relationships__ = {
+        'addresses': [AddressRepository, 'selectin']
+    }
+
+Instead of whole entries :py:meth:`~.Repository.get` can also select single columns and the
+aggregate functions ``count``, ``avg``, ``min``, ``max`` and ``sum``. Together with
+``group_by``, ``order_by``, ``limit`` and ``offset`` the data store calculates the results,
+so only the aggregated rows are loaded::
+
+    # Number of users and their first name for each fullname, most common first
+    rows = UserRepository.get(
+        select=['fullname', ['count'], ['min', 'name', 'first']],
+        group_by='fullname',
+        order_by='-count',
+        limit=10
+    )
+    for row in rows:
+        print(row.fullname, row.count, row.first)
+
+To process a large number of entries without loading all of them into memory, iterate
+over them in chunks with :py:meth:`~.Repository.iterate`::
+
+    for user in UserRepository.iterate(['name', '!=', 'John'], chunk_size=5000):
+        print(user.id, user.name)
+
+To plot or analyse many rows, fetch the columns directly into NumPy arrays with
+:py:meth:`~.Repository.to_arrays` or into a pandas DataFrame with
+:py:meth:`~.Repository.to_dataframe`. No repository instances are created, the values are
+copied from the database cursor into typed arrays::
+
+    data = UserRepository.to_arrays(['id', 'name'], where=['id', '>', 10])
+    print(data['id'].mean(), data['name'])
+
+If you have to save a lot of data at once, e.g. the results of thousands of test runs, use
+the :py:meth:`~.Repository.bulk_create` method. It saves the records and the records of
+their relationships in a single transaction, but does not call any repository events::
+
+    UserRepository.bulk_create([
+        {'name': 'Hello', 'fullname': 'World', 'password': '1234', 'addresses': [
+            {'email': 'hello@world.com'}
+        ]},
+        {'name': 'John', 'fullname': 'Doe', 'password': '1234', 'addresses': []},
+    ])
+
 Events
 ------
 A Repository provides several events, allowing you to hook into the following points in a
@@ -256,6 +317,14 @@ class RepositoryLoader(object):
 
         return repo
 
+    def all(self):
+        """Return the classes of all loaded repositories.
+
+        Returns:
+            list: Repository classes ordered by name
+        """
+        return [self._repos[name] for name in sorted(self._repos)]
+
 
 @add_metaclass(ABCMeta)
 class AbstractRepository(object):
@@ -433,12 +502,45 @@ class AbstractRepository(object):
         """
         raise NotImplementedError('Must implement delete method!')
 
+    def release(self):
+        """Release the saved entry from the data store session, e.g. to free its memory.
+
+        Does nothing by default.
+
+        Returns:
+            AbstractRepository: Self Instance.
+        """
+        return self
+
     @classmethod
-    def get(cls, where=None):
+    def bulk_create(cls, records, chunk_size=1000):
+        """Save many records and the records of their relationships at once.
+
+        Args:
+            records (list): List of dictionaries with the repository data.
+            chunk_size (int, optional): Defaults to 1000. Number of records per batch.
+
+        Raises:
+            NotImplementedError: if method is not implemented yet.
+
+        Returns:
+            int: Number of saved records.
+        """
+        raise NotImplementedError('Must implement bulk_create method!')
+
+    @classmethod
+    def get(cls, where=None, load=None, select=None, group_by=None, order_by=None, limit=None,
+            offset=None):
         """Get all entries which satisfy a specific condition from your data store.
 
         Args:
             where (list, optional): Defaults to None. Where Condition
+            load (dict|str, optional): Defaults to None. Loading strategies of the relationships.
+            select (list, optional): Defaults to None. Columns and aggregate functions to select.
+            group_by (list|str, optional): Defaults to None. Columns to group by.
+            order_by (list|str, optional): Defaults to None. Columns to order by.
+            limit (int, optional): Defaults to None. Maximum number of results.
+            offset (int, optional): Defaults to None. Number of results to skip.
 
         Raises:
             NotImplementedError: if method is not implemented yet.
@@ -449,11 +551,12 @@ class AbstractRepository(object):
         raise NotImplementedError('Must implement get method!')
 
     @classmethod
-    def first(cls, where=None):
+    def first(cls, where=None, load=None):
         """Get first entry which satisfy a specific condition from your data store.
 
         Args:
             where (list, optional): Defaults to None. Where Condition
+            load (dict|str, optional): Defaults to None. Loading strategies of the relationships.
 
         Raises:
             NotImplementedError: if method is not implemented yet.
@@ -464,9 +567,12 @@ class AbstractRepository(object):
         raise NotImplementedError('Must implement first method!')
 
     @classmethod
-    def all(cls):
+    def all(cls, load=None):
         """Get all entries for this specific repository from your data store.
 
+        Args:
+            load (dict|str, optional): Defaults to None. Loading strategies of the relationships.
+
         Raises:
             NotImplementedError: if method is not implemented yet.
 
@@ -476,11 +582,75 @@ class AbstractRepository(object):
         raise NotImplementedError('Must implement all method!')
 
     @classmethod
-    def find(cls, id):
+    def iterate(cls, where=None, chunk_size=1000, load=None):
+        """Iterate over all entries which satisfy a condition in chunks.
+
+        Args:
+            where (list, optional): Defaults to None. Where Condition
+            chunk_size (int, optional): Defaults to 1000. Number of entries per chunk.
+            load (dict|str, optional): Defaults to None. Loading strategies of the relationships.
+
+        Raises:
+            NotImplementedError: if method is not implemented yet.
+
+        Yields:
+            AbstractRepository: Entry which satisfies the condition
+        """
+        raise NotImplementedError('Must implement iterate method!')
+
+    @classmethod
+    def to_arrays(cls, columns=None, where=None, structured=False, chunk_size=10000, **kwargs):
+        """Fetch columns into NumPy arrays without creating repository instances.
+
+        Args:
+            columns (list, optional): Defaults to None. Columns and aggregate functions to
+                select. Selects all columns if not given.
+            where (list, optional): Defaults to None. Where Condition
+            structured (bool, optional): Defaults to False. Return one structured array
+                instead of a dictionary of arrays.
+            chunk_size (int, optional): Defaults to 10000. Number of rows to fetch at once.
+            **kwargs: ``group_by``, ``order_by``, ``limit`` and ``offset`` of the query.
+
+        Raises:
+            NotImplementedError: if method is not implemented yet.
+
+        Returns:
+            dict|numpy.ndarray: Array of each column or structured array
+        """
+        raise NotImplementedError('Must implement to_arrays method!')
+
+    @classmethod
+    def to_dataframe(cls, columns=None, where=None, **kwargs):
+        """Fetch columns into a pandas DataFrame without creating repository instances.
+
+        Requires pandas, e.g. ``pip install experimentum[pandas]``.
+
+        Args:
+            columns (list, optional): Defaults to None. Columns and aggregate functions to
+                select. Selects all columns if not given.
+            where (list, optional): Defaults to None. Where Condition
+            **kwargs: Further arguments of :py:meth:`to_arrays`.
+
+        Raises:
+            TypeError: if pandas is not installed.
+
+        Returns:
+            pandas.DataFrame: Data frame with the columns
+        """
+        try:
+            import pandas
+        except ImportError:
+            raise TypeError('Fetching data frames requires pandas.')
+
+        return pandas.DataFrame(cls.to_arrays(columns, where, structured=True, **kwargs))
+
+    @classmethod
+    def find(cls, id, load=None):
         """Find an entry of this repository based on its id.
 
         Args:
             id (int): ID to search for.
+            load (dict|str, optional): Defaults to None. Loading strategies of the relationships.
 
         Raises:
             NotImplementedError: if method is not implemented yet.
@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 from six import add_metaclass
 from abc import abstractmethod, ABCMeta
+from contextlib import contextmanager
 
 
 @add_metaclass(ABCMeta)
@@ -87,3 +88,38 @@ class AbstractStore(object):
             NotImplementedError: if method is not implemented by derived class.
         """
         raise NotImplementedError('Must implement alter method')
+
+    @contextmanager
+    def transaction(self):
+        """Run all schema changes in one transaction.
+
+        Data stores which do not support transactions for schema changes run them directly.
+
+        Yields:
+            boolean: Whether the schema changes run in a transaction.
+        """
+        yield False
+
+    def profile(self, slowest=5):
+        """Time the statements of the data store per repository method.
+
+        Data stores which can not time their statements return None.
+
+        Args:
+            slowest (int, optional): Defaults to 5. Number of slowest statements to keep.
+
+        Returns:
+            object: Started profiler with ``stop`` and ``export`` methods or None.
+        """
+        return None
+
+    def analyze(self, repositories=None):
+        """Explain the lookups of foreign keys and relationships and find missing indexes.
+
+        Args:
+            repositories (list, optional): Defaults to None. Repositories to analyze.
+
+        Raises:
+            NotImplementedError: if method is not implemented by derived class.
+        """
+        raise NotImplementedError('Must implement analyze method')
@@ -171,8 +171,16 @@ In this example, we are stating that the ``user_id`` column references the ``id`
 on the ``users`` table and set the "on update" and "on delete" actions to ``cascade``.
 Make sure to create the foreign key column first!
 
+Foreign keys also add a basic index (e.g. ``posts_user_id_index``) to their column, unless
+the column is already the first column of another index. Otherwise every query for the
+posts of a user and every cascade would scan the whole table. Pass ``index=False`` to
+skip the index::
+
+    table.foreign('user_id', index=False).references('id').on('users')
+
 To drop a foreign key, you can use the :py:meth:`~.Blueprint.drop_foreign` method. It works
-just like dropping an index.
+just like dropping an index. The index of the foreign key is kept, drop it with
+:py:meth:`~.Blueprint.drop_index` if you do not need it anymore.
 """
 from experimentum.Storage.Migrations import Column, ForeignKey
 
@@ -542,12 +550,16 @@ class Blueprint(object):
         self._add_idx(column, 'index', name)
         return self
 
-    def foreign(self, column, name=None):
+    def foreign(self, column, name=None, index=True):
         """Add a foreign key to the column.
 
+        Unless the column is already the first column of an index, a basic index is added
+        as well, so that loading the related entries and cascades do not scan the table.
+
         Args:
             column (str): Foreign Key column
             name (str, optional): Default to None. Name of the foreign key.
+            index (bool, optional): Defaults to True. Whether to index the column.
 
         Returns:
             ForeignKey: ForeignKey data structure to configure foreign key.
@@ -555,6 +567,9 @@ class Blueprint(object):
         if not name:
             name = '{}_{}_{}'.format(self.table, column, 'foreign')
 
+        if index and not self._is_indexed(column):
+            self._add_idx(column, 'index')
+
         fkey = ForeignKey(column, name)
         self.fkeys.append({'col': column, 'key': fkey})
         return fkey
@@ -570,12 +585,30 @@ class Blueprint(object):
         if not name:
             name = '{}_{}_{}'.format(self.table, column, idx_type)
 
+        # replace an index with the same name, e.g. the index of a foreign key
+        self.indexes = [idx for idx in self.indexes if idx['name'] != name]
         self.indexes.append({
             'col': column,
             'type': idx_type,
             'name': name
         })
 
+    def _is_indexed(self, column):
+        """Check if the column is the first column of an index.
+
+        Args:
+            column (str): Column to check
+
+        Returns:
+            boolean
+        """
+        for idx in self.indexes:
+            cols = idx['col'] if isinstance(idx['col'], list) else [idx['col']]
+            if cols[0] == column:
+                return True
+
+        return False
+
     def drop_primary(self, column, name=None):
         """Drop a primary key from the column.
 
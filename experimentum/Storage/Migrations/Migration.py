@@ -4,8 +4,15 @@ import inflection
 
 class Migration(object):
 
-    """Base Migration Class."""
+    """Base Migration Class.
+
+    Attributes:
+        revision (str): Revision of the migration.
+        squashed (list): Revisions which are replaced by a snapshot migration, see
+            :py:meth:`.Migrator.squash`. Defaults to None.
+    """
     revision = None
+    squashed = None
 
     def __init__(self, app):
         """Init the Migration and set up the schema class.
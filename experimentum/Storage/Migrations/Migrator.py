@@ -3,16 +3,109 @@
 
 Handles actions like upgrade, downgrading, keeping track of
 which migrations did run and which not. Used by :py:mod:`.MigrationCommand`.
+
+The status of the migrations is computed from the filenames and the ``.version`` file only.
+A migration file is imported when its migration is accessed, e.g. to run it, and its class
+is cached until the file changes.
 """
 from __future__ import print_function
 import os
-import glob
 import imp
+import fnmatch
 import inflection
 import datetime
+from six.moves.collections_abc import Mapping
 from tabulate import tabulate
 from termcolor import colored
 from experimentum.cli import print_failure
+from experimentum.utils import _list_files
+from experimentum.Storage.Migrations.Snapshot import Snapshot
+
+# Loaded migration classes by filename, see _load_migration
+_CLASSES = {}
+
+
+def _load_migration(path, name):
+    """Load the migration class of a migration file.
+
+    The class is cached until the modification time of the file changes.
+
+    Args:
+        path (str): Path to the migrations folder.
+        name (str): Name of the migration file without extension.
+
+    Returns:
+        type: Migration class
+    """
+    file = os.path.join(path, '%s.py' % name)
+    mtime = os.stat(file).st_mtime
+
+    cached = _CLASSES.get(file)
+    if cached is None or cached[0] != mtime:
+        with open(file, 'rb') as filehandler:
+            mod = imp.load_source('migrations', file, filehandler)
+        cached = (mtime, getattr(mod, inflection.camelize(name[15:])))
+        _CLASSES[file] = cached
+
+    return cached[1]
+
+
+class Migrations(Mapping):
+
+    """Read-only mapping of the migration names to their instances.
+
+    The migrations are loaded and instantiated when they are accessed for the first time.
+
+    Attributes:
+        path (str): Path to the migrations folder.
+        app (App): Main App class.
+    """
+
+    def __init__(self, path, app):
+        """Set the path and app for the migrations.
+
+        Args:
+            path (str): Path to the migrations folder.
+            app (App): Main App class.
+        """
+        self.path = path
+        self.app = app
+        self._instances = {}
+
+    def __getitem__(self, name):
+        """Get the instance of a migration.
+
+        Args:
+            name (str): Name of the migration file without extension.
+
+        Raises:
+            KeyError: if the migration does not exist.
+
+        Returns:
+            Migration: Migration instance
+        """
+        if name not in self._instances:
+            if name not in Migrator.get_migration_files(self.path):
+                raise KeyError(name)
+            self._instances[name] = _load_migration(self.path, name)(self.app)
+
+        return self._instances[name]
+
+    def __iter__(self):
+        """Iterate over the names of the migrations.
+
+        Returns:
+            iterator
+        """
+        return iter(Migrator.get_migration_files(self.path))
+
+    def __len__(self):
+        """Get the number of migrations.
+
+        Returns:
+            int
+        """
+        return len(Migrator.get_migration_files(self.path))
 
 
 class Migrator(object):
@@ -21,6 +114,8 @@ class Migrator(object):
 
     Attributes:
         path (str): Path to the migrations folder.
+        app (App): Main App class.
+        migrations (Migrations): Migrations by name, which are loaded on demand.
     """
 
     @staticmethod
@@ -33,15 +128,9 @@ class Migrator(object):
         Returns:
             list: list of migration files
         """
-        files = glob.glob(os.path.join(path, '[0-9]*_*.py'))
-
-        if not files:
-            return []
+        files = fnmatch.filter(map(os.path.basename, _list_files(path)), '[0-9]*_*.py')
 
-        files = list(map(lambda f: os.path.basename(f).replace('.py', ''), files))
-        files = sorted(files)
-
-        return files
+        return sorted(f.replace('.py', '') for f in files)
 
     def __init__(self, path, app):
         """Set the path for the migrations.
@@ -50,6 +139,7 @@ class Migrator(object):
             path (str): Path to the migrations folder.
         """
         self.path = path
+        self.app = app
 
         # create .version file
         name = '{}/.version'.format(self.path)
@@ -58,16 +148,8 @@ class Migrator(object):
             with open(name, 'w+') as file:
                 file.write('')
 
-        # load migrations
-        self.migrations = {}
-        names = self.get_migration_files(path)
-
-        for name in names:
-            file = os.path.join(path, '%s.py' % name)
-            with open(file, 'rb') as filehandler:
-                mod = imp.load_source('migrations', file, filehandler)
-                migration = getattr(mod, inflection.camelize(name[15:]))
-                self.migrations[name] = migration(app)
+        # migrations are loaded on demand
+        self.migrations = Migrations(path, app)
 
     def status(self, printing=True):
         """Print the current status of which migrations did run and which not.
@@ -114,6 +196,71 @@ class Migrator(object):
             file.write(stub.format(migration=migration, name=name, revision=revision))
             print(colored('› Migration created successfully!', 'green'))
 
+    def squash(self, name='squashed_migrations'):
+        """Squash all migrations into a single snapshot migration.
+
+        The migrations are run against a :py:class:`.Snapshot` schema, which records the final
+        schema of all tables. The snapshot migration creates these tables directly and gets
+        the revision of the last squashed migration, so databases which already ran all
+        migrations do not run it again. The squashed migration files are moved into the
+        ``squashed`` folder.
+
+        The snapshot does not use the app or the data store, so migrations which change
+        data, e.g. with a repository, fail and nothing is squashed.
+
+        Args:
+            name (str, optional): Defaults to 'squashed_migrations'. Name for the migration.
+        """
+        names = self.get_migration_files(self.path)
+        if len(names) == 0:
+            print(colored('× There are no migrations to squash.', 'red'))
+            return
+
+        migrated = self._get_migrated_revisions()
+        if 0 < len([mig for mig in names if mig[:14] in migrated]) < len(names):
+            print_failure('Run or revert all migrations before squashing them.', 1)
+
+        snapshot = Snapshot(self.app)
+        squashed = []
+        for mig in names:
+            migration = self.migrations[mig]
+            schema, migration.schema = migration.schema, snapshot
+            try:
+                migration.up()
+            except Exception as exc:
+                print_failure('Error while squashing migration {}: {}'.format(mig, exc), 1)
+            finally:
+                migration.schema = schema
+
+            squashed.extend(self._get_revisions(migration))
+
+        # Move squashed migrations out of the way
+        folder = os.path.join(self.path, 'squashed')
+        if not os.path.isdir(folder):
+            os.makedirs(folder)
+
+        for mig in names:
+            os.rename(os.path.join(self.path, mig + '.py'), os.path.join(folder, mig + '.py'))
+
+        # Create snapshot migration
+        name = ''.join(list(filter(lambda x: x.isalpha() or x == '_', name.replace(' ', '_'))))
+        filename = '{}/{}_{}.py'.format(self.path, names[-1][:14], name.lower())
+
+        with open(os.path.join(os.path.dirname(__file__), 'snapshot.stub'), 'r') as content:
+            stub = content.read()
+
+        with open(filename, 'w+') as file:
+            file.write(stub.format(
+                migration=inflection.camelize(name.lower()),
+                revision=names[-1][:14],
+                squashed=squashed,
+                up=snapshot.render_up(),
+                down=snapshot.render_down()
+            ))
+
+        print(colored('› Squashed {} migrations into'.format(len(names)), 'green'),
+              colored(os.path.basename(filename), 'cyan'))
+
     def up(self, migration=None):
         """Upgrade to a new migration revision.
 
@@ -138,11 +285,66 @@ class Migrator(object):
         # update migration
         try:
             migration.up()
-            self._update_revision(migration.revision)
-            print(colored('› Migrated', 'green'), colored(migration, 'cyan'))
+            self._finish_upgrade(migration)
         except Exception as exc:
             print_failure('Error while ugrading migration {}: {}'.format(migration, exc), 1)
 
+    def upgrade(self, target=None):
+        """Upgrade all outstanding migrations, or all up to a target revision, at once.
+
+        If the data store supports transactional DDL, the migrations run in one transaction
+        and their revisions are only recorded after the transaction is committed. If a
+        migration fails, all of them are rolled back. Otherwise each revision is recorded
+        right after its migration.
+
+        Args:
+            target (str, optional): Defaults to None. Last revision to upgrade to.
+        """
+        migrated = self._get_migrated_revisions()
+        migrations = self.get_migration_files(self.path)
+
+        if target is not None and target not in [mig[:14] for mig in migrations]:
+            print_failure('Migration revision {} does not exist.'.format(target), 1)
+
+        pending = [
+            mig for mig in migrations
+            if mig[:14] not in migrated and (target is None or mig[:14] <= target)
+        ]
+        if len(pending) == 0:
+            print(colored('› Migrations are all up to date.', 'green'))
+            return
+
+        done = []
+        name = pending[0]
+        transactional = False
+        try:
+            with self.app.make('store').transaction() as transactional:
+                for name in pending:
+                    migration = self.migrations[name]
+                    migration.up()
+                    done.append(migration)
+
+                    if not transactional:
+                        self._finish_upgrade(migration)
+        except Exception as exc:
+            print_failure('Error while upgrading migration {}{}: {}'.format(
+                name, ', rolled back all migrations' if transactional else '', exc
+            ), 1)
+
+        if transactional:
+            for migration in done:
+                self._finish_upgrade(migration)
+
+    def _finish_upgrade(self, migration):
+        """Record the revisions of an upgraded migration.
+
+        Args:
+            migration (Migration): The upgraded migration
+        """
+        for revision in self._get_revisions(migration):
+            self._update_revision(revision)
+        print(colored('› Migrated', 'green'), colored(migration, 'cyan'))
+
     def down(self, migration=None):
         """Downgrade to an old migration revision.
 
@@ -168,7 +370,8 @@ class Migrator(object):
         # downgrade migration
         try:
             migration.down()
-            self._update_revision(migration.revision, delete=True)
+            for revision in self._get_revisions(migration)[::-1]:
+                self._update_revision(revision, delete=True)
             print(colored('› Migrated', 'green'), colored(migration, 'cyan'))
         except Exception as exc:
             print_failure('Error while downgrading migration {}: {}'.format(migration, exc), 1)
@@ -191,6 +394,21 @@ class Migrator(object):
 
         return True
 
+    @staticmethod
+    def _get_revisions(migration):
+        """Get the revisions of a migration, i.e. all squashed revisions of a snapshot.
+
+        Args:
+            migration (Migration): The migration
+
+        Returns:
+            list
+        """
+        if isinstance(migration.squashed, list):
+            return migration.squashed
+
+        return [migration.revision]
+
     def _update_revision(self, revision, delete=False):
         """Update the revision number.
 
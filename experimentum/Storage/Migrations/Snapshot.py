@@ -0,0 +1,357 @@
+"""Schema which records the blueprints of migrations instead of building them.
+
+The :py:class:`.Snapshot` is used by :py:meth:`.Migrator.squash` to compile the schema of
+many migrations into a single migration. Running the ``up`` methods of the migrations with
+a snapshot as their schema folds every created, altered, renamed and dropped table into the
+final columns, indexes and foreign keys of each table, without touching the database::
+
+    snapshot = Snapshot(app)
+    for migration in migrations:
+        migration.schema = snapshot
+        migration.up()
+
+    print(snapshot.render_up())
+
+The snapshot only records schema changes. Instead of the app and the data store, the
+migrations get a stand-in which can only make blueprints, so a migration which changes
+data, e.g. with a repository or a SQL statement, raises a ``TypeError`` and can not be
+squashed.
+
+Like the data store, an alter only adds the primary keys and foreign keys of the columns
+which are added by the same blueprint, while basic and unique indexes may also index the
+existing columns.
+"""
+from collections import OrderedDict
+from experimentum.Storage.Migrations.Schema import Schema
+
+
+def _as_list(columns):
+    """Get the column(s) of an index as list.
+
+    Args:
+        columns (str|list): Column or list of columns
+
+    Returns:
+        list
+    """
+    return columns if isinstance(columns, list) else [columns]
+
+
+class _SchemaOnly(object):
+
+    """Stand-in for the app and the data store of a :py:class:`.Snapshot`.
+
+    Only blueprints can be made, any other use raises a TypeError.
+    """
+
+    def __init__(self, name, make=None):
+        """Set the name of the replaced object and the factory of the blueprints.
+
+        Args:
+            name (str): Name of the replaced object, i.e. app or store.
+            make (function, optional): Defaults to None. Creates the blueprints.
+        """
+        self._name = name
+        self._make = make
+
+    def make(self, alias, *args, **kwargs):
+        """Make a blueprint.
+
+        Args:
+            alias (str): Name of class alias, only blueprint is allowed.
+
+        Raises:
+            TypeError: if anything else than a blueprint is made.
+
+        Returns:
+            Blueprint: Blueprint
+        """
+        if alias != 'blueprint' or self._make is None:
+            self._refuse('make({!r})'.format(alias))
+
+        return self._make(alias, *args, **kwargs)
+
+    def __getattr__(self, attr):
+        """Refuse to access any other attribute.
+
+        Raises:
+            TypeError: always, except for special attributes.
+        """
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+
+        self._refuse(attr)
+
+    def _refuse(self, attr):
+        """Raise an error for a migration which does not only change the schema.
+
+        Args:
+            attr (str): Accessed attribute.
+
+        Raises:
+            TypeError: always.
+        """
+        raise TypeError(
+            'Only schema changes can be squashed, the migration uses {}.{}.'.format(
+                self._name, attr
+            )
+        )
+
+
+class Snapshot(Schema):
+
+    """Records the final schema of the tables instead of building it.
+
+    Attributes:
+        app (object): Stand-in for the main App Class, which only makes blueprints.
+        store (object): Stand-in for the data store, which refuses to be used.
+        tables (OrderedDict): Columns, indexes and foreign keys of each table in the order
+            of creation.
+    """
+
+    def __init__(self, app):
+        """Set app and start with an empty schema.
+
+        Args:
+            app (App): Main App Class.
+        """
+        self.app = _SchemaOnly('app', app.make)
+        self.store = _SchemaOnly('store')
+        self.tables = OrderedDict()
+
+    def rename(self, old, new):
+        """Rename a table and the foreign keys which reference it.
+
+        Args:
+            old (str): Old table name
+            new (str): New table name
+        """
+        self._get_table(old)
+        self.tables = OrderedDict(
+            (new if key == old else key, table) for key, table in self.tables.items()
+        )
+
+        for table in self.tables.values():
+            for fkey in table['fkeys']:
+                if fkey['key'].get('ref_table') == old:
+                    fkey['key'].on(new)
+
+    def drop(self, name):
+        """Drop a table.
+
+        Args:
+            name (str): Name of the table
+        """
+        self._get_table(name)
+        del self.tables[name]
+
+    def drop_if_exists(self, name):
+        """Drop a table if it exists.
+
+        Args:
+            name (str): Name of the table
+        """
+        self.tables.pop(name, None)
+
+    def has_table(self, table):
+        """Check if the snapshot has a specific table.
+
+        Args:
+            table (str): Table to check existance of
+
+        Returns:
+            boolean
+        """
+        return table in self.tables
+
+    def has_column(self, table, column):
+        """Check if a table of the snapshot has a specific column.
+
+        Args:
+            table (str): Table to check
+            column (str): Column to check
+
+        Returns:
+            boolean
+        """
+        columns = self.tables.get(table, {}).get('columns', [])
+        return any(col.get('name') == column for col in columns)
+
+    def render_up(self, indent=8):
+        """Render the code which creates all tables of the snapshot.
+
+        Args:
+            indent (int, optional): Defaults to 8. Indentation of the code.
+
+        Returns:
+            str
+        """
+        lines = []
+
+        for name in self._get_creation_order():
+            lines.append('with self.schema.create({!r}) as table:'.format(name))
+            lines.extend('    ' + line for line in self._render_table(self.tables[name]))
+
+        return '\n'.join(' ' * indent + line for line in lines or ['pass'])
+
+    def render_down(self, indent=8):
+        """Render the code which drops all tables of the snapshot.
+
+        Args:
+            indent (int, optional): Defaults to 8. Indentation of the code.
+
+        Returns:
+            str
+        """
+        lines = [
+            'self.schema.drop_if_exists({!r})'.format(name) for name in self._get_creation_order()
+        ]
+        return '\n'.join(' ' * indent + line for line in lines[::-1] or ['pass'])
+
+    def _get_creation_order(self):
+        """Get the table names so that referenced tables are created first.
+
+        Tables keep the order of their creation unless they reference a table which was
+        created later, e.g. by a foreign key which was added by an alter.
+
+        Returns:
+            list
+        """
+        order = []
+        remaining = list(self.tables)
+
+        while remaining:
+            for name in remaining:
+                refs = [fkey['key'].get('ref_table') for fkey in self.tables[name]['fkeys']]
+                if all(ref in order or ref == name or ref not in remaining for ref in refs):
+                    break
+            else:
+                name = remaining[0]  # circular references
+
+            order.append(name)
+            remaining.remove(name)
+
+        return order
+
+    def _get_table(self, name):
+        """Get the schema of a table.
+
+        Args:
+            name (str): Name of the table
+
+        Raises:
+            TypeError: if the table does not exist.
+
+        Returns:
+            dict
+        """
+        if name not in self.tables:
+            raise TypeError('Table {} does not exist.'.format(name))
+
+        return self.tables[name]
+
+    def _build(self, blueprint):
+        """Fold the blueprint into the schema of its table.
+
+        Args:
+            blueprint (Blueprint): Blueprint to record.
+        """
+        if blueprint.action == 'create':
+            self.tables[blueprint.table] = {'columns': [], 'indexes': [], 'fkeys': []}
+
+        table = self._get_table(blueprint.table)
+        names = [col.get('name') for col in blueprint.columns]
+        columns = set(names) | set(blueprint.dropped['columns'])
+        dropped = blueprint.dropped['indexes']
+
+        # Drop columns, indexes and foreign keys
+        table['columns'] = [col for col in table['columns'] if col.get('name') not in columns]
+        table['indexes'] = [
+            idx for idx in table['indexes']
+            if not self._is_dropped(idx, dropped)
+            if not set(_as_list(idx['col'])) & set(blueprint.dropped['columns'])
+        ]
+        table['fkeys'] = [
+            fkey for fkey in table['fkeys']
+            if fkey['key'].get('name') not in [idx['name'] for idx in dropped]
+            if fkey['col'] not in blueprint.dropped['columns']
+        ]
+
+        # Add columns with their indexes and foreign keys
+        table['columns'].extend(blueprint.columns)
+        table['indexes'].extend(
+            idx for idx in blueprint.indexes
+            if set(_as_list(idx['col'])) & set(names) or idx['type'] in ('index', 'unique')
+        )
+        table['fkeys'].extend(fkey for fkey in blueprint.fkeys if fkey['col'] in names)
+
+    @staticmethod
+    def _is_dropped(index, dropped):
+        """Check if an index is dropped.
+
+        Primary keys are dropped by their column, all other indexes by their name.
+
+        Args:
+            index (dict): Index of the table
+            dropped (list): Dropped indexes
+
+        Returns:
+            boolean
+        """
+        for idx in dropped:
+            if idx['name'] == index['name'] or (
+                idx['type'] == 'primary' == index['type'] and idx['col'] == index['col']
+            ):
+                return True
+
+        return False
+
+    @staticmethod
+    def _render_table(table):
+        """Render the blueprint calls of a table.
+
+        Args:
+            table (dict): Columns, indexes and foreign keys of the table
+
+        Returns:
+            list: lines of code
+        """
+        lines = []
+
+        for col in table['columns']:
+            args = [repr(col.get('type')), repr(col.get('name'))]
+            args.extend(
+                '{}={!r}'.format(key, value)
+                for key, value in sorted(col.get('parameters', {}).items())
+            )
+            line = 'table.add_column({})'.format(', '.join(args))
+
+            if col.get('null'):
+                line += '.nullable()'
+            if col.get('default') is not None:
+                line += '.default({!r})'.format(col.get('default'))
+            if col.get('unsigned'):
+                line += '.unsigned()'
+
+            lines.append(line)
+
+        for idx in table['indexes']:
+            lines.append('table.{}({!r}, {!r})'.format(idx['type'], idx['col'], idx['name']))
+
+        indexed = [_as_list(idx['col'])[0] for idx in table['indexes']]
+
+        for fkey in table['fkeys']:
+            key = fkey['key']
+            line = 'table.foreign({!r}, {!r}{}).references({!r}).on({!r})'.format(
+                fkey['col'], key.get('name'), '' if fkey['col'] in indexed else ', index=False',
+                key.get('ref_column'), key.get('ref_table')
+            )
+
+            if key.get('on_delete'):
+                line += '.on_delete({!r})'.format(key.get('on_delete'))
+            if key.get('on_update'):
+                line += '.on_update({!r})'.format(key.get('on_update'))
+
+            lines.append(line)
+
+        return lines
@@ -12,6 +12,9 @@
 :py:mod:`.Migrator` Module
     The :py:class:`.Migrator` class handles the management of all migrations.
 
+:py:mod:`.Snapshot` Module
+    The :py:class:`.Snapshot` schema records the final schema of migrations to squash them.
+
 :py:mod:`.Column` Module
     Datastructure for columns.
 
@@ -25,3 +28,4 @@ from .Column import Column
 from .ForeignKey import ForeignKey
 from .Blueprint import Blueprint
 from .Schema import Schema
+from .Snapshot import Snapshot
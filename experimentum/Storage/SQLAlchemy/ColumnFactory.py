@@ -179,6 +179,16 @@ class ColumnFactory(object):
                 primary_key=primary,
             ))
 
+        # Add indexes of existing columns, e.g. to index the foreign key of an existing table
+        names = [col.get('name') for col in blueprint.columns]
+        for idx in blueprint.indexes:
+            idx_cols = idx.get('col') if isinstance(idx.get('col'), list) else [idx.get('col')]
+
+            if idx.get('type') in ('index', 'unique') and not set(idx_cols) & set(names):
+                data['indexes'].append(
+                    Index(idx.get('name'), *idx_cols, unique=idx.get('type') == 'unique')
+                )
+
         return data
 
     def create_foreign_key(self, key, col):
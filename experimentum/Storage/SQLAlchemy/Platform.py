@@ -7,6 +7,7 @@ from sqlalchemy.dialects.mysql.base import MySQLDialect
 from sqlalchemy.dialects.mssql.base import MSDialect
 from sqlalchemy.dialects.sqlite.base import SQLiteDialect
 from sqlalchemy.dialects.postgresql.base import PGDialect
+import sys
 
 
 class Platform(object):
@@ -113,6 +114,67 @@ class Platform(object):
         """
         return isinstance(self.engine.dialect, PGDialect)
 
+    def supports_transactional_ddl(self):
+        """Check if schema changes can be rolled back, i.e. run in a transaction.
+
+        MySQL and Oracle implicitly commit every schema change. The sqlite3 module of
+        Python versions before 3.6 also commits before every schema change.
+
+        Returns:
+            boolean
+        """
+        if self.is_sqlite():
+            return sys.version_info >= (3, 6)
+
+        return self.is_postgresql() or self.is_mssql()
+
+    def explain(self, query):
+        """Get the query plan of a query.
+
+        Only SQLite, MySQL and PostgreSQL can explain queries, the plan of all other
+        databases is empty.
+
+        Args:
+            query (sqlalchemy.sql.expression.Select): Query to explain
+
+        Returns:
+            list: lines of the query plan
+        """
+        sql = str(query.compile(
+            dialect=self.engine.dialect, compile_kwargs={'literal_binds': True}
+        ))
+
+        if self.is_sqlite():
+            return [row[-1] for row in self.engine.execute('EXPLAIN QUERY PLAN ' + sql)]
+        elif self.is_postgresql():
+            return [row[0] for row in self.engine.execute('EXPLAIN ' + sql)]
+        elif self.is_mysql():
+            return [
+                '{}: type={}, key={}'.format(row['table'], row['type'], row['key'])
+                for row in self.engine.execute('EXPLAIN ' + sql)
+            ]
+
+        return []
+
+    def is_full_scan(self, plan):
+        """Check if a query plan reads every row of a table instead of using an index.
+
+        Args:
+            plan (list): lines of the query plan
+
+        Returns:
+            boolean
+        """
+        for line in plan:
+            if self.is_sqlite() and line.startswith('SCAN') and 'USING' not in line:
+                return True
+            elif self.is_postgresql() and 'Seq Scan' in line:
+                return True
+            elif self.is_mysql() and 'type=ALL' in line:
+                return True
+
+        return False
+
     def get_add_column_sql(self, table, column):
         """Get SQL for adding a column to a table.
 
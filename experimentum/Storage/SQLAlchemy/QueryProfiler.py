@@ -0,0 +1,164 @@
+"""Time the SQL statements of the data store and attribute them to the repository methods.
+
+The :py:class:`.QueryProfiler` listens to the cursor events of a SQLAlchemy engine and
+measures the execution time of every statement. Each statement is attributed to the
+outermost public method of a :py:class:`.Repository` which caused it, e.g.
+``TestCaseRepository.create``. Statements which load a relationship are attributed to
+the relationship instead, e.g. ``ExperimentRepository.tests (relationship)``, and all
+other statements, e.g. of the migrations, to ``other``.
+
+The profiler keeps the number of statements and their total and slowest time for each
+caller, as well as the slowest statements of all callers.
+
+Example:
+
+.. code-block:: python
+
+    profiler = QueryProfiler(slowest=5)
+    profiler.start(store.engine)
+
+    TestCaseRepository.get(where=['experiment_id', 1])
+
+    profiler.stop()
+    print(profiler.export())
+"""
+from sqlalchemy import event
+from sqlalchemy.orm.strategies import AbstractRelationshipLoader
+from experimentum.Storage.SQLAlchemy.Repository import Repository
+from timeit import default_timer
+import collections
+import threading
+import heapq
+import sys
+
+
+class QueryProfiler(object):
+
+    """Time the SQL statements of an engine per repository method.
+
+    Attributes:
+        slowest (int): Number of slowest statements to keep.
+        engine (sqlalchemy.engine.Connectable): Engine or connection the profiler listens to.
+    """
+
+    def __init__(self, slowest=5):
+        """Init profiler.
+
+        Args:
+            slowest (int, optional): Defaults to 5. Number of slowest statements to keep.
+        """
+        self.slowest = slowest
+        self.engine = None
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Discard all timed statements."""
+        with self._lock:
+            self._stats = collections.OrderedDict()
+            self._slowest = []
+            self._count = 0
+
+    def start(self, engine):
+        """Start timing the statements of an engine.
+
+        Args:
+            engine (sqlalchemy.engine.Connectable): Engine or connection to listen to.
+        """
+        self.stop()
+        self.engine = engine
+        event.listen(engine, 'before_cursor_execute', self._before_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_execute)
+
+    def stop(self):
+        """Stop timing the statements, if the profiler listens to an engine."""
+        if self.engine is None:
+            return
+
+        event.remove(self.engine, 'before_cursor_execute', self._before_execute)
+        event.remove(self.engine, 'after_cursor_execute', self._after_execute)
+        self.engine = None
+
+    def export(self):
+        """Export the timed statements.
+
+        Returns:
+            dict: Statistics of each caller as ``callers``, sorted by their total time, and
+            the slowest statements as ``slowest``.
+        """
+        with self._lock:
+            callers = [
+                {
+                    'caller': caller,
+                    'count': stats['count'],
+                    'total_time': stats['total_time'],
+                    'mean_time': stats['total_time'] / stats['count'],
+                    'max_time': stats['max_time']
+                } for caller, stats in self._stats.items()
+            ]
+            slowest = [
+                {'caller': caller, 'time': duration, 'statement': statement}
+                for duration, _, caller, statement in sorted(self._slowest, reverse=True)
+            ]
+
+        return {
+            'callers': sorted(callers, key=lambda row: row['total_time'], reverse=True),
+            'slowest': slowest
+        }
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Remember the start time and caller of a statement on its connection.
+
+        Statements can be nested, e.g. by a flush while loading, so a stack is used.
+        """
+        conn.info.setdefault('experimentum_queries', []).append(
+            (default_timer(), self.get_caller(sys._getframe(1)))
+        )
+
+    def _after_execute(self, conn, cursor, statement, parameters, context, executemany):
+        """Add the execution time of a statement to the statistics of its caller."""
+        start, caller = conn.info['experimentum_queries'].pop()
+        duration = default_timer() - start
+
+        with self._lock:
+            stats = self._stats.setdefault(caller, {'count': 0, 'total_time': 0, 'max_time': 0})
+            stats['count'] += 1
+            stats['total_time'] += duration
+            stats['max_time'] = max(stats['max_time'], duration)
+
+            # Keep the n slowest statements, the counter breaks ties of equal times
+            self._count += 1
+            item = (duration, self._count, caller, ' '.join(statement.split()))
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, item)
+            elif self.slowest > 0 and item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    @staticmethod
+    def get_caller(frame):
+        """Get the repository method or relationship which caused a statement.
+
+        Args:
+            frame (frame): Frame which executes the statement.
+
+        Returns:
+            str: Caller, e.g. ``TestCaseRepository.create``, or ``other``.
+        """
+        caller = 'other'
+
+        while frame is not None:
+            module = frame.f_globals.get('__name__')
+
+            if module == 'sqlalchemy.orm.strategies' and caller == 'other':
+                loader = frame.f_locals.get('self')
+                if isinstance(loader, AbstractRelationshipLoader):
+                    return '{}.{} (relationship)'.format(loader.parent.class_.__name__, loader.key)
+            elif module == Repository.__module__ and not frame.f_code.co_name.startswith('_'):
+                owner = frame.f_locals.get('cls', frame.f_locals.get('self'))
+                owner = type(owner) if isinstance(owner, Repository) else owner
+                if isinstance(owner, type) and issubclass(owner, Repository):
+                    caller = '{}.{}'.format(owner.__name__, frame.f_code.co_name)
+
+            frame = frame.f_back
+
+        return caller
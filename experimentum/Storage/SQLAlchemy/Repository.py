@@ -3,61 +3,285 @@
 Implements the AbstractRepository interface to use the
 SQLAlchemy ORM as a data store.
 """
-from sqlalchemy.orm import mapper, relationship
+from sqlalchemy.orm import mapper, relationship, Load
+from sqlalchemy.orm.interfaces import ONETOMANY
 from sqlalchemy.event import listen
-from sqlalchemy import or_
+from sqlalchemy import and_, or_, inspect, func
 from experimentum.Storage import AbstractRepository
+from decimal import Decimal
+from itertools import islice
+import numpy as np
 import logging
+import six
+
+# Loading strategies of relationships and the matching loader options
+_LOADERS = {
+    'select': 'lazyload',
+    'selectin': 'selectinload',
+    'joined': 'joinedload',
+    'subquery': 'subqueryload',
+    'noload': 'noload',
+    'raise': 'raiseload'
+}
+
+# Aggregate functions which can be selected by a query
+_AGGREGATES = {
+    'count': func.count,
+    'avg': func.avg,
+    'min': func.min,
+    'max': func.max,
+    'sum': func.sum
+}
+
+# Logical operators of nested where conditions
+_GROUPS = {
+    'and': and_,
+    'or': or_
+}
+
+# Operators of the where conditions
+_OPERATORS = {
+    '==': lambda left, right: left == right,
+    '!=': lambda left, right: left != right,
+    '<>': lambda left, right: left != right,
+    '>': lambda left, right: left > right,
+    '<': lambda left, right: left < right,
+    '>=': lambda left, right: left >= right,
+    '<=': lambda left, right: left <= right,
+    'in': lambda left, right: left.in_(right),
+    'not in': lambda left, right: left.notin_(right),
+    'between': lambda left, right: left.between(right[0], right[1]),
+    'like': lambda left, right: left.like(right),
+    'not like': lambda left, right: left.notlike(right),
+    'is': lambda left, right: left.is_(right),
+    'is not': lambda left, right: left.isnot(right)
+}
+
+
+def _compare(left, operator, right):
+    """Compare a column with a value.
 
+    Args:
+        left (object): Left-Hand value, i.e. the column
+        operator (string): operator to use, e.g. ``==``, ``in`` or ``between``
+        right (object): Right-Hand value
+
+    Raises:
+        TypeError: if the operator does not exist.
+
+    Returns:
+        sqlalchemy.sql.elements.ClauseElement: Condition
+    """
+    operator = operator.lower()
+
+    if operator not in _OPERATORS:
+        raise TypeError('Operator {} does not exist.'.format(operator))
+
+    return _OPERATORS[operator](left, right)
 
-def _append_query_filter(filterList, operator, left, right):
-    """Append a query condition to a filter list.
+
+def _chunks(items, size):
+    """Split a list into chunks.
 
     Args:
-        filterList (list): List with query filters
-        operator (string): operator to use
-        left (object): Left-Hand value
-        right (object): Right-Hand value
+        items (list): List to split
+        size (int): Size of the chunks
+
+    Yields:
+        list: chunk of items
+    """
+    for idx in range(0, len(items), size):
+        yield items[idx:idx + size]
+
+
+def _same_keys(rows):
+    """Split rows into groups of consecutive rows with the same keys.
+
+    An executemany-style statement is compiled from the keys of its first row, so rows
+    with other keys must not share a statement.
+
+    Args:
+        rows (list): List of dictionaries
+
+    Yields:
+        list: group of rows
+    """
+    group = []
+    for row in rows:
+        if group and set(row) != set(group[0]):
+            yield group
+            group = []
+        group.append(row)
+
+    if group:
+        yield group
+
+
+def _keyset_chunks(query, column, chunk_size):
+    """Fetch the results of a query in chunks ordered by a unique column.
+
+    Each chunk continues after the last value of the previous chunk, so unlike
+    ``OFFSET`` the database does not have to skip the already fetched rows.
+
+    Args:
+        query (sqlalchemy.orm.query.Query): Query
+        column (sqlalchemy.schema.Column): Unique column, i.e. the primary key
+        chunk_size (int): Number of results per chunk
+
+    Yields:
+        list: chunk of results
+    """
+    query = query.order_by(column)
+    chunk = query.limit(chunk_size).all()
+
+    while chunk:
+        yield chunk
+
+        if len(chunk) < chunk_size:
+            break
+
+        last = inspect(chunk[-1]).identity[0]
+        chunk = query.filter(column > last).limit(chunk_size).all()
+
+
+def _relationship_paths(repo, strategy, prefix='', seen=None):
+    """Get the paths of all relationships of a repository and its related repositories.
+
+    Args:
+        repo (Repository): Repository
+        strategy (str): Loading strategy for all relationships
+        prefix (str, optional): Defaults to ''. Path of the repository
+        seen (set, optional): Defaults to None. Repositories on the current path
+
+    Returns:
+        dict: Loading strategy for each relationship path
+    """
+    seen = (seen or set()) | set([repo])
+    paths = {}
+
+    for key, relation in repo.__relationships__.items():
+        if relation[0] in seen:
+            continue
+
+        path = prefix + key
+        paths[path] = strategy
+        paths.update(_relationship_paths(relation[0], strategy, path + '.', seen))
+
+    return paths
+
+
+def _dtype(column_type):
+    """Get the NumPy data type of a column type.
+
+    Args:
+        column_type (sqlalchemy.types.TypeEngine): Type of the column
+
+    Returns:
+        str: NumPy data type or None if it has to be inferred from the values
+    """
+    try:
+        python_type = column_type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+    if issubclass(python_type, bool):
+        return '?'
+    if issubclass(python_type, six.integer_types):
+        return 'i8'
+    if issubclass(python_type, (float, Decimal)):
+        return 'f8'
+
+    return 'O'
+
+
+def _to_array(values, dtype):
+    """Convert the values of a column to a NumPy array.
+
+    Args:
+        values (tuple): Values of the column
+        dtype (str): NumPy data type or None to infer it from the values
 
     Returns:
-        list
+        numpy.ndarray: Array with the values
     """
-    if operator == '!=' or operator == '<>':
-        filterList.append(left != right)
-    elif operator == '==':
-        filterList.append(left == right)
-    elif operator == '>':
-        filterList.append(left > right)
-    elif operator == '<':
-        filterList.append(left < right)
-    elif operator == '>=':
-        filterList.append(left >= right)
-    elif operator == '<=':
-        filterList.append(left <= right)
-
-    return filterList
+    # NULL values of integer and boolean columns become nan
+    if dtype in ('i8', '?') and None in values:
+        dtype = 'f8'
+
+    return np.array(values, dtype=dtype)
 
 
 class QueryBuilder(object):
 
     """Helper Class to build a SQLAlchemy Query.
 
+    A where condition is a list of the column, the operator and the value, e.g.
+    ``['iteration', '>', 100]``, or only the column and the value to test for equality.
+    The operators ``==``, ``!=``, ``<>``, ``<``, ``>``, ``<=``, ``>=``, ``in``, ``not in``,
+    ``between``, ``like``, ``not like``, ``is`` and ``is not`` are supported. Several
+    conditions are connected with a logical AND, conditions prefixed with ``or`` with a
+    logical OR. Conditions can be grouped and nested with ``['and', [...]]`` and
+    ``['or', [...]]``. Columns of related repositories are referenced by the path of the
+    relationship, e.g. ``tests.iteration``::
+
+        # WHERE id IN (1, 2, 3) AND (config_file IS NULL OR name LIKE 'foo%')
+        # AND EXISTS (SELECT 1 FROM testcases WHERE iteration BETWEEN 100 AND 500 AND ...)
+        ExperimentRepository.get(where=[
+            ['id', 'in', [1, 2, 3]],
+            ['or', [['config_file', 'is', None], ['name', 'like', 'foo%']]],
+            ['tests.iteration', 'between', [100, 500]]
+        ])
+
+    Besides the where conditions, the query builder can select single columns and
+    aggregate functions, group, order and limit the results, so the data store does the
+    work instead of python::
+
+        # SELECT label, avg(time) AS avg_time FROM performances
+        # WHERE test_id = 1 GROUP BY label ORDER BY avg_time DESC LIMIT 10
+        PerformanceRepository.get(
+            where=['test_id', 1],
+            select=['label', ['avg', 'time']],
+            group_by='label',
+            order_by='-avg_time',
+            limit=10
+        )
+
+    Columns are selected by their name. Aggregate functions (``count``, ``avg``, ``min``,
+    ``max`` and ``sum``) are selected as a list of the function, the column and optionally
+    a label, which defaults to ``<function>_<column>``, e.g. ``['avg', 'time', 'mean']``.
+    ``['count']`` counts all rows. The results are ordered by columns or labels, prefixed
+    with a ``-`` for descending order.
+
     Attributes:
         repo (Repository): The Repository to query
         where (list): where condition to build
+        select (list): columns and aggregate functions to select
+        group_by (list): columns to group by
+        order_by (list): columns or labels to order by
+        limit (int): maximum number of results
+        offset (int): number of results to skip
         __filter_cond (list): Filter Conditions
         __filter_cond_or (list): Filter Conditions that are connected with logical OR
+        __labels (dict): Selected aggregate functions by their label
     """
 
-    def __init__(self, repo, where):
+    def __init__(self, repo, where, select=None, group_by=None, order_by=None, limit=None,
+                 offset=None):
         """Set up query builder.
 
         Args:
             repo (Repository): Repository to query.
             where (list): where condition to build.
+            select (list, optional): Defaults to None. Columns and aggregate functions
+                to select instead of whole entries.
+            group_by (list|str, optional): Defaults to None. Columns to group by.
+            order_by (list|str, optional): Defaults to None. Columns or labels to order by.
+            limit (int, optional): Defaults to None. Maximum number of results.
+            offset (int, optional): Defaults to None. Number of results to skip.
         """
         self.__filter_cond = []
         self.__filter_cond_or = []
+        self.__labels = {}
 
         self.repo = repo
 
@@ -67,6 +291,11 @@ class QueryBuilder(object):
             where = [where]
 
         self.where = where
+        self.select = select or []
+        self.group_by = [group_by] if isinstance(group_by, six.string_types) else group_by or []
+        self.order_by = [order_by] if isinstance(order_by, six.string_types) else order_by or []
+        self.limit = limit
+        self.offset = offset
 
     def build(self, query):
         """Build the query.
@@ -77,7 +306,121 @@ class QueryBuilder(object):
         Returns:
             sqlalchemy.orm.query.Query: Final query
         """
+        query = self.build_select(query)
         query = self.build_where(query)
+        query = self.build_group_by(query)
+        query = self.build_order_by(query)
+        query = self.build_limit(query)
+        return query
+
+    def column(self, name, repo=None):
+        """Get a column of the repository by its name.
+
+        Args:
+            name (str): Name of the column
+            repo (Repository, optional): Defaults to None. Repository of the column,
+                if it is not the queried repository.
+
+        Raises:
+            TypeError: if the column does not exist.
+
+        Returns:
+            sqlalchemy.orm.attributes.InstrumentedAttribute: Column
+        """
+        column = getattr(repo or self.repo, name, None)
+        if column is None:
+            raise TypeError('Column {} does not exist.'.format(name))
+
+        return column
+
+    def build_select(self, query):
+        """Build the query with the selected columns and aggregate functions.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Current Query
+
+        Raises:
+            TypeError: if an aggregate function does not exist.
+
+        Returns:
+            sqlalchemy.orm.query.Query: Query which selects the columns.
+        """
+        if not self.select:
+            return query
+
+        columns = []
+        for item in self.select:
+            # 'label' => SELECT label
+            if isinstance(item, six.string_types):
+                columns.append(self.column(item))
+                continue
+
+            # ['avg', 'time', 'mean'] => SELECT avg(time) AS mean
+            if item[0] not in _AGGREGATES:
+                raise TypeError('Aggregate function {} does not exist.'.format(item[0]))
+
+            if len(item) == 1:
+                expr, label = _AGGREGATES[item[0]](), item[0]
+            else:
+                expr = _AGGREGATES[item[0]](self.column(item[1]))
+                label = item[2] if len(item) > 2 else '{}_{}'.format(item[0], item[1])
+
+            self.__labels[label] = expr.label(label)
+            columns.append(self.__labels[label])
+
+        return query.with_entities(*columns)
+
+    def build_group_by(self, query):
+        """Build the query with the group by columns.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Current Query
+
+        Returns:
+            sqlalchemy.orm.query.Query: Query with the results grouped.
+        """
+        if not self.group_by:
+            return query
+
+        return query.group_by(*[self.column(name) for name in self.group_by])
+
+    def build_order_by(self, query):
+        """Build the query with the order by columns.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Current Query
+
+        Returns:
+            sqlalchemy.orm.query.Query: Query with the results ordered.
+        """
+        if not self.order_by:
+            return query
+
+        clauses = []
+        for name in self.order_by:
+            # '-time' => ORDER BY time DESC
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            column = self.__labels.get(name)
+            column = self.column(name) if column is None else column
+            clauses.append(column.desc() if descending else column.asc())
+
+        return query.order_by(*clauses)
+
+    def build_limit(self, query):
+        """Build the query with the limit and offset.
+
+        Args:
+            query (sqlalchemy.orm.query.Query): Current Query
+
+        Returns:
+            sqlalchemy.orm.query.Query: Query with the number of results limited.
+        """
+        if self.limit is not None:
+            query = query.limit(self.limit)
+        if self.offset is not None:
+            query = query.offset(self.offset)
+
         return query
 
     def build_where(self, query):
@@ -90,39 +433,74 @@ class QueryBuilder(object):
             sqlalchemy.orm.query.Query: Query with where conditions applied.
         """
         for cond in self.where:
-            # ['id', 2] => WHERE id == 2
-            if len(cond) == 2:
-                self.__filter_cond.append(getattr(self.repo, cond[0]) == cond[1])
             # ['or', 'id', 2] => WHERE id == 2 OR ...
-            elif len(cond) == 3 and cond[0] == 'or':
-                self.__filter_cond_or.append(getattr(self.repo, cond[1]) == cond[2])
-            # ['id', '!=', 2] => WHERE id != 2
-            elif (len(cond) == 3 and cond[0] != 'or'):
-                operator = len(cond) - 2
-                left = operator - 1
-                right = operator + 1
-
-                self.__filter_cond = _append_query_filter(
-                    self.__filter_cond,
-                    cond[operator],
-                    getattr(self.repo, cond[left]),
-                    cond[right]
-                )
-            # ['or', 'id', '==', 2] => WHERE id == 2 OR
-            elif len(cond) == 4 and cond[0] == 'or':
-                operator = len(cond) - 2
-                left = operator - 1
-                right = operator + 1
-
-                self.__filter_cond_or = _append_query_filter(
-                    self.__filter_cond_or,
-                    cond[operator],
-                    getattr(self.repo, cond[left]),
-                    cond[right]
-                )
+            if len(cond) > 2 and cond[0] == 'or':
+                self.__filter_cond_or.append(self.build_condition(cond[1:]))
+            elif cond:
+                self.__filter_cond.append(self.build_condition(cond))
 
         return query.filter(*self.__filter_cond).filter(or_(*self.__filter_cond_or))
 
+    def build_condition(self, cond):
+        """Build a single where condition or a group of conditions.
+
+        Args:
+            cond (list): Condition, e.g. ``['id', 'in', [1, 2]]`` or a group of
+                conditions, e.g. ``['or', [['id', 1], ['name', 'foo']]]``.
+
+        Raises:
+            TypeError: if the condition is invalid.
+
+        Returns:
+            sqlalchemy.sql.elements.ClauseElement: Condition
+        """
+        # ['or', [['id', 2], ['id', 3]]] => WHERE (id == 2 OR id == 3)
+        if len(cond) == 2 and cond[0] in _GROUPS and isinstance(cond[1], list):
+            group = cond[1] if cond[1] and isinstance(cond[1][0], list) else [cond[1]]
+            return _GROUPS[cond[0]](*[self.build_condition(item) for item in group])
+
+        # ['id', 2] => WHERE id == 2
+        if len(cond) == 2:
+            return self.build_predicate(self.repo, cond[0], '==', cond[1])
+
+        # ['id', '!=', 2] => WHERE id != 2
+        if len(cond) == 3:
+            return self.build_predicate(self.repo, cond[0], cond[1], cond[2])
+
+        raise TypeError('Invalid where condition {}.'.format(cond))
+
+    def build_predicate(self, repo, path, operator, value):
+        """Build the predicate of a column or of a column of a related repository.
+
+        A path like ``tests.iteration`` refers to the ``iteration`` column of the ``tests``
+        relationship. The predicate is satisfied if any of the related entries satisfies it.
+
+        Args:
+            repo (Repository): Repository of the column
+            path (str): Name of the column or path to the column of a related repository
+            operator (str): operator to use
+            value (object): Value to compare with
+
+        Raises:
+            TypeError: if the relationship or column does not exist.
+
+        Returns:
+            sqlalchemy.sql.elements.ClauseElement: Condition
+        """
+        name, _, rest = path.partition('.')
+
+        if not rest:
+            return _compare(self.column(name, repo), operator, value)
+
+        if name not in repo.__relationships__:
+            raise TypeError('Relationship {} does not exist.'.format(name))
+
+        relation = getattr(repo, name)
+        predicate = self.build_predicate(repo.__relationships__[name][0], rest, operator, value)
+
+        # EXISTS subquery for one-to-many and many-to-many, else join the related entry
+        return relation.any(predicate) if relation.property.uselist else relation.has(predicate)
+
 
 class Repository(AbstractRepository):
 
@@ -154,12 +532,26 @@ class Repository(AbstractRepository):
     def update(self):
         """Update the repository content in your data store.
 
+        The entry is added to the session again, in case it was released before.
+
         Returns:
             Repository: Self Instance.
         """
+        self.store.session.add(self)
         self.store.session.commit()
         return self
 
+    def release(self):
+        """Release the saved entry from the session according to the session policy.
+
+        See :py:meth:`.Store.set_session_policy` for the available policies.
+
+        Returns:
+            Repository: Self Instance.
+        """
+        self.store.release(self)
+        return self
+
     def delete(self):
         """Delete the repository content from your data store.
 
@@ -171,52 +563,341 @@ class Repository(AbstractRepository):
         return self
 
     @classmethod
-    def get(cls, where=None):
+    def bulk_create(cls, records, chunk_size=1000):
+        """Save many records and the records of their relationships at once.
+
+        In contrast to :py:meth:`.create` no repository instances are created. The records
+        are inserted with executemany-style statements in a single transaction, therefore the
+        repository events like :py:meth:`~.AbstractRepository.before_insert` are not called.
+
+        Example::
+
+            TestCaseRepository.bulk_create([
+                {'iteration': 1, 'experiment_id': 2, 'performances': [{'label': 'foo', ...}]},
+                {'iteration': 2, 'experiment_id': 2, 'performances': [{'label': 'foo', ...}]},
+            ])
+
+        Args:
+            records (list): List of dictionaries with the repository data.
+            chunk_size (int, optional): Defaults to 1000. Number of rows per statement.
+
+        Returns:
+            int: Number of inserted records (without relationships).
+        """
+        with cls.store.engine.begin() as conn:
+            cls._bulk_insert(conn, records, chunk_size)
+
+        return len(records)
+
+    @classmethod
+    def _bulk_insert(cls, conn, records, chunk_size):
+        """Insert records and their relationships with executemany-style statements.
+
+        Only rows with relationships are inserted one by one, because the generated
+        primary key is needed to set the foreign keys of their related records. Consecutive
+        rows with the same columns share a statement, so that no column of a row is lost.
+
+        Args:
+            conn (sqlalchemy.engine.Connection): Connection with an open transaction.
+            records (list): List of dictionaries with the repository data.
+            chunk_size (int): Number of rows per statement.
+
+        Raises:
+            TypeError: if records contain a relationship which is not one-to-many.
+        """
+        table = cls.store.meta.tables.get(cls.__table__)
+        relations = inspect(cls).relationships
+        children = {key: [] for key in cls.__relationships__}
+
+        # Only the foreign keys of one-to-many relationships can be set on the related records
+        for key in children:
+            if relations[key].direction is not ONETOMANY and any(key in rec for rec in records):
+                raise TypeError('Relationship {} can not be bulk created, it is not one-to-many.'
+                                .format(key))
+
+        cls._warn_unknown_columns(table, records)
+
+        for chunk in _chunks(records, chunk_size):
+            rows = [{k: v for k, v in rec.items() if k in table.columns} for rec in chunk]
+
+            if not any(key in rec for rec in chunk for key in children):
+                for group in _same_keys(rows):
+                    conn.execute(table.insert(), group)
+                continue
+
+            for record, row in zip(chunk, rows):
+                result = conn.execute(table.insert(), row)
+                keys = zip([col.name for col in table.primary_key.columns],
+                           result.inserted_primary_key)
+                row.update(keys)
+                cls._add_children(children, record, row)
+
+        for key, related in children.items():
+            if related:
+                cls.__relationships__[key][0]._bulk_insert(conn, related, chunk_size)
+
+    @classmethod
+    def _warn_unknown_columns(cls, table, records):
+        """Warn about keys of records which are neither a column nor a relationship.
+
+        Args:
+            table (sqlalchemy.Table): Table of the repository.
+            records (list): List of dictionaries with the repository data.
+        """
+        unknown = set(k for rec in records for k in rec if k not in table.columns) \
+            - set(cls.__relationships__)
+        if unknown:
+            logging.getLogger('experimentum').warning(
+                'Columns do not exist in table {}, ignoring: {}'.format(
+                    cls.__table__, ', '.join(sorted(unknown))
+                )
+            )
+
+    @classmethod
+    def _add_children(cls, children, record, row):
+        """Set the foreign keys of the related records of an inserted row.
+
+        Args:
+            children (dict): Related records of each relationship, which are inserted later.
+            record (dict): Inserted record with its related records.
+            row (dict): Inserted row with its primary key.
+        """
+        relations = inspect(cls).relationships
+
+        for key in children:
+            related = record.get(key, [])
+            related = related if isinstance(related, list) else [related]
+            pairs = relations[key].synchronize_pairs
+            children[key].extend(
+                dict(rel, **{dest.name: row[src.name] for src, dest in pairs})
+                for rel in related
+            )
+
+    @classmethod
+    def _query(cls, load=None):
+        """Start a query with loading strategies for the relationships.
+
+        Args:
+            load (dict|str, optional): Defaults to None. Loading strategy for each
+                relationship path, e.g. ``{'tests': 'selectin', 'tests.performances': 'joined'}``,
+                or one strategy for all relationships, e.g. ``'selectin'``.
+
+        Returns:
+            sqlalchemy.orm.query.Query: Query
+        """
+        query = cls.store.session.query(cls)
+        options = cls._load_options(load)
+
+        return query.options(*options) if options else query
+
+    @classmethod
+    def _load_options(cls, load):
+        """Build the loader options for the relationships.
+
+        Args:
+            load (dict|str): Loading strategy for each relationship path or for all relationships.
+
+        Raises:
+            TypeError: if a relationship or loading strategy does not exist.
+
+        Returns:
+            list: Loader options
+        """
+        if not load:
+            return []
+
+        if isinstance(load, six.string_types):
+            load = _relationship_paths(cls, load)
+
+        options = []
+        for path in sorted(load):
+            option = Load(cls)
+            repo = cls
+            parts = path.split('.')
+
+            for idx, key in enumerate(parts):
+                if key not in repo.__relationships__:
+                    raise TypeError('Relationship {} does not exist.'.format(path))
+
+                # Keep the strategy of the parent relationships along the path
+                strategy = load.get('.'.join(parts[:idx + 1]))
+                if strategy is not None and strategy not in _LOADERS:
+                    raise TypeError('Loading strategy {} does not exist.'.format(strategy))
+
+                loader = _LOADERS[strategy] if strategy is not None else 'defaultload'
+                option = getattr(option, loader)(getattr(repo, key))
+                repo = repo.__relationships__[key][0]
+
+            options.append(option)
+
+        return options
+
+    @classmethod
+    def get(cls, where=None, load=None, select=None, group_by=None, order_by=None, limit=None,
+            offset=None):
         """Get all entries which satisfy a specific condition from your data store.
 
         Args:
             where (list, optional): Defaults to None. Where Condition
+            load (dict|str, optional): Defaults to None. Loading strategies of the
+                relationships, which override the ones of the mapping.
+            select (list, optional): Defaults to None. Columns and aggregate functions to
+                select instead of whole entries, see :py:class:`.QueryBuilder`.
+            group_by (list|str, optional): Defaults to None. Columns to group by.
+            order_by (list|str, optional): Defaults to None. Columns or labels to order by,
+                prefixed with a ``-`` for descending order.
+            limit (int, optional): Defaults to None. Maximum number of results.
+            offset (int, optional): Defaults to None. Number of results to skip.
 
         Returns:
-            list: List of items which satisfy the condition.
+            list: List of items which satisfy the condition, or rows with the selected
+            columns if ``select`` is given.
         """
-        query = cls.store.session.query(cls)
-        builder = QueryBuilder(cls, where)
+        # Loading strategies only apply to whole entries
+        query = cls._query(None if select else load)
+        builder = QueryBuilder(cls, where, select, group_by, order_by, limit, offset)
 
         return builder.build(query)
 
     @classmethod
-    def first(cls, where=None):
+    def first(cls, where=None, load=None):
         """Get first entry which satisfy a specific condition from your data store.
 
         Args:
             where (list, optional): Defaults to None. Where Condition
+            load (dict|str, optional): Defaults to None. Loading strategies of the
+                relationships, which override the ones of the mapping.
 
         Returns:
             AbstractRepository: Item which satisfies the condition.
         """
-        return cls.get(where).first()
+        return cls.get(where, load).first()
 
     @classmethod
-    def find(cls, id):
+    def find(cls, id, load=None):
         """Find an entry of this repository based on its id.
 
         Args:
             id (int): ID to search for.
+            load (dict|str, optional): Defaults to None. Loading strategies of the
+                relationships, which override the ones of the mapping.
 
         Returns:
             AbstractRepository: Item which the concrete id
         """
-        return cls.first(where=['id', id])
+        return cls.first(where=['id', id], load=load)
 
     @classmethod
-    def all(cls):
+    def all(cls, load=None):
         """Get all entries for this specific repository from your data store.
 
+        Args:
+            load (dict|str, optional): Defaults to None. Loading strategies of the
+                relationships, which override the ones of the mapping.
+
         Returns:
             list: List of all entires
         """
-        return cls.store.session.query(cls).all()
+        return cls._query(load).all()
+
+    @classmethod
+    def iterate(cls, where=None, chunk_size=1000, load=None):
+        """Iterate over all entries which satisfy a condition in chunks.
+
+        Instead of loading the whole result at once, the entries are fetched in chunks
+        ordered by their primary key (keyset pagination), so only one chunk is in memory
+        at a time. The entries of a chunk are removed from the session once the next chunk
+        is fetched, i.e. changes have to be saved with :py:meth:`update` before that::
+
+            for performance in PerformanceRepository.iterate(['test_id', 'in', ids], 5000):
+                writer.writerow([performance.label, performance.time])
+
+        Repositories with a composite primary key are fetched with a server side cursor
+        (``yield_per``) instead, which does not support eagerly loaded collections.
+
+        Args:
+            where (list, optional): Defaults to None. Where Condition
+            chunk_size (int, optional): Defaults to 1000. Number of entries per chunk.
+            load (dict|str, optional): Defaults to None. Loading strategies of the
+                relationships, which override the ones of the mapping.
+
+        Yields:
+            Repository: Entry which satisfies the condition
+        """
+        query = cls.get(where, load)
+        primary_key = inspect(cls).primary_key
+        session = cls.store.session
+
+        if len(primary_key) == 1:
+            chunks = _keyset_chunks(query, primary_key[0], chunk_size)
+        else:
+            results = iter(query.yield_per(chunk_size))
+            chunks = iter(lambda: list(islice(results, chunk_size)), [])
+
+        for chunk in chunks:
+            for entry in chunk:
+                yield entry
+
+            for entry in chunk:
+                if entry in session:
+                    session.expunge(entry)
+
+    @classmethod
+    def to_arrays(cls, columns=None, where=None, structured=False, chunk_size=10000, **kwargs):
+        """Fetch columns into NumPy arrays without creating repository instances.
+
+        The rows are fetched from the database cursor in chunks and converted into one
+        typed array per column, e.g. ``int64`` for integer and ``float64`` for float columns.
+        Integer and boolean columns with ``NULL`` values become ``float64`` arrays with
+        ``nan``::
+
+            data = PerformanceRepository.to_arrays(['label', 'time'], ['test_id', 'in', ids])
+            plot.scatter(data['label'], data['time'])
+
+        Args:
+            columns (list, optional): Defaults to None. Columns and aggregate functions to
+                select, see :py:class:`.QueryBuilder`. Selects all columns if not given.
+            where (list, optional): Defaults to None. Where Condition
+            structured (bool, optional): Defaults to False. Return one structured array
+                instead of a dictionary of arrays.
+            chunk_size (int, optional): Defaults to 10000. Number of rows to fetch at once.
+            **kwargs: ``group_by``, ``order_by``, ``limit`` and ``offset`` of the query.
+
+        Returns:
+            dict|numpy.ndarray: Array of each column or structured array
+        """
+        columns = columns or [column.key for column in inspect(cls).column_attrs]
+        builder = QueryBuilder(cls, where, columns, **kwargs)
+        query = builder.build(cls.store.session.query(cls))
+        names = [column['name'] for column in query.column_descriptions]
+        dtypes = [_dtype(column['type']) for column in query.column_descriptions]
+        chunks = [[] for _ in names]
+
+        result = cls.store.session.execute(query.statement)
+        try:
+            rows = result.fetchmany(chunk_size)
+            while rows:
+                for idx, values in enumerate(zip(*rows)):
+                    chunks[idx].append(_to_array(values, dtypes[idx]))
+                rows = result.fetchmany(chunk_size)
+        finally:
+            result.close()
+
+        arrays = [
+            np.concatenate(chunk) if chunk else np.array([], dtype=dtypes[idx] or float)
+            for idx, chunk in enumerate(chunks)
+        ]
+
+        if not structured:
+            return dict(zip(names, arrays))
+
+        data = np.empty(len(arrays[0]) if arrays else 0, dtype=[
+            (str(name), array.dtype) for name, array in zip(names, arrays)
+        ])
+        for name, array in zip(names, arrays):
+            data[name] = array
+
+        return data
 
     @staticmethod
     def mapping(cls, store):
@@ -228,6 +909,12 @@ class Repository(AbstractRepository):
 
             Repository.mapping(UserRepository, store)
 
+        The second item of a relationship is either a dict with arguments for the SQLAlchemy
+        ``relationship`` function or the loading strategy of the relationship, i.e.
+        ``select`` *(default)*, ``selectin``, ``joined``, ``subquery``, ``noload`` or ``raise``::
+
+            __relationships__ = {'addresses': [AddressRepository, 'selectin']}
+
         Args:
             cls (AbstractRepository): Repository to map
             store (AbstractStore): Storage that is use
@@ -239,7 +926,9 @@ class Repository(AbstractRepository):
         try:
             relationships = {}
             for key, relation in cls.__relationships__.items():
-                if len(relation) == 2:
+                if len(relation) == 2 and isinstance(relation[1], six.string_types):
+                    relationships[key] = relationship(relation[0], lazy=relation[1])
+                elif len(relation) == 2:
                     relationships[key] = relationship(relation[0], **relation[1])
                 else:
                     relationships[key] = relationship(relation[0])
@@ -2,10 +2,85 @@
 
 SQLite does not provide complete range of all sql commands, therefore some tricks are needed
 to emulate the behavior. See: https://www.sqlite.org/omitted.html
+
+Tables are altered with the native ``ALTER TABLE`` statements whenever SQLite supports the
+changes, e.g. adding a nullable column or dropping a column without keys and indexes. Any
+other change rebuilds the table in one transaction, which copies the data only once.
+See: https://www.sqlite.org/lang_altertable.html#otheralter
+
+Each new SQLite connection is tuned with the :py:data:`PRAGMAS` profile, which is optimized
+for writing many small transactions, e.g. saving the results of each test run. The
+write-ahead log lets readers (e.g. the WebGUI) and the writer work at the same time, while
+``synchronous=NORMAL`` only syncs the log at checkpoints instead of on every commit.
+See: https://www.sqlite.org/pragma.html
 """
+import re
 import logging
+from contextlib import contextmanager
+from experimentum.cli import print_progress
 from experimentum.Storage.SQLAlchemy import Platform
-from sqlalchemy import Table, Index, ForeignKey
+from sqlalchemy import MetaData, Table, Index, ForeignKey, UniqueConstraint
+from sqlalchemy.engine import Connection
+from sqlalchemy.event import listen
+
+#: Default pragmas which are applied to every new SQLite connection
+PRAGMAS = [
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('mmap_size', 268435456),  # 256 MB
+    ('cache_size', -65536),  # 64 MB
+    ('temp_store', 'MEMORY'),
+    ('busy_timeout', 5000),  # ms
+]
+
+#: Oldest SQLite version which supports ``ALTER TABLE ... DROP COLUMN``
+DROP_COLUMN_VERSION = (3, 35, 0)
+
+
+def get_pragmas(profile=None):
+    """Merge a custom profile with the default pragmas.
+
+    Args:
+        profile (dict, optional): Defaults to None. Pragmas which override the default ones.
+            A pragma with the value None is not applied.
+
+    Raises:
+        TypeError: if a pragma name or value is invalid.
+
+    Returns:
+        list: Pragma names and values.
+    """
+    profile = dict(profile or {})
+    pragmas = [(key, profile.pop(key, value)) for key, value in PRAGMAS]
+    pragmas.extend(sorted(profile.items()))
+
+    for key, value in pragmas:
+        if not re.match(r'^\w+$', key) or not re.match(r'^-?\w+$', str(value)):
+            raise TypeError('Invalid SQLite pragma {} = {}'.format(key, value))
+
+    return [(key, value) for key, value in pragmas if value is not None]
+
+
+def set_pragmas(engine, profile=None):
+    """Apply the pragmas to every new connection of a SQLite engine.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): SQLite database engine.
+        profile (dict, optional): Defaults to None. Pragmas which override the default ones.
+
+    Returns:
+        list: Applied pragma names and values.
+    """
+    pragmas = get_pragmas(profile)
+
+    def connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for key, value in pragmas:
+            cursor.execute('PRAGMA {} = {}'.format(key, value))
+        cursor.close()
+
+    listen(engine, 'connect', connect)
+    return pragmas
 
 
 def prepare_columns(columns, indexes, dropped):
@@ -65,96 +140,244 @@ def prepare_columns(columns, indexes, dropped):
 
 class SQLitePlatform(Platform):
 
-    """SQLite specific sql commands and queries."""
+    """SQLite specific sql commands and queries.
+
+    Attributes:
+        chunk_size (int): Number of rows which are copied at once while rebuilding a table.
+    """
+
+    def __init__(self):
+        """Initialize platform."""
+        super(SQLitePlatform, self).__init__()
+        self.chunk_size = 100000
 
     def alter_table(self, table, cols, dropped):
         """Alter SQLite Table.
 
-        SQLite does not provide complete ALTER TABLE support, only RENAME TABLE and ADD COLUMN
-        variants are supported. In order to add columns and keys we have to create a tempory
-        table which holds the data of the table and then drop and recreate the table with
-        the modified schema. Lastly we have to copy the data back into the new table and
-        delete the temporary data table.
+        SQLite only supports the RENAME TABLE, ADD COLUMN and, since version 3.35, the DROP
+        COLUMN variants of ALTER TABLE. These are used if all changes are supported by them.
+        Otherwise the table is rebuilt in a single transaction: a new table with the modified
+        schema is created, the data is copied into it, the old table is dropped and the new
+        table is renamed. Lastly the indexes are recreated.
 
         See:
-        https://www.sqlite.org/omitted.html
+        https://www.sqlite.org/lang_altertable.html
 
         Args:
             table (str): Name of the table
             cols (list): List with changed columns
             dropped (dict): Dictionary with list of columns and indexes to drop
         """
-        # Prepare columns
-        old_table = self.meta.tables.get(table, Table(table, self.meta, autoload=True))
-        columns = prepare_columns(list(old_table.columns), list(old_table.indexes), dropped)
-        new_columns = columns['columns']
-        new_columns.extend(cols)
+        # Reflect the current schema, the metadata may be outdated by earlier changes
+        old_table = Table(table, MetaData(), autoload=True, autoload_with=self.engine)
 
-        # * CREATE TABLE $data_table AS SELECT ($old_cols) FROM $old_table;
-        data_table = self._create_table('__tmp__{}'.format(table), columns['columns'])
-        self._fill_table(data_table, columns['names'], old_table)
+        if self.supports_native_alter(old_table, cols, dropped):
+            self._alter_native(old_table, cols, dropped)
+        else:
+            self._rebuild_table(old_table, cols, dropped)
 
-        # * DROP TABLE $old_table;
-        old_table.drop(self.engine)
+    def supports_native_alter(self, table, cols, dropped):
+        """Check if the changes can be made with ALTER TABLE, without rebuilding the table.
 
-        # * CREATE TABLE $new_table ($old_columns + $new_columns);
-        self._create_table('__new__{}__'.format(table), new_columns)
-        self.engine.execute(self.get_rename_sql('__new__{}__'.format(table), table))
+        Args:
+            table (Table): The table to alter
+            cols (list): List with changed columns
+            dropped (dict): Dictionary with list of columns and indexes to drop
+
+        Returns:
+            boolean
+        """
+        indexes = [idx.name for idx in table.indexes]
+        for idx in dropped['indexes']:
+            if idx['type'] not in ('index', 'unique') or idx['name'] not in indexes:
+                return False
+
+        columns = [name for name in dropped['columns'] if name in table.columns]
+        if columns and self.engine.dialect.dbapi.sqlite_version_info < DROP_COLUMN_VERSION:
+            return False
+
+        dropped_indexes = [idx['name'] for idx in dropped['indexes']]
+        keys = [idx for idx in table.indexes if idx.name not in dropped_indexes]
+        keys.extend(key for key in table.constraints if isinstance(key, UniqueConstraint))
+        for name in columns:
+            column = table.columns[name]
+            if column.primary_key or column.foreign_keys or any(
+                name in key.columns.keys() for key in keys
+            ):
+                return False
+
+        return all(
+            isinstance(col, Index) or not any([
+                col.name in table.columns, col.primary_key, col.unique,
+                col.server_default is not None
+            ]) for col in cols
+        )
+
+    def get_add_column_sql(self, table, column):
+        """Get SQL for adding a column with its constraints to a table.
+
+        Args:
+            table (str): Name of the table
+            column (sqlalchemy.schema.Column): Column to add
+
+        Returns:
+            str
+        """
+        sql = 'ALTER TABLE {} ADD COLUMN {} {}'.format(
+            table, column.name, column.type.compile(self.engine.dialect)
+        )
+
+        if not column.nullable:
+            sql += ' NOT NULL'
 
-        # * INSERT INTO $new_table ($old_column) SELECT * FROM $data_table;
-        self._fill_table(table, columns['names'], data_table)
+        for fkey in column.foreign_keys:
+            actions = self.get_foreign_key_action_sql(fkey)
+            sql += ' {}REFERENCES {}({}) {} {}'.format(
+                'CONSTRAINT {} '.format(fkey.name) if fkey.name else '',
+                fkey.target_fullname.split('.')[0],
+                fkey.target_fullname.split('.')[1],
+                actions['on_delete'],
+                actions['on_update']
+            )
 
-        # * DROP TABLE $data_table;
-        data_table.drop(self.engine)
+        return sql.strip() + ';'
 
-    def _fill_table(self, target_tablename, columns, source_table):
-        """Fill a target table with values from a source table.
+    @staticmethod
+    def get_create_index_sql(table, index):
+        """Get SQL for creating an index.
 
         Args:
-            target_tablename (str): Table to be filled
-            columns (list): List of columns to be filled
-            source_table (str): Name of the source table
+            table (str): Name of the table
+            index (sqlalchemy.schema.Index): Index with columns or column names
+
+        Returns:
+            str
+        """
+        return 'CREATE {}INDEX {} ON {} ({});'.format(
+            'UNIQUE ' if index.unique else '',
+            index.name,
+            table,
+            ','.join(getattr(col, 'name', col) for col in index.expressions)
+        )
+
+    @contextmanager
+    def _transaction(self):
+        """Run statements, including DDL statements, in one transaction.
+
+        The sqlite3 module only begins a transaction before INSERT, UPDATE and DELETE
+        statements, so the transaction is started explicitly. The sqlite3 module of Python
+        versions before 3.6 commits before DDL statements anyway, so there the statements
+        are not run in one transaction. If the platform already uses a connection in a
+        transaction, e.g. while running several migrations, it is reused.
+
+        Yields:
+            sqlalchemy.engine.Connection: Connection in a transaction
         """
-        self.engine.execute('INSERT INTO {} ({}) SELECT {} FROM {}'.format(
-            target_tablename,
-            ','.join(columns),
-            ','.join(columns),
-            source_table
-        ))
+        if isinstance(self.engine, Connection) and self.engine.in_transaction():
+            yield self.engine
+            return
 
-    def _create_table(self, tablename, columns):
-        """Create a new table with columns and constraints.
+        with self.engine.begin() as conn:
+            if self.supports_transactional_ddl():
+                conn.execute('BEGIN')
+            yield conn
+
+    def _alter_native(self, table, cols, dropped):
+        """Alter a table with ALTER TABLE statements.
 
         Args:
-            tablename (str): Name of new table
-            columns (list): List of Columns
+            table (Table): The table to alter
+            cols (list): List with changed columns
+            dropped (dict): Dictionary with list of columns and indexes to drop
+        """
+        indexes = [col for col in cols if isinstance(col, Index)]
+        columns = [name for name in dropped['columns'] if name in table.columns]
 
-        Returns:
-            Table: newly created table
+        with self._transaction() as conn:
+            for idx in dropped['indexes']:
+                conn.execute('DROP INDEX {};'.format(idx['name']))
+
+            for sql in self.get_drop_columns_sql(table.name, columns):
+                conn.execute(sql)
+
+            for column in cols:
+                if not isinstance(column, Index):
+                    conn.execute(self.get_add_column_sql(table.name, column))
+
+            for index in indexes:
+                conn.execute(self.get_create_index_sql(table.name, index))
+
+    def _rebuild_table(self, table, cols, dropped):
+        """Rebuild a table with a modified schema and copy its data only once.
+
+        Args:
+            table (Table): The table to alter
+            cols (list): List with changed columns
+            dropped (dict): Dictionary with list of columns and indexes to drop
         """
-        table = Table(tablename, self.meta, extend_existing=True)
-        used_idx = []
+        columns = prepare_columns(list(table.columns), list(table.indexes), dropped)
+        new_columns = columns['columns'] + list(cols)
+        indexes = {}
 
-        for column in columns:
+        # * CREATE TABLE $new_table ($old_columns + $new_columns);
+        new_table = Table('__new__{}__'.format(table.name), self.meta, extend_existing=True)
+        for column in new_columns:
             if isinstance(column, Index):
-                # copy columns to avoid association with new table errors
-                idx_cols = [idx_col.copy() for idx_col in column.columns]
-
-                # Add index
-                if column.name not in used_idx:
-                    table.append_constraint(Index(column.name, *idx_cols, unique=column.unique))
-                    used_idx.append(column.name)
-
-                # Drop old index if exists to avoid naming conflicts
-                try:
-                    column.drop(self.engine)
-                except Exception as exc:
-                    # do not fail, just keep going - but log the error (just in case)
-                    logging.getLogger('experimentum').warning(
-                        'Error while recreating index: ' + str(exc)
-                    )
+                indexes.setdefault(column.name, column)
             else:
-                table.append_column(column.copy())
+                new_table.append_column(column.copy())
+
+        with self._transaction() as conn:
+            new_table.create(conn)
+
+            # * INSERT INTO $new_table ($old_columns) SELECT $old_columns FROM $old_table;
+            self._copy_rows(conn, table.name, new_table.name, columns['names'])
+
+            # * DROP TABLE $old_table; ALTER TABLE $new_table RENAME TO $old_table;
+            conn.execute('DROP TABLE {};'.format(table.name))
+            conn.execute(self.get_rename_sql(new_table.name, table.name))
+
+            for index in indexes.values():
+                conn.execute(self.get_create_index_sql(table.name, index))
+
+        self.meta.remove(new_table)
+
+    def _copy_rows(self, conn, source, target, columns):
+        """Copy rows from a source table into a target table in chunks of rows.
+
+        The chunks are paged by their rowids, i.e. each chunk starts after the last rowid of
+        the previous one, so gaps in the rowids do not cause empty chunks. A progress bar is
+        shown if more than one chunk has to be copied.
+
+        Args:
+            conn (sqlalchemy.engine.Connection): Connection in a transaction
+            source (str): Name of the source table
+            target (str): Name of the target table
+            columns (list): Names of the columns to copy
+        """
+        total, start = conn.execute('SELECT COUNT(*), MIN(rowid) FROM {}'.format(source)).first()
+        if not total:
+            return
+
+        last_sql = 'SELECT MAX(rowid) FROM (SELECT rowid FROM {} WHERE rowid >= ? ' \
+            'ORDER BY rowid LIMIT ?)'.format(source)
+        sql = 'INSERT INTO {target} ({columns}) SELECT {columns} FROM {source} ' \
+            'WHERE rowid >= ? AND rowid <= ?'.format(
+                target=target, columns=','.join(columns), source=source
+            )
+        show_progress = total > self.chunk_size
+        copied = 0
+
+        while copied < total:
+            last = conn.execute(last_sql, (start, self.chunk_size)).scalar()
+            if last is None:
+                break
+
+            copied += conn.execute(sql, (start, last)).rowcount
+            start = last + 1
 
-        table.create(self.engine, checkfirst=True)
-        return table
+            logging.getLogger('experimentum').debug(
+                'Copied rows {} of {} from {}'.format(copied, total, source)
+            )
+            if show_progress:
+                print_progress(copied, total, prefix='Copying {}:'.format(source), bar_length=50)
@@ -3,9 +3,16 @@
 Uses the SQLAlchemy ORM to implement the :py:mod:`.AbstractStore` interface.
 """
 from experimentum.Storage import AbstractStore
-from experimentum.Storage.SQLAlchemy import SQLitePlatform, Platform, ColumnFactory
-from sqlalchemy import inspect, MetaData, Table
-from sqlalchemy.orm import sessionmaker
+from experimentum.Storage.SQLAlchemy import SQLitePlatform, Platform, ColumnFactory, QueryProfiler
+from sqlalchemy import inspect, MetaData, Table, select, and_
+from sqlalchemy.orm import sessionmaker, scoped_session
+from six.moves import cPickle as pickle
+from contextlib import contextmanager
+from collections import OrderedDict
+import sqlalchemy
+import logging
+import gc
+import os
 
 
 class Store(AbstractStore):
@@ -18,6 +25,12 @@ class Store(AbstractStore):
         meta (sqlqlchemy.schema.MetaData): Defaults to None. Schema Meta Data.
         platform (Platform): Basic SQL Statements because SQLAlchemy could not handle everything.
         sqlite_platform (SQLitePlatform): SQLite specific sql statements.
+        session (sqlalchemy.orm.scoping.scoped_session): Session registry, which
+            provides a separate session for each thread.
+        session_policy (str): What happens to saved entries which are released, see
+            :py:meth:`set_session_policy`.
+        recycle_after (int): Number of released entries after which the session is recycled.
+        cache (str): Path of the file which caches the reflected metadata, None to disable it.
     """
 
     def __init__(self, app):
@@ -33,23 +46,227 @@ class Store(AbstractStore):
         self.engine = None
         self.meta = None
         self.session = None
+        self.session_policy = 'expunge'
+        self.recycle_after = 100
+        self.cache = None
+        self._released = 0
+        self._inspector = None
 
-    def set_engine(self, engine):
+    def set_engine(self, engine, scopefunc=None, cache=None, revision=''):
         """Set database engine, metadata store, and platform specific handlers.
 
+        Reflecting all tables takes a query per table, so the reflected metadata can be cached
+        in a file. The cache is only used if it was created for the same database and
+        migration revision, and it is deleted whenever the schema is changed by the store.
+
         Args:
             engine (sqlalchemy.engine.Engine): Database engine
+            scopefunc (callable, optional): Defaults to None. Function which returns the
+                key of the current scope, e.g. a task id. Uses one session per thread if omitted.
+            cache (str, optional): Defaults to None. Path of the metadata cache file.
+            revision (str, optional): Defaults to ''. Current migration revision(s).
         """
         self.engine = engine
-        self.meta = MetaData()
+        self.cache = cache
+        self._inspector = None
+        self.meta = self._load_metadata(revision)
         self.meta.bind = self.engine
-        self.meta.reflect()  # Reflecting All Tables at Once
         self.platform.set_engine(self.engine, self.meta)
         self.sqlite_platform.set_engine(self.engine, self.meta)
 
-        # Create session
-        session = sessionmaker(bind=engine)
-        self.session = session()
+        # Create session registry, so that threads do not share a session
+        self.session = scoped_session(
+            sessionmaker(bind=engine, expire_on_commit=self.session_policy == 'keep'),
+            scopefunc=scopefunc
+        )
+
+    def set_session_policy(self, policy, recycle_after=100):
+        """Set what happens to saved entries which are released by their repository.
+
+        Saved entries stay in the session until they are released, so that a long running
+        experiment would keep every saved test case in memory. The policies are:
+
+        ===========  ========================================================================
+        Policy       Description
+        ===========  ========================================================================
+        ``expunge``  Remove the entry and its related entries from the session.
+        ``recycle``  Close the session every ``recycle_after`` released entries and collect
+                     the garbage, so the freed memory is reclaimed between two measurements.
+        ``keep``     Keep the entries in the session.
+        ===========  ========================================================================
+
+        With ``expunge`` and ``recycle`` the session does not expire its entries on commit,
+        so released entries keep their loaded values and can still be used without a
+        session. ``keep`` uses the SQLAlchemy default, i.e. the entries are expired on commit
+        and reloaded when they are accessed again.
+
+        Args:
+            policy (str): Name of the policy, i.e. expunge, recycle or keep.
+            recycle_after (int, optional): Defaults to 100. Number of released entries after
+                which the session is recycled.
+
+        Raises:
+            TypeError: if the policy does not exist.
+        """
+        if policy not in ('expunge', 'recycle', 'keep'):
+            raise TypeError('Session policy {} does not exist.'.format(policy))
+
+        self.session_policy = policy
+        self.recycle_after = max(1, recycle_after)
+        self._released = 0
+
+        if self.session is not None:
+            self.session.remove()
+            self.session.configure(expire_on_commit=policy == 'keep')
+
+    def release(self, entry):
+        """Release a saved entry from the session according to the session policy.
+
+        Args:
+            entry (Repository): Saved entry.
+        """
+        if self.session_policy == 'expunge':
+            state = inspect(entry)
+            session = self.session()
+            related = [obj for obj, _, _, _ in state.mapper.cascade_iterator('save-update', state)]
+
+            for obj in [entry] + related:
+                if obj in session:
+                    session.expunge(obj)
+        elif self.session_policy == 'recycle':
+            self._released += 1
+            if self._released >= self.recycle_after:
+                self._released = 0
+                self.remove_session()
+                gc.collect()
+
+    def _load_metadata(self, revision):
+        """Load the metadata from the cache or reflect all tables and cache them.
+
+        Args:
+            revision (str): Current migration revision(s).
+
+        Returns:
+            sqlalchemy.schema.MetaData: Metadata of all tables
+        """
+        key = (revision, str(self.engine.url), sqlalchemy.__version__)
+
+        if self.cache and os.path.isfile(self.cache):
+            try:
+                with open(self.cache, 'rb') as cache:
+                    cached_key, meta = pickle.load(cache)
+                if cached_key == key:
+                    return meta
+            except Exception:
+                logging.getLogger('experimentum').warning('Could not load metadata cache.')
+
+        meta = MetaData()
+        meta.reflect(bind=self.engine)  # Reflecting All Tables at Once
+
+        if self.cache:
+            try:
+                with open(self.cache, 'wb') as cache:
+                    pickle.dump((key, meta), cache, pickle.HIGHEST_PROTOCOL)
+            except (IOError, OSError):
+                logging.getLogger('experimentum').warning('Could not write metadata cache.')
+
+        return meta
+
+    def invalidate_cache(self):
+        """Delete the cached metadata and inspector, because the schema has changed.
+
+        Schema changes made with the store invalidate the cache automatically. Call this
+        method after changing the schema directly with SQLAlchemy or plain SQL.
+        """
+        self._inspector = None
+
+        if self.cache and os.path.isfile(self.cache):
+            os.remove(self.cache)
+
+    @property
+    def inspector(self):
+        """Get the inspector of the database, which caches the reflected schema.
+
+        Returns:
+            sqlalchemy.engine.reflection.Inspector: inspector
+        """
+        if self._inspector is None:
+            self._inspector = inspect(self.engine)
+
+        return self._inspector
+
+    @contextmanager
+    def transaction(self):
+        """Run all schema changes in one transaction, if the database supports transactional DDL.
+
+        The store and its platforms use the connection of the transaction until the context is
+        left. The transaction is committed if no error occurred, otherwise it is rolled back and
+        the metadata is reflected again, so that it does not contain the rolled back changes.
+
+        Yields:
+            boolean: Whether the schema changes run in a transaction.
+        """
+        if not self.platform.supports_transactional_ddl():
+            if self.platform.is_sqlite():
+                logging.getLogger('experimentum').warning(
+                    'The sqlite3 module of this Python version commits before schema changes, '
+                    'they do not run in one transaction.'
+                )
+            yield False
+            return
+
+        engine = self.engine
+        try:
+            with engine.connect() as conn, conn.begin():
+                # The sqlite3 module does not begin a transaction before DDL statements
+                if self.platform.is_sqlite():
+                    conn.execute('BEGIN')
+
+                self._bind(conn)
+                yield True
+        except Exception:
+            self._bind(engine, reflect=True)
+            raise
+
+        self._bind(engine)
+
+    def _bind(self, bind, reflect=False):
+        """Execute the schema changes with another engine or connection.
+
+        Args:
+            bind (sqlalchemy.engine.Connectable): Engine or connection
+            reflect (bool, optional): Defaults to False. Whether to reflect the metadata again.
+        """
+        self.engine = bind
+        self._inspector = None
+
+        if reflect:
+            self.invalidate_cache()
+            self.meta = MetaData()
+            self.meta.reflect(bind=bind)
+            self.meta.bind = bind
+
+        self.platform.set_engine(bind, self.meta)
+        self.sqlite_platform.set_engine(bind, self.meta)
+
+    def profile(self, slowest=5):
+        """Time the SQL statements of the engine per repository method.
+
+        Args:
+            slowest (int, optional): Defaults to 5. Number of slowest statements to keep.
+
+        Returns:
+            QueryProfiler: Started profiler.
+        """
+        profiler = QueryProfiler(slowest)
+        profiler.start(self.engine)
+
+        return profiler
+
+    def remove_session(self):
+        """Close and discard the session of the current scope, e.g. when a thread is finished."""
+        if self.session is not None:
+            self.session.remove()
 
     def has_table(self, table):
         """Check if the data store has a specific table.
@@ -60,8 +277,7 @@ class Store(AbstractStore):
         Returns:
             boolean
         """
-        inspector = inspect(self.engine)
-        return table in inspector.get_table_names()
+        return table in self.inspector.get_table_names()
 
     def has_column(self, table, column):
         """Check if a table has a specific column.
@@ -73,8 +289,7 @@ class Store(AbstractStore):
         Returns:
             boolean
         """
-        inspector = inspect(self.engine)
-        columns = inspector.get_columns(table)
+        columns = self.inspector.get_columns(table)
         for col in columns:
             if col.get('name') == column:
                 return True
@@ -93,6 +308,8 @@ class Store(AbstractStore):
         """
         table = Table(name, self.meta)
         table.drop(self.engine, checkfirst=checkfirst)
+        self.meta.remove(table)
+        self.invalidate_cache()
 
     def drop_if_exists(self, name):
         """Drop a table from the datastore if it exists.
@@ -105,6 +322,8 @@ class Store(AbstractStore):
         """
         table = Table(name, self.meta)
         table.drop(self.engine, checkfirst=True)
+        self.meta.remove(table)
+        self.invalidate_cache()
 
     def rename(self, old, new):
         """Rename a table.
@@ -114,6 +333,7 @@ class Store(AbstractStore):
             new (str): New table name
         """
         self.engine.execute(self.platform.get_rename_sql(old, new))
+        self.invalidate_cache()
 
     def create(self, blueprint):
         """Create a new Table with Columns and indexes.
@@ -131,6 +351,7 @@ class Store(AbstractStore):
         # Create table
         table = Table(blueprint.table, self.meta, *data['columns'], extend_existing=True)
         table.create(self.engine, checkfirst=True)
+        self.invalidate_cache()
 
     def alter(self, blueprint):
         """Alter Schema of the table.
@@ -140,6 +361,7 @@ class Store(AbstractStore):
         """
         # Get columns and indexes
         data = self.factory.get_columns_and_indexes(blueprint)
+        self.invalidate_cache()
 
         # Alter SQLite Database
         if self.platform.is_sqlite():
@@ -162,7 +384,7 @@ class Store(AbstractStore):
         # Create indexes
         for index in data['indexes']:
             table.append_constraint(index)
-            index.create()
+            index.create(self.engine)
 
         # Drop indexes
         for drop_idx in blueprint.dropped['indexes']:
@@ -180,3 +402,83 @@ class Store(AbstractStore):
         )
         for sql in drop_sql:
             self.engine.execute(sql)
+
+    def analyze(self, repositories=None):
+        """Explain the lookups of foreign keys and relationships and find missing indexes.
+
+        A lookup selects the rows of a table by the columns of a foreign key or of a
+        relationship, just like loading the related entries of a repository or cascading a
+        delete does. A lookup misses an index if no index starts with its columns and the
+        query plan reads the whole table (or the database can not explain queries).
+
+        Args:
+            repositories (list, optional): Defaults to None. Repository classes whose
+                relationships are analyzed in addition to the foreign keys.
+
+        Returns:
+            list: Table, columns, query plan and whether an index is missing of each lookup
+        """
+        lookups = []
+
+        for table, columns in self._get_lookups(repositories or []):
+            query = select([table]).where(and_(*[table.c[col] == 1 for col in columns]))
+            plan = self.platform.explain(query)
+
+            lookups.append({
+                'table': table.name,
+                'columns': columns,
+                'plan': plan,
+                'missing': not self._is_indexed(table.name, columns) and (
+                    not plan or self.platform.is_full_scan(plan)
+                )
+            })
+
+        return lookups
+
+    def _get_lookups(self, repositories):
+        """Get the columns by which rows are looked up for foreign keys and relationships.
+
+        Args:
+            repositories (list): Repository classes
+
+        Returns:
+            list: tuples of table and column names
+        """
+        lookups = OrderedDict()
+
+        for table in self.meta.sorted_tables:
+            for fkey in table.foreign_key_constraints:
+                lookups[(table.name, tuple(fkey.column_keys))] = table
+
+        for repo in repositories:
+            mapper = inspect(repo, raiseerr=False)
+            if mapper is None:
+                continue
+
+            for relation in mapper.relationships:
+                columns = [remote for _, remote in relation.local_remote_pairs]
+                table = columns[0].table
+                lookups[(table.name, tuple(col.name for col in columns))] = table
+
+        return [(table, list(key[1])) for key, table in lookups.items()]
+
+    def _is_indexed(self, table, columns):
+        """Check if the columns are the first columns of the primary key or an index.
+
+        Args:
+            table (str): Name of the table
+            columns (list): Column names
+
+        Returns:
+            boolean
+        """
+        keys = [self.inspector.get_pk_constraint(table).get('constrained_columns', [])]
+        keys.extend(idx['column_names'] for idx in self.inspector.get_indexes(table))
+        try:
+            keys.extend(
+                key['column_names'] for key in self.inspector.get_unique_constraints(table)
+            )
+        except NotImplementedError:
+            pass  # not every dialect reflects unique constraints
+
+        return any(set(key[:len(columns)]) == set(columns) for key in keys)
@@ -4,4 +4,5 @@ from .Repository import Repository
 from .Platform import Platform
 from .SQLitePlatform import SQLitePlatform
 from .ColumnFactory import ColumnFactory
+from .QueryProfiler import QueryProfiler
 from .Store import Store
@@ -89,6 +89,17 @@ def create_app(container, test_config=None):
         """
         return render_template('404.jinja', msg=err), 404
 
+    # Release the data store session of the request thread
+    @app.teardown_appcontext
+    def remove_session(err=None):
+        """Remove the data store session of the current thread.
+
+        Args:
+            err (Exception, optional): Defaults to None. Unhandled exception of the request
+        """
+        if hasattr(container.store, 'remove_session'):
+            container.store.remove_session()
+
     # Add Blueprints
     from .views import dashboard, migrations, experiments, plots
     app.register_blueprint(dashboard.blueprint)
@@ -31,7 +31,7 @@ def run_experiment(exp_thread, capturer, experiment):
 
     yield 'data: {}\n\n'.format(json.dumps({'type': 'started'}))
 
-    while exp_thread.isAlive():
+    while exp_thread.is_alive():
         sleep(.1)  # artifical delay, otherwise loop runs to fast and misses some output :/
         error = capturer.has_error()
         content = capturer.get_text()
@@ -45,6 +45,12 @@ def run_experiment(exp_thread, capturer, experiment):
     # get performance table
     points = experiment.performance.export(metrics=True)
     table = ansi_escape(experiment.performance.formatter.get_table(points, 'html'))
+
+    # append the timed SQL statements
+    if experiment.performance.queries is not None:
+        queries = experiment.performance.queries.export()
+        table += ansi_escape(experiment.performance.formatter.get_query_table(queries, 'html'))
+
     yield 'data: {}\n\n'.format(json.dumps({'table': table, 'type': 'table'}))
 
     # Revert streams back to normal and finish event stream.
@@ -79,6 +85,7 @@ def run(experiment):
         context = {
             'iterations': request.form['iterations'],
             'config': request.form['config'],
+            'sql': request.form.get('sql') == '1',
             'experiment': experiment
         }
         return render_template('experiments/result.jinja', **context)
@@ -87,6 +94,7 @@ def run(experiment):
     elif request.headers.get('accept') == 'text/event-stream':
         # Use submitted config and iteration
         exp.show_progress = True
+        exp.profile_queries = request.args.get('sql') == '1'
         exp.config_file = request.args.get('config')
         iterations = int(request.args.get('iterations', 100))
 
@@ -193,6 +193,7 @@ def main():
             table.float('time')
             table.float('memory')
             table.float('peak_memory')
+            table.text('timeline').nullable()
             table.integer('test_id')
             table.foreign('test_id')\
                 .references('id').on('testcases')\
@@ -223,7 +224,8 @@ def main():
         folders['repositories'],
         'PerformanceRepository',
         'performance',
-        attributes=['label', 'level', 'type', 'time', 'memory', 'peak_memory'],
+        attributes=['label', 'level', 'type', 'time', 'memory', 'peak_memory', 'timeline'],
+        nullable=['timeline']
     )
 
     # Done
@@ -5,6 +5,34 @@ import os
 import imp
 import re
 
+# Cached file listings of folders, see _list_files
+_LISTINGS = {}
+
+
+def _list_files(folder):
+    """List the python files of a folder (except _*.py files).
+
+    The listing is cached until the modification time of the folder changes,
+    i.e. until a file is added, removed or renamed.
+
+    Args:
+        folder (str): Path to folder
+
+    Returns:
+        list: List of filenames
+    """
+    try:
+        mtime = os.stat(folder).st_mtime
+    except OSError:
+        return []
+
+    cached = _LISTINGS.get(folder)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, glob.glob(os.path.join(folder, '[!_]*.py')))
+        _LISTINGS[folder] = cached
+
+    return list(cached[1])
+
 
 def find_files(root, path, search=None, remove='.py'):
     """Find files in a folder (except _*.py files).
@@ -21,7 +49,7 @@ def find_files(root, path, search=None, remove='.py'):
         list: List of filenames
     """
     regex = re.compile(remove, re.IGNORECASE)
-    files = glob.glob(os.path.join(root, path, '[!_]*.py'))
+    files = _list_files(os.path.join(root, path))
 
     if search:
         files = list(filter(
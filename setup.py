@@ -24,7 +24,7 @@ VERSION = None
 REQUIRED = [
     # 'requests', 'maya', 'records',
     'SQLAlchemy>=1.2.0', 'termcolor', 'colorama', 'tabulate', 'inflection', 'six', 'psutil',
-    'matplotlib', 'Flask>=1.0.0'
+    'matplotlib', 'numpy', 'Flask>=1.0.0'
 ]
 
 # What packages are optional?
@@ -40,6 +40,7 @@ EXTRAS = {
     'mssql_pyodbc': ['pyodbc'],
     'mssql_pymssql': ['pymssql'],
     'mssql': ['pyodbc'],
+    'pandas': ['pandas'],
 }
 
 # The rest you shouldn't have to touch too much :)
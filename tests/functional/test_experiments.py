@@ -35,6 +35,57 @@ class TestExperiments(object):
             (1,), (2,)
         ]
 
+    def test_experiment_run_workers(self, cli_app, app_files):
+        """
+        GIVEN the framework is installed and the experiments and testcases tables exist
+        WHEN a user runs an experiment with multiple worker processes
+        THEN the testcases should be saved in the database in iteration order
+        """
+        # Create Experiment file
+        app_files.create_from_stub(
+            cli_app.config_path,
+            'FooExperimentProfiling',
+            'experiments/FooExperiment.py'
+        )
+
+        # User runs the experiment
+        sys.argv = ['main.py', 'experiments:run', 'foo', '--n=4', '--workers=2']
+        cli_app.run()
+
+        # check database
+        session = cli_app.store.session
+        assert list(session.execute('SELECT iteration FROM testcases;')) == [
+            (1,), (2,), (3,), (4,)
+        ]
+        assert session.execute(
+            'SELECT COUNT(*) FROM performance WHERE label = "Test-Abschnitt";'
+        ).first()[0] == 4
+
+    def test_experiment_run_buffered(self, cli_app, app_files):
+        """
+        GIVEN the framework is installed and the experiments and testcases tables exist
+        WHEN a user runs an experiment which saves the results in the background
+        THEN all testcases and performances should be saved in the database
+        """
+        # Create Experiment file
+        app_files.create_from_stub(
+            cli_app.config_path,
+            'FooExperimentProfiling',
+            'experiments/FooExperiment.py'
+        )
+
+        # User runs the experiment
+        sys.argv = ['main.py', 'experiments:run', 'foo', '--n=3', '--buffer']
+        cli_app.run()
+
+        # check database
+        session = cli_app.store.session
+        assert list(session.execute('SELECT iteration, bar FROM testcases;')) == [
+            (1, 1), (2, 1), (3, 1)
+        ]
+        assert session.execute('SELECT COUNT(*) FROM performance;').first()[0] == 6
+        assert session.execute('SELECT finished FROM experiments;').first()[0] is not None
+
     def test_experiment_save(self, cli_app, app_files):
         """
         GIVEN the framework is installed and the experiments and testcases tables exist,
@@ -86,8 +137,8 @@ class TestExperiments(object):
 
         # Check if performance is saved
         session = cli_app.store.session
-        assert session.execute('SELECT COUNT(*) FROM performance;').first()[0] == 3
-        assert list(session.execute('SELECT label FROM performance;'))[2] == ('Test-Abschnitt',)
+        assert session.execute('SELECT COUNT(*) FROM performance;').first()[0] == 2
+        assert list(session.execute('SELECT label FROM performance;'))[1] == ('Test-Abschnitt',)
 
         data = list(session.execute(
             'SELECT level, type, memory, time FROM performance WHERE label = "Test-Abschnitt";'
@@ -97,6 +148,58 @@ class TestExperiments(object):
         assert data[2] >= 0.0
         assert data[3] >= 0.0
 
+    def test_experiment_monitor_timeline(self, cli_app, app_files):
+        """
+        GIVEN the framework is installed and the standard tables exist
+        WHEN the user runs an experiment with a memory monitor
+        THEN the memory timeline of the points is saved in the performance table
+        """
+        import json
+
+        # Create Experiment file
+        app_files.create_from_stub(
+            cli_app.config_path,
+            'FooExperimentMonitor',
+            'experiments/FooExperiment.py'
+        )
+
+        # User runs the experiment
+        sys.argv = ['main.py', 'experiments:run', 'foo', '--n=1', '--monitor=0.001']
+        cli_app.run()
+
+        timelines = [row[0] for row in cli_app.store.session.execute(
+            'SELECT timeline FROM performance;'
+        )]
+        assert len(timelines) == 2
+        assert all(isinstance(json.loads(timeline), list) for timeline in timelines)
+
+    def test_experiment_profile_queries(self, cli_app, app_files, capsys):
+        """
+        GIVEN the framework is installed and the standard tables exist
+        WHEN the user runs an experiment and times its SQL statements
+        THEN the statements should be shown per repository method after the performance table
+        """
+        from experimentum.WebGUI.helpers import ansi_escape
+
+        # Create Experiment file
+        app_files.create_from_stub(
+            cli_app.config_path,
+            'FooExperimentProfiling',
+            'experiments/FooExperiment.py'
+        )
+
+        # User runs the experiment
+        sys.argv = ['main.py', 'experiments:run', 'foo', '--n=2', '--sql']
+        cli_app.run()
+
+        output = ansi_escape(capsys.readouterr().out)
+        assert 'Repository Method' in output
+        assert 'Slowest Statement' in output
+        assert '› ExperimentRepository.create ' in output
+        assert '› ExperimentRepository.update ' in output
+        assert '› TestCaseRepository.create ' in output
+        assert 'INSERT INTO testcases' in output
+
     def test_experiment_visualization(self, cli_app, app_files):
         """
         GIVEN the framework is installed and the standard tables exist
@@ -116,3 +219,23 @@ class TestExperiments(object):
 
         # cleanup
         os.remove('test.png')
+
+    def test_experiment_status(self, cli_app, app_files):
+        """
+        GIVEN the framework is installed and some experiments already ran
+        WHEN a user lists the status of the experiments
+        THEN the runs of each experiment are counted with the config file of the latest run
+        """
+        app_files.create_from_stub(cli_app.config_path, 'FooExperiment', 'experiments/{name}.py')
+        rows = [('Foo', 'a.json'), ('foo', 'b.json'), ('Foo', None), ('Bar', '')]
+        for idx, (name, config_file) in enumerate(rows, 1):
+            cli_app.store.session.execute(
+                'INSERT INTO experiments(id, name, config_file, start) '
+                'VALUES(:id, :name, :config_file, "1970-01-01 00:00:00");',
+                {'id': idx, 'name': name, 'config_file': config_file}
+            )
+        cli_app.store.session.commit()
+
+        data = Experiment.get_status(cli_app)
+        assert data['foo'] == {'count': 3, 'name': 'Foo', 'config_file': 'b.json'}
+        assert data['bar'] == {'count': 1, 'name': 'Bar', 'missing': True}
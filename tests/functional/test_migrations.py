@@ -50,6 +50,27 @@ class TestMigration(object):
         assert insp.get_columns('foo')[1]['name'] == 'name'
         assert isinstance(insp.get_columns('foo')[1]['type'], VARCHAR)
 
+    def test_migration_up_all(self, cli_app, capsys):
+        """
+        GIVEN the framework is installed and the experiments and testcases tables exist
+        WHEN a user executes all new migrations at once
+        THEN the database schema should be modified in one transaction
+        """
+        # User creates a new migration
+        _create_migration(cli_app)
+
+        # User executes all migrations
+        sys.argv = ['main.py', 'migration:up', '--all']
+        cli_app.run()
+
+        # New migration should be executed
+        assert 'Migrated 20190101000020_create_custom' in ansi_escape(capsys.readouterr().out)
+
+        # Database schema should be changed
+        insp = reflection.Inspector.from_engine(cli_app.store.engine)
+        assert 'foo' in cli_app.store.engine.table_names()
+        assert insp.get_columns('testcases')[4]['name'] == 'foo'
+
     def test_migration_down(self, cli_app, capsys):
         """
         GIVEN the framework is installed and the experiments and testcases tables exist
@@ -127,3 +148,51 @@ class TestMigration(object):
         assert 'Migration created successfully!' in ansi_escape(capsys.readouterr().out)
         assert len(glob.glob(pattern)) == 4
         assert '_my_migration.py' in glob.glob(pattern)[-1]
+
+    def test_migration_squash(self, cli_app, capsys):
+        """
+        GIVEN the framework is installed and all migrations did run
+        WHEN a user squashes the migrations and sets up a fresh database
+        THEN the snapshot migration should create the same schema and record all revisions
+        """
+        _create_migration(cli_app)
+        sys.argv = ['main.py', 'migration:up']
+        cli_app.run()
+
+        insp = reflection.Inspector.from_engine(cli_app.store.engine)
+        tables = cli_app.store.engine.table_names()
+        schema = {table: insp.get_columns(table) for table in tables}
+        path = os.path.join(cli_app.root, cli_app.config.get('storage.migrations.path'))
+        revisions = open(os.path.join(path, '.version')).read()
+
+        # User squashes the migrations
+        sys.argv = ['main.py', 'migration:squash']
+        cli_app.run()
+
+        assert 'Squashed 4 migrations into 20190101000020_squashed_migrations.py' in \
+            ansi_escape(capsys.readouterr().out)
+        assert [os.path.basename(f) for f in glob.glob(os.path.join(path, '*.py'))] == [
+            '20190101000020_squashed_migrations.py'
+        ]
+        assert len(glob.glob(os.path.join(path, 'squashed', '*.py'))) == 4
+
+        # Snapshot is already migrated
+        sys.argv = ['main.py', 'migration:up']
+        cli_app.run()
+        assert 'Migrations are all up to date.' in ansi_escape(capsys.readouterr().out)
+
+        # User sets up a fresh database with the snapshot
+        sys.argv = ['main.py', 'migration:down']
+        cli_app.run()
+        assert cli_app.store.engine.table_names() == []
+        assert open(os.path.join(path, '.version')).read() == ''
+
+        sys.argv = ['main.py', 'migration:up']
+        cli_app.run()
+
+        insp = reflection.Inspector.from_engine(cli_app.store.engine)
+        assert sorted(cli_app.store.engine.table_names()) == sorted(tables)
+        for table in tables:
+            assert [str(col) for col in insp.get_columns(table)] == \
+                [str(col) for col in schema[table]]
+        assert open(os.path.join(path, '.version')).read() == revisions
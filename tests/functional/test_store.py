@@ -1,7 +1,12 @@
 from experimentum.Storage import AbstractStore
 from experimentum.Experiments import App
+from experimentum.WebGUI.helpers import ansi_escape
+from sqlalchemy import event
+from datetime import datetime
+import numpy as np
 import tempfile
 import pytest
+import sys
 
 
 class CustomStore(AbstractStore):
@@ -60,6 +65,354 @@ class TestStore():
         entry.delete()
         assert cli_app.store.session.execute('SELECT COUNT(*) FROM testcases;').first()[0] == 0
 
+    def test_bulk_create(self, cli_app):
+        """
+        GIVEN the framework is installed and the standard tables exist
+        WHEN a user saves many testcases with their performances at once
+        THEN the testcases and performances are saved with the correct foreign keys
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        repo = cli_app.repositories.get('TestCaseRepository')
+        performance = {'label': 'foo', 'level': 0, 'type': 'point', 'time': 1.0, 'memory': 2.0,
+                       'peak_memory': 3.0}
+
+        # User saves the testcases
+        records = [
+            {'iteration': i, 'experiment_id': 1, 'performances': [performance, performance]}
+            for i in range(1, 6)
+        ]
+        assert repo.bulk_create(records, chunk_size=2) == 5
+
+        # Testcases and performances are linked
+        session = cli_app.store.session
+        assert session.execute('SELECT COUNT(*) FROM testcases;').first()[0] == 5
+        assert list(session.execute(
+            'SELECT t.iteration, COUNT(*) FROM performance p '
+            'JOIN testcases t ON p.test_id = t.id GROUP BY t.iteration;'
+        )) == [(i, 2) for i in range(1, 6)]
+
+        # Records without relationships are saved as well
+        repo.bulk_create([{'iteration': 6, 'experiment_id': 1}])
+        assert repo.first(['iteration', 6]).performances == []
+
+    def test_bulk_create_mixed_columns(self, cli_app, caplog):
+        """
+        GIVEN the framework is installed and the standard tables exist
+        WHEN a user saves many testcases which do not all have the same columns
+        THEN every column of every testcase is saved and unknown columns are reported
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        repo = cli_app.repositories.get('TestCaseRepository')
+
+        repo.bulk_create([
+            {'iteration': 1, 'experiment_id': 1},
+            {'iteration': 2, 'experiment_id': 1, 'bar': 5},
+            {'iteration': 3, 'experiment_id': 1, 'bar': 6, 'foo': 7},
+            {'iteration': 4, 'experiment_id': 1}
+        ])
+
+        assert list(cli_app.store.session.execute(
+            'SELECT iteration, bar FROM testcases ORDER BY id;'
+        )) == [(1, None), (2, 5), (3, 6), (4, None)]
+        assert 'Columns do not exist in table testcases, ignoring: foo' in caplog.text
+
+    def test_eager_loading(self, cli_app):
+        """
+        GIVEN the framework is installed and an experiment has many testcases with performances
+        WHEN a user loads the experiment with eagerly loaded relationships
+        THEN the testcases and performances are fetched with a constant number of queries
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        performance = {'label': 'foo', 'level': 0, 'type': 'point', 'time': 1.0, 'memory': 2.0,
+                       'peak_memory': 3.0}
+        cli_app.repositories.get('TestCaseRepository').bulk_create([
+            {'iteration': i, 'experiment_id': 1, 'performances': [performance]}
+            for i in range(1, 21)
+        ])
+        repo = cli_app.repositories.get('ExperimentRepository')
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(cli_app.store.engine, 'before_cursor_execute', count)
+        try:
+            for load, queries in [('selectin', 3), ({'tests': 'joined', 'tests.performances': 'subquery'}, 2)]:
+                cli_app.store.session.expire_all()
+                del statements[:]
+
+                exp = repo.first(['id', 1], load=load)
+                assert sum(len(test.performances) for test in exp.tests) == 20
+                assert len(statements) == queries
+        finally:
+            event.remove(cli_app.store.engine, 'before_cursor_execute', count)
+
+        # Unknown relationships and strategies
+        with pytest.raises(TypeError):
+            repo.get(load={'foo': 'selectin'})
+        with pytest.raises(TypeError):
+            repo.get(load={'tests': 'foo'})
+
+    def test_aggregate_query(self, cli_app):
+        """
+        GIVEN the framework is installed and there are performances of several labels
+        WHEN a user selects the mean time of each label
+        THEN the means are calculated by the database and ordered and limited
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        cli_app.repositories.get('TestCaseRepository').bulk_create([
+            {'iteration': i, 'experiment_id': 1, 'performances': [
+                {'label': label, 'level': 0, 'type': 'point', 'time': factor * i, 'memory': 1.0,
+                 'peak_memory': 1.0}
+                for label, factor in [('foo', 1.0), ('bar', 2.0), ('baz', 3.0)]
+            ]}
+            for i in range(1, 5)
+        ])
+        repo = cli_app.repositories.get('PerformanceRepository')
+
+        # User selects the mean and max time per label
+        rows = repo.get(
+            select=['label', ['avg', 'time'], ['max', 'time', 'slowest'], ['count']],
+            group_by='label',
+            order_by='-avg_time'
+        ).all()
+        assert [(row.label, row.avg_time, row.slowest, row.count) for row in rows] == [
+            ('baz', 7.5, 12.0, 4), ('bar', 5.0, 8.0, 4), ('foo', 2.5, 4.0, 4)
+        ]
+
+        # User pages through the labels
+        rows = repo.get(select=['label'], group_by=['label'], order_by='label', limit=2, offset=1)
+        assert [row.label for row in rows] == ['baz', 'foo']
+
+        # Unknown columns and aggregate functions
+        with pytest.raises(TypeError):
+            repo.get(select=['foo'])
+        with pytest.raises(TypeError):
+            repo.get(select=[['median', 'time']])
+
+    def test_where_predicates(self, cli_app):
+        """
+        GIVEN the framework is installed and there are several experiments with testcases
+        WHEN a user filters the experiments with IN, BETWEEN, LIKE, IS NULL, nested groups
+            and conditions on their testcases
+        THEN only the matching experiments are returned
+        """
+        for idx in range(1, 6):
+            cli_app.store.session.execute(
+                'INSERT INTO experiments(id, name, config_file, start) '
+                'VALUES({0}, "exp{0}", {1}, "1970-01-01 00:00:00");'.format(
+                    idx, '"foo.json"' if idx % 2 else 'NULL'
+                )
+            )
+        cli_app.store.session.commit()
+        cli_app.repositories.get('TestCaseRepository').bulk_create([
+            {'iteration': idx * 100, 'experiment_id': idx, 'performances': [
+                {'label': 'label{}'.format(idx), 'level': 0, 'type': 'point', 'time': 1.0,
+                 'memory': 1.0, 'peak_memory': 1.0}
+            ]}
+            for idx in range(1, 6)
+        ])
+        repo = cli_app.repositories.get('ExperimentRepository')
+
+        def ids(where):
+            return sorted(exp.id for exp in repo.get(where))
+
+        assert ids(['id', 'in', [1, 3, 5, 7]]) == [1, 3, 5]
+        assert ids(['id', 'not in', [1, 3]]) == [2, 4, 5]
+        assert ids(['id', 'between', [2, 4]]) == [2, 3, 4]
+        assert ids(['name', 'like', 'exp%']) == [1, 2, 3, 4, 5]
+        assert ids(['config_file', 'is', None]) == [2, 4]
+        assert ids([['id', '>', 1], ['or', [['id', 5], ['config_file', 'is', None]]]]) == [2, 4, 5]
+        assert ids(['and', [['id', '<', 5], ['or', [['id', 1], ['id', 4]]]]]) == [1, 4]
+        assert ids(['tests.iteration', 'between', [200, 400]]) == [2, 3, 4]
+
+        assert ids(['tests.performances.label', 'in', ['label1', 'label5']]) == [1, 5]
+
+        # Unknown operators, relationships and columns
+        with pytest.raises(TypeError):
+            repo.get(['id', 'foo', 1])
+        with pytest.raises(TypeError):
+            repo.get(['foo.id', 1])
+        with pytest.raises(TypeError):
+            repo.get(['tests.foo', 1])
+
+    def test_release(self, cli_app):
+        """
+        GIVEN the framework is installed and an experiment is running
+        WHEN the testcases are released from the session after they are saved
+        THEN the session does not grow and the experiment can still be updated
+        """
+        performance = {'label': 'foo', 'level': 0, 'type': 'point', 'time': 1.0, 'memory': 1.0,
+                       'peak_memory': 1.0}
+        experiments = cli_app.repositories.get('ExperimentRepository')
+        tests = cli_app.repositories.get('TestCaseRepository')
+        session = cli_app.store.session
+
+        for policy in ['expunge', 'recycle']:
+            cli_app.store.set_session_policy(policy, recycle_after=3)
+            exp = experiments(name=policy, config_file=None, start=datetime.now()).create()
+
+            for i in range(1, 7):
+                test = tests.from_dict({
+                    'iteration': i, 'experiment_id': exp.id, 'performances': [performance]
+                })
+                performances = list(test.performances)
+                test.create().release()
+
+                # Expunged immediately or with the whole session every 3 testcases
+                released = policy == 'expunge' or i % 3 == 0
+                assert (test not in session()) is released
+                assert (performances[0] not in session()) is released
+                assert test.iteration == i and len(test.performances) == 1
+
+            exp.finished = datetime.now()
+            exp.update()
+            assert experiments.find(exp.id).finished is not None
+            assert len(tests.get(['experiment_id', exp.id]).all()) == 6
+
+    def test_iterate(self, cli_app):
+        """
+        GIVEN the framework is installed and there are many testcases
+        WHEN a user iterates over the testcases in chunks
+        THEN all matching testcases are fetched chunk by chunk and removed from the session
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        performance = {'label': 'foo', 'level': 0, 'type': 'point', 'time': 1.0, 'memory': 1.0,
+                       'peak_memory': 1.0}
+        repo = cli_app.repositories.get('TestCaseRepository')
+        repo.bulk_create([
+            {'iteration': i, 'experiment_id': 1, 'performances': [performance]}
+            for i in range(1, 12)
+        ])
+        session = cli_app.store.session
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(cli_app.store.engine, 'before_cursor_execute', count)
+        try:
+            seen = []
+            for test in repo.iterate(['iteration', '!=', 5], chunk_size=4, load='selectin'):
+                assert test in session
+                assert len(test.performances) == 1
+                seen.append(test)
+        finally:
+            event.remove(cli_app.store.engine, 'before_cursor_execute', count)
+
+        # 3 chunks with their eagerly loaded performances
+        assert [test.iteration for test in seen] == [i for i in range(1, 12) if i != 5]
+        assert len(statements) == 6
+        assert not any(test in session for test in seen)
+
+    def test_to_arrays(self, cli_app):
+        """
+        GIVEN the framework is installed and there are many performances
+        WHEN a user fetches the columns of the performances into NumPy arrays
+        THEN the arrays have the values and types of the columns
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        cli_app.repositories.get('TestCaseRepository').bulk_create([
+            {'iteration': i, 'experiment_id': 1, 'performances': [
+                {'label': 'foo', 'level': i % 3, 'type': 'point', 'time': i / 10.0,
+                 'memory': 1.0, 'peak_memory': 1.0}
+            ]}
+            for i in range(25)
+        ])
+        repo = cli_app.repositories.get('PerformanceRepository')
+
+        # User fetches the columns in chunks
+        data = repo.to_arrays(
+            ['label', 'level', 'time'], ['level', '<', 2], chunk_size=4, order_by='time'
+        )
+        assert data['level'].dtype == np.int64
+        assert data['time'].dtype == np.float64
+        assert data['label'].tolist() == ['foo'] * 17
+        assert data['time'].tolist() == [i / 10.0 for i in range(25) if i % 3 < 2]
+
+        # NULL values of integer columns become nan
+        data = cli_app.repositories.get('TestCaseRepository').to_arrays(['iteration', 'bar'])
+        assert data['iteration'].dtype == np.int64
+        assert data['bar'].dtype == np.float64 and np.isnan(data['bar']).all()
+
+        # User fetches aggregates into a structured array
+        data = repo.to_arrays(
+            ['level', ['count'], ['max', 'time']], group_by='level', order_by='level',
+            structured=True
+        )
+        assert data.dtype.names == ('level', 'count', 'max_time')
+        assert data['count'].tolist() == [9, 8, 8]
+        assert data['max_time'].tolist() == [2.4, 2.2, 2.3]
+
+        # User fetches all columns of no rows
+        data = repo.to_arrays(where=['level', '>', 5])
+        assert 'time' in data and len(data['time']) == 0
+
+    def test_analyze(self, cli_app, capsys):
+        """
+        GIVEN the framework is installed and the standard tables exist
+        WHEN the user analyzes the queries of the repositories
+        THEN the foreign keys should be indexed
+        """
+        # User analyzes the data store
+        sys.argv = ['main.py', 'storage:analyze']
+        cli_app.run()
+
+        # Foreign keys should be indexed
+        out = ansi_escape(capsys.readouterr().out)
+        assert 'testcases_experiment_id_index' in out
+        assert 'performance_test_id_index' in out
+        assert 'No missing indexes found' in out
+
+    def test_profile(self, cli_app):
+        """
+        GIVEN the framework is installed and an experiment has some testcases
+        WHEN a user times the SQL statements of the data store
+        THEN each statement should be attributed to its repository method or relationship
+        """
+        cli_app.store.session.execute(
+            'INSERT INTO experiments(id, name, start) VALUES(1, "foo", "1970-01-01 00:00:00");'
+        )
+        cli_app.store.session.commit()
+        cli_app.repositories.get('TestCaseRepository').bulk_create([
+            {'iteration': i, 'experiment_id': 1} for i in range(1, 4)
+        ])
+        cli_app.store.session.expire_all()
+        repo = cli_app.repositories.get('ExperimentRepository')
+
+        profiler = cli_app.store.profile()
+        try:
+            exp = repo.find(1)
+            assert len(exp.tests) == 3
+            cli_app.store.session.execute('SELECT 1;')
+        finally:
+            profiler.stop()
+
+        callers = {row['caller']: row['count'] for row in profiler.export()['callers']}
+        assert callers == {
+            'ExperimentRepository.find': 1,
+            'ExperimentRepository.tests (relationship)': 1,
+            'other': 1
+        }
+
     def test_custom_store(self, app_files):
         """
         GIVEN the framework is installed and the standard tables exist
@@ -41,6 +41,41 @@ class TestExperimentsCommand(object):
         run().handle(app_mock, args)
         assert exp_mock.hide_performance is True
 
+    def test_run_workers(self, mocker):
+        exp_mock, app_mock = self.setup_mocks(mocker)
+        args = argparse.Namespace(n=1, name='f', config=None, progress=False, hide_performance=False, workers=4)
+
+        run().handle(app_mock, args)
+        assert exp_mock.workers == 4
+
+    def test_run_memory_sampler(self, mocker):
+        exp_mock, app_mock = self.setup_mocks(mocker)
+        args = argparse.Namespace(n=1, name='f', config=None, progress=False, hide_performance=False, memory='rss')
+
+        run().handle(app_mock, args)
+        exp_mock.performance.set_sampler.assert_called_once_with('rss')
+
+    def test_run_memory_monitor(self, mocker):
+        exp_mock, app_mock = self.setup_mocks(mocker)
+        args = argparse.Namespace(n=1, name='f', config=None, progress=False, hide_performance=False, monitor=0.01)
+
+        run().handle(app_mock, args)
+        exp_mock.performance.set_monitor.assert_called_once_with(0.01)
+
+    def test_run_profile_queries(self, mocker):
+        exp_mock, app_mock = self.setup_mocks(mocker)
+        args = argparse.Namespace(n=1, name='f', config=None, progress=False, hide_performance=False, sql=True)
+
+        run().handle(app_mock, args)
+        assert exp_mock.profile_queries is True
+
+    def test_run_streaming(self, mocker):
+        exp_mock, app_mock = self.setup_mocks(mocker)
+        args = argparse.Namespace(n=1, name='f', config=None, progress=False, hide_performance=False, streaming=True)
+
+        run().handle(app_mock, args)
+        assert exp_mock.performance.streaming is True
+
     def test_status(self, mocker):
         exp_mock, app_mock = self.setup_mocks(mocker)
         mocker.patch.object(Experiment, 'get_status')
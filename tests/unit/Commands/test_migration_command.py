@@ -1,4 +1,5 @@
-from experimentum.Commands.MigrationCommand import down, make, up, status, refresh
+from experimentum.Commands.MigrationCommand import down, make, up, status, refresh, squash
+import pytest
 
 
 class TestMigrationCommand(object):
@@ -26,9 +27,29 @@ class TestMigrationCommand(object):
         app_mock = mocker.patch('experimentum.Experiments.App')
         app_mock.make = mocker.MagicMock(return_value=mock_migrator)
 
-        up(app_mock).handle(app_mock)
+        class args:
+            all = False
+            to = None
+
+        up(app_mock).handle(app_mock, args)
         mock_migrator.up.assert_called_once_with()
 
+    @pytest.mark.parametrize('all, to', [(True, None), (False, '20190101000000')])
+    def test_up_all(self, mocker, all, to):
+        mock_migrator = mocker.patch('experimentum.Storage.Migrator')
+        app_mock = mocker.patch('experimentum.Experiments.App')
+        app_mock.make = mocker.MagicMock(return_value=mock_migrator)
+
+        class args:
+            pass
+
+        args.all = all
+        args.to = to
+
+        up(app_mock).handle(app_mock, args)
+        mock_migrator.upgrade.assert_called_once_with(to)
+        mock_migrator.up.assert_not_called()
+
     def test_down(self, mocker):
         mock_migrator = mocker.patch('experimentum.Storage.Migrator')
         mock_migrator.down = mocker.MagicMock()
@@ -49,3 +70,15 @@ class TestMigrationCommand(object):
 
         make(app_mock).handle(app_mock, args)
         mock_migrator.make.assert_called_once_with('foo')
+
+    def test_squash(self, mocker):
+        mock_migrator = mocker.patch('experimentum.Storage.Migrator')
+        mock_migrator.squash = mocker.MagicMock()
+        app_mock = mocker.patch('experimentum.Experiments.App')
+        app_mock.make = mocker.MagicMock(return_value=mock_migrator)
+
+        class args:
+            name = 'Foo'
+
+        squash(app_mock).handle(app_mock, args)
+        mock_migrator.squash.assert_called_once_with('foo')
@@ -0,0 +1,43 @@
+from experimentum.Commands.StorageCommand import analyze
+import pytest
+
+
+class TestStorageCommand(object):
+    def setup_mocks(self, mocker, lookups):
+        store_mock = mocker.patch('experimentum.Storage.SQLAlchemy.Store')
+        store_mock.analyze = mocker.MagicMock(return_value=lookups)
+        app_mock = mocker.patch('experimentum.Experiments.App')
+        app_mock.make = mocker.MagicMock(return_value=store_mock)
+
+        return store_mock, app_mock
+
+    def test_analyze(self, mocker, capsys):
+        store_mock, app_mock = self.setup_mocks(mocker, [
+            {'table': 'foo', 'columns': ['bar_id'], 'plan': ['SCAN foo'], 'missing': True},
+            {'table': 'baz', 'columns': ['a', 'b'], 'plan': [], 'missing': True},
+            {'table': 'bar', 'columns': ['id'], 'plan': ['SEARCH bar'], 'missing': False},
+        ])
+
+        analyze(app_mock).handle(app_mock)
+        store_mock.analyze.assert_called_once_with(app_mock.repositories.all.return_value)
+
+        out = capsys.readouterr().out
+        assert 'SCAN foo' in out
+        assert "with self.schema.table('foo') as table:\n        table.index('bar_id')" in out
+        assert "table.index(['a', 'b'])" in out
+        assert "self.schema.table('bar')" not in out
+
+    def test_analyze_no_missing_indexes(self, mocker, capsys):
+        store_mock, app_mock = self.setup_mocks(mocker, [
+            {'table': 'bar', 'columns': ['id'], 'plan': ['SEARCH bar'], 'missing': False},
+        ])
+
+        analyze(app_mock).handle(app_mock)
+        assert 'No missing indexes found' in capsys.readouterr().out
+
+    def test_analyze_not_supported(self, mocker):
+        store_mock, app_mock = self.setup_mocks(mocker, [])
+        store_mock.analyze.side_effect = NotImplementedError('Must implement analyze method')
+
+        with pytest.raises(SystemExit):
+            analyze(app_mock).handle(app_mock)
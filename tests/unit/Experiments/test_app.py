@@ -6,6 +6,8 @@ import json
 import os
 import logging
 import pytest
+import sys
+from sqlalchemy.pool import QueuePool
 
 class TestApp(object):
 
@@ -64,4 +66,73 @@ class TestApp(object):
         with pytest.raises(SystemExit) as pytest_wrapped_e:
             app.make('foo')
         assert pytest_wrapped_e.type == SystemExit
-        assert pytest_wrapped_e.value.code == 1
\ No newline at end of file
+        assert pytest_wrapped_e.value.code == 1
+
+    @pytest.mark.parametrize('driver, database, expected', [
+        ('sqlite', '', {
+            'connect_args': {'check_same_thread': False}, 'pool_recycle': 60, 'pool_pre_ping': True
+        }),
+        ('sqlite', 'foo.db', {
+            'connect_args': {'check_same_thread': False}, 'poolclass': QueuePool, 'pool_size': 2,
+            'max_overflow': 3, 'pool_timeout': 4, 'pool_recycle': 60, 'pool_pre_ping': True
+        }),
+        ('postgresql', 'foo', {
+            'pool_size': 2, 'max_overflow': 3, 'pool_timeout': 4, 'pool_recycle': 60, 'pool_pre_ping': True
+        }),
+    ])
+    def test_setup_datastore_pool(self, mocker, tmpdir, driver, database, expected):
+        app = self.setup_app('', tmpdir.strpath)
+        module = sys.modules[App.__module__]
+        create_engine = mocker.patch.object(module, 'create_engine')
+        mocker.patch.object(module.Store, 'set_engine')
+        set_pragmas = mocker.patch.object(module, 'set_pragmas')
+
+        app.config.set('storage.pool', {
+            'size': 2, 'max_overflow': 3, 'timeout': 4, 'recycle': 60, 'pre_ping': True
+        })
+        app.setup_datastore({'drivername': driver, 'database': database})
+
+        create_engine.assert_called_once_with(mocker.ANY, **expected)
+        app.store.set_engine.assert_called_once_with(
+            create_engine.return_value, cache=mocker.ANY, revision=mocker.ANY
+        )
+        assert set_pragmas.called is (driver == 'sqlite')
+
+    def test_setup_datastore_without_sqlite_profile(self, mocker, tmpdir):
+        app = self.setup_app('', tmpdir.strpath)
+        set_pragmas = mocker.patch.object(sys.modules[App.__module__], 'set_pragmas')
+
+        app.config.set('storage.sqlite', False)
+        app.setup_datastore({'drivername': 'sqlite', 'database': ''})
+
+        assert not set_pragmas.called
+
+    def test_setup_datastore_session_policy(self, mocker, tmpdir):
+        app = self.setup_app('', tmpdir.strpath)
+        policy = mocker.patch.object(sys.modules[App.__module__].Store, 'set_session_policy')
+
+        app.config.set('storage.session', {'policy': 'recycle', 'recycle_after': 50})
+        app.setup_datastore({'drivername': 'sqlite', 'database': ''})
+
+        policy.assert_called_once_with('recycle', 50)
+
+    @pytest.mark.parametrize('database, enabled, expected', [
+        ('foo.db', True, True),
+        ('foo.db', False, False),
+        (':memory:', True, False),
+    ])
+    def test_setup_datastore_metadata_cache(self, mocker, tmpdir, database, enabled, expected):
+        app = self.setup_app('', tmpdir.strpath)
+        set_engine = mocker.patch.object(sys.modules[App.__module__].Store, 'set_engine')
+        tmpdir.mkdir('migrations').join('.version').write('20180101_foo')
+
+        app.config.set('storage.metadata_cache', enabled)
+        app.setup_datastore({'drivername': 'sqlite', 'database': database})
+
+        if expected:
+            set_engine.assert_called_once_with(
+                mocker.ANY, cache=os.path.join(tmpdir.strpath, 'migrations', '.metadata'),
+                revision='20180101_foo'
+            )
+        else:
+            set_engine.assert_called_once_with(mocker.ANY, cache=None, revision='')
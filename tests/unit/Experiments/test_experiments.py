@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from experimentum.Experiments import Experiment, Script
+import threading
 import pytest
 import json
+import sys
 
 
 class TestExperiments(object):
@@ -37,11 +39,11 @@ class TestExperiments(object):
         with tmpdir.join('BarExperiment.py').open('w+') as fh:
             fh.write('#Bar')
 
-        rows_mock = mocker.MagicMock()
-        rows_mock.name = 'Foo'
-        rows_mock.config_file = 'foo.json'
         repo_mock = mocker.MagicMock()
-        repo_mock.all = mocker.MagicMock(return_value=[rows_mock])
+        repo_mock.get = mocker.MagicMock(return_value=[
+            ('Foo', 'foo.json', 1, 1), ('foo', None, 1, 2), ('foo', 'foo.json', 1, 3),
+            ('foo', 'old.json', 1, 2), ('Baz', '', 1, 4)
+        ])
         app_mock = mocker.patch('experimentum.Experiments.App')
         app_mock.root = '.'
         app_mock.config.get = mocker.MagicMock(return_value=tmpdir.strpath)
@@ -49,11 +51,18 @@ class TestExperiments(object):
 
         # assert correct status data
         data = Experiment.get_status(app_mock)
-        assert data['foo']['count'] is 1
+        assert data['foo']['count'] == 4
         assert data['foo']['name'] == 'Foo'
         assert data['foo']['config_file'] == 'foo.json'
-        assert data['bar']['count'] is 0
+        assert data['bar']['count'] == 0
         assert data['bar']['name'] == 'Bar'
+        assert data['baz'] == {'count': 1, 'name': 'Baz', 'missing': True}
+
+        # The runs are counted by the data store
+        repo_mock.get.assert_called_once_with(
+            select=['name', 'config_file', ['count', 'id'], ['max', 'id']],
+            group_by=['name', 'config_file']
+        )
 
     def test_abstract_reset(self, tmpdir, mocker):
         exp = self._setup(mocker, tmpdir)
@@ -160,6 +169,38 @@ class TestExperiments(object):
         assert exp.save.call_count == 3
         assert 'Progress' not in capsys.readouterr().out
 
+    def test_start_parallel(self, mocker, tmpdir):
+        exp = self._setup(mocker, tmpdir)
+        exp.boot = mocker.MagicMock()
+        exp.reset = lambda: None
+        exp.run = lambda: {'foo': 'bar'}
+        exp.save = mocker.MagicMock()
+        exp.hide_performance = True
+        exp.workers = 2
+
+        exp.start(steps=3)
+
+        assert exp.save.call_args_list == [
+            mocker.call({'foo': 'bar'}, 1), mocker.call({'foo': 'bar'}, 2), mocker.call({'foo': 'bar'}, 3)
+        ]
+        labels = [point['label'] for point in exp.performance.export(metrics=True)]
+        assert labels == ['Booting Experiment', 'Runing Experiment']
+        assert len(exp.performance._frames['1_0_Runing Experiment']) == 3
+
+    def test_run_iteration_stops_monitor(self, mocker, tmpdir):
+        exp = self._setup(mocker, tmpdir)
+        exp.reset = lambda: None
+        exp.run = lambda: {'foo': 'bar'}
+        exp.performance.set_monitor(0.001)
+        threads = threading.active_count()
+        module = sys.modules[Experiment.__module__]
+        module._init_worker(exp)
+
+        for iteration in range(1, 6):
+            result, frames = module._run_iteration(iteration)
+            assert result == {'foo': 'bar'}
+            assert threading.active_count() == threads
+
     def test_start_hide_performance(self, mocker, tmpdir):
         exp = self._create_exp(mocker, tmpdir, {'foo': 'bar'})
 
@@ -176,6 +217,27 @@ class TestExperiments(object):
 
         assert 'Progress' in capsys.readouterr().out
 
+    def test_start_profile_queries(self, mocker, tmpdir):
+        exp = self._create_exp(mocker, tmpdir, {'foo': 'bar'})
+        profiler = exp.app.make.return_value.profile.return_value
+
+        exp.profile_queries = True
+        exp.start(steps=1)
+
+        exp.app.make.assert_called_once_with('store')
+        assert exp.performance.queries is profiler
+        profiler.stop.assert_called_once_with()
+
+    def test_start_profile_queries_not_supported(self, mocker, tmpdir, capsys):
+        exp = self._create_exp(mocker, tmpdir, {'foo': 'bar'})
+        exp.app.make.return_value.profile.return_value = None
+
+        exp.profile_queries = True
+        exp.start(steps=1)
+
+        assert exp.performance.queries is None
+        assert 'The data store can not time its SQL statements.' in capsys.readouterr().out
+
     def test_start_empty_results(self, mocker, tmpdir, capsys):
         exp = self._create_exp(mocker, tmpdir, {})
 
@@ -189,7 +251,7 @@ class TestExperiments(object):
 
         exp.save({'foo': 'bar', 'bar': {'foobar': 'baz'}}, 2)
 
-        exp.performance.export.assert_called_once_with()
+        exp.performance.export.assert_called_once_with(current_iteration=True)
         exp.repos['testcase'].from_dict.assert_called_once_with({
             'experiment_id':42,
             'iteration': 2,
@@ -197,6 +259,42 @@ class TestExperiments(object):
             'foo': 'bar',
             'bar': {'foobar': 'baz'}
         })
+        entry = exp.repos['testcase'].from_dict.return_value.create.return_value
+        entry.release.assert_called_once_with()
+
+    def test_save_buffered(self, mocker, tmpdir):
+        exp = self._setup(mocker, tmpdir)
+        exp.boot = mocker.MagicMock()
+        exp.reset = mocker.MagicMock()
+        exp.run = mocker.MagicMock(return_value={'foo': 'bar'})
+        exp.hide_performance = True
+        exp.buffered = True
+        exp.app.config.get.side_effect = lambda key, default=None: default
+
+        exp.start(steps=3)
+
+        exp.repos['testcase'].from_dict.assert_not_called()
+        exp.repos['testcase'].bulk_create.assert_called_once_with([
+            {'experiment_id': 42, 'iteration': i, 'performances': mocker.ANY, 'foo': 'bar'}
+            for i in range(1, 4)
+        ])
+
+    @pytest.mark.parametrize('attributes, saved', [
+        (['timeline'], True),
+        ([], False),
+    ])
+    def test_save_timeline(self, mocker, tmpdir, capsys, attributes, saved):
+        exp = self._create_exp(mocker, tmpdir, {'foo': 'bar'})
+        del exp.save
+        performance = mocker.Mock(spec=attributes)
+        exp.repos['testcase'].__relationships__ = {'performances': [performance]}
+        exp.performance.set_monitor(0.01)
+
+        exp.start(steps=1)
+
+        data = exp.repos['testcase'].from_dict.call_args[0][0]
+        assert all(('timeline' in point) is saved for point in data['performances'])
+        assert ('The memory timeline is not saved' in capsys.readouterr().out) is not saved
 
     def test_fail_save(self, mocker, tmpdir, capsys):
         exp = self._setup(mocker, tmpdir)
@@ -0,0 +1,58 @@
+from experimentum.Experiments.MemoryMonitor import MemoryMonitor
+from experimentum.Experiments.MemorySampler import MemorySampler
+from experimentum.Experiments.Performance import Point
+import time
+
+
+class SpikeSampler(MemorySampler):
+    name = 'spike'
+
+    def __init__(self):
+        super(SpikeSampler, self).__init__()
+        self.memory = 10
+
+    def sample(self):
+        return self.memory
+
+
+class TestMemoryMonitor(object):
+    def test_records_peak_of_watched_points(self):
+        sampler = SpikeSampler()
+        monitor = MemoryMonitor(sampler, interval=0.001)
+        point = Point('Foo', sampler=sampler)
+
+        monitor.watch(point)
+        sampler.memory = 100
+        time.sleep(0.05)
+        sampler.memory = 20
+        time.sleep(0.05)
+        monitor.unwatch(point)
+        monitor.stop()
+
+        point.stop_memory = sampler.sample()
+        assert point.to_dict()['peak_memory'] == 100
+        assert 100 in [sample[1] for sample in point.timeline]
+
+    def test_unwatched_points_are_not_recorded(self):
+        sampler = SpikeSampler()
+        monitor = MemoryMonitor(sampler, interval=0.001)
+        point = Point('Foo', sampler=sampler)
+
+        monitor.watch(point)
+        monitor.unwatch(point)
+        sampler.memory = 100
+        time.sleep(0.02)
+        monitor.stop()
+
+        assert point.peak_memory == 10
+
+    def test_stop_and_restart(self):
+        monitor = MemoryMonitor(SpikeSampler(), interval=0.001)
+        monitor.stop()
+
+        point = Point('Foo')
+        monitor.watch(point)
+        assert monitor._thread.is_alive()
+
+        monitor.stop()
+        assert monitor._thread is None
@@ -0,0 +1,55 @@
+from experimentum.Experiments.MemorySampler import MemorySampler, USSSampler, RSSSampler, \
+    TracemallocSampler, NullSampler, get_sampler, get_process, benchmark_samplers
+import pytest
+import os
+
+
+class TestMemorySampler(object):
+    def teardown_method(self):
+        """ stop tracing started by the tracemalloc sampler """
+        import tracemalloc
+        tracemalloc.stop()
+
+    def test_sample_not_implemented(self):
+        with pytest.raises(NotImplementedError):
+            MemorySampler().sample()
+
+    def test_get_process_is_cached(self):
+        process = get_process()
+        assert process.pid == os.getpid()
+        assert get_process() is process
+
+    @pytest.mark.parametrize('name, cls', [
+        ('uss', USSSampler),
+        ('rss', RSSSampler),
+        ('tracemalloc', TracemallocSampler),
+        ('off', NullSampler),
+    ])
+    def test_get_sampler(self, name, cls):
+        sampler = get_sampler(name)
+        assert isinstance(sampler, cls)
+        assert sampler.sample() >= 0
+
+    def test_get_sampler_fails(self):
+        with pytest.raises(TypeError):
+            get_sampler('foo')
+
+    def test_rss_fallback(self):
+        sampler = RSSSampler()
+        statm = sampler.sample()
+        sampler._use_statm = False
+        assert sampler.sample() > 0
+        assert statm > 0
+
+    def test_overhead_is_cached(self, mocker):
+        sampler = NullSampler()
+        mocker.spy(sampler, 'sample')
+
+        overhead = sampler.overhead(repeat=10)
+        assert overhead >= 0
+        assert sampler.overhead() == overhead
+        assert sampler.sample.call_count == 10
+
+    def test_benchmark_samplers(self):
+        result = benchmark_samplers(repeat=2)
+        assert sorted(result.keys()) == ['off', 'rss', 'tracemalloc', 'uss']
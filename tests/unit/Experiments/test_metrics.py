@@ -0,0 +1,70 @@
+from experimentum.Experiments.Metrics import bootstrap_ci, calc_metrics, describe
+import numpy as np
+import pytest
+
+
+class TestMetrics(object):
+    def test_describe(self):
+        values = np.array([[1, 10], [2, 20], [3, 30], [4, 40], [100, 50]], dtype=float)
+        metrics = describe(values, resamples=200, seed=1)
+
+        assert metrics['mean'].tolist() == [22, 30]
+        assert metrics['median'].tolist() == [3, 30]
+        assert metrics['min'].tolist() == [1, 10]
+        assert metrics['max'].tolist() == [100, 50]
+        assert metrics['mad'].tolist() == [1, 10]
+        assert metrics['std'][1] == pytest.approx(np.sqrt(200))
+        assert metrics['p50'].tolist() == metrics['median'].tolist()
+        assert metrics['p90'][0] <= metrics['p99'][0] <= 100
+        assert all(metrics['ci_low'] <= metrics['mean'])
+        assert all(metrics['mean'] <= metrics['ci_high'])
+
+    def test_bootstrap_ci_is_reproducible(self):
+        values = np.random.RandomState(0).normal(10, 1, size=(50, 3))
+        low, high = bootstrap_ci(values, resamples=500, seed=42)
+
+        assert np.array_equal(low, bootstrap_ci(values, resamples=500, seed=42)[0])
+        assert all(low < 10.5) and all(high > 9.5)
+        assert all(low < high)
+
+    def test_bootstrap_ci_single_value(self):
+        low, high = bootstrap_ci(np.array([[5.0, 6.0]]))
+        assert low.tolist() == [5, 6]
+        assert high.tolist() == [5, 6]
+
+    def test_bootstrap_ci_in_chunks(self, mocker):
+        mocker.patch('experimentum.Experiments.Metrics._BOOTSTRAP_CHUNK', 10)
+        values = np.arange(20, dtype=float).reshape(10, 2)
+        low, high = bootstrap_ci(values, resamples=25, seed=1)
+
+        assert low.shape == (2,)
+        assert all(low <= high)
+
+    def test_bootstrap_ci_chunk_size_of_wide_values(self, mocker):
+        real = np.random.RandomState(1)
+        mocker.patch('experimentum.Experiments.Metrics._BOOTSTRAP_CHUNK', 100)
+        random = mocker.patch('numpy.random.RandomState')
+        random.return_value.randint.side_effect = real.randint
+        values = np.arange(50, dtype=float).reshape(10, 5)
+
+        bootstrap_ci(values, resamples=7)
+
+        # 100 values per chunk are 2 resamples of 10 iterations and 5 points
+        sizes = [call[1]['size'] for call in random.return_value.randint.call_args_list]
+        assert sizes == [(2, 10), (2, 10), (2, 10), (1, 10)]
+
+    def test_calc_metrics(self):
+        row = [
+            {'Time': [1, 0.5], 'Memory': [100, 0]},
+            {'Time': [3, 1.5], 'Memory': [300, 0]},
+        ]
+        metrics = calc_metrics(row, resamples=10)
+
+        assert len(metrics) == 2
+        assert metrics[0]['count'] == 2
+        assert metrics[0]['mean_time'] == 2
+        assert metrics[0]['std_time'] == 1
+        assert metrics[0]['mean_memory'] == 200
+        assert metrics[1]['median_time'] == 1
+        assert metrics[1]['max_memory'] == 0
+        assert isinstance(metrics[1]['p99_time'], float)
@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 from experimentum.Experiments import Performance
-from experimentum.Experiments.Performance import Formatter, Point
+from experimentum.Experiments.Performance import Formatter, Point, RunningStats
+from experimentum.Experiments.MemorySampler import NullSampler, RSSSampler
 import pytest
+import json
 
 
 class TestPerformance(object):
@@ -38,6 +40,22 @@ class TestPerformance(object):
 
         assert point.subpoints == [subpoint]
 
+    def test_add_nested_subpoints(self):
+        with self.performance.point('A') as point:
+            with self.performance.point('B') as sub:
+                with self.performance.point('C') as subsub:
+                    pass
+            with self.performance.point('D') as sub2:
+                pass
+
+        assert self.performance.points == [point]
+        assert point.subpoints == [sub, sub2]
+        assert sub.subpoints == [subsub]
+        assert self.performance._stack == []
+
+        export = self.performance.export()
+        assert [(row['label'], row['level']) for row in export] == [('A', 0), ('B', 1), ('C', 2), ('D', 1)]
+
     def test_add_message_to_point(self):
         with self.performance.point() as point:
             point.message('some message')
@@ -96,6 +114,9 @@ class TestPerformance(object):
         assert 'Time' in output
         assert 'Memory' in output
         assert 'Peak Memory' in output
+        assert 'Median Time' in output
+        assert 'p90 / p99 Time' in output
+        assert '95% CI Time' in output
         assert 'Label' in output
         assert 'Foo Label' in output
         assert 'some msg' in output
@@ -114,3 +135,169 @@ class TestPerformance(object):
 
         with pytest.raises(TypeError):
             formatter.time_to_human(2, 'foo')
+
+    def test_export_current_iteration(self):
+        with self.performance.point('Booting'):
+            pass
+
+        for i in self.performance.iterate(1, 3):
+            with self.performance.point('Foo Label'):
+                with self.performance.point('Sub Foo Label'):
+                    pass
+
+            export = self.performance.export(current_iteration=True)
+            assert [point['label'] for point in export] == ['Foo Label', 'Sub Foo Label']
+
+        export = self.performance.export(metrics=True)
+        assert [point['label'] for point in export] == ['Booting', 'Foo Label', 'Sub Foo Label']
+        assert len(self.performance._frames) == 2
+
+    def test_set_sampler(self):
+        assert self.performance.sampler.name == 'uss'
+
+        self.performance.set_sampler('off')
+        assert isinstance(self.performance.sampler, NullSampler)
+
+        with self.performance.point('Foo Label') as point:
+            assert point.sampler is self.performance.sampler
+            assert point.start_memory == 0
+
+        sampler = RSSSampler()
+        self.performance.set_sampler(sampler)
+        assert self.performance.sampler is sampler
+
+        with pytest.raises(TypeError):
+            self.performance.set_sampler('foo')
+
+    def test_results_with_sampler(self, capsys):
+        self.performance.set_sampler('off')
+        with self.performance.point('Foo Label'):
+            pass
+
+        self.performance.results()
+        output = capsys.readouterr().out
+
+        assert 'Memory Sampler' in output
+        assert 'off' in output
+
+    def test_results_with_queries(self, capsys, mocker):
+        profiler = mocker.MagicMock()
+        profiler.export.return_value = {
+            'callers': [
+                {'caller': 'FooRepository.get', 'count': 2, 'total_time': 0.004,
+                 'mean_time': 0.002, 'max_time': 0.003}
+            ],
+            'slowest': [
+                {'caller': 'FooRepository.get', 'time': 0.003, 'statement': 'SELECT * FROM foo'},
+                {'caller': 'FooRepository.get', 'time': 0.001, 'statement': 'SELECT ' + 'a' * 100}
+            ]
+        }
+        self.performance.set_query_profiler(profiler)
+        with self.performance.point('Foo Label'):
+            pass
+
+        self.performance.results()
+        output = capsys.readouterr().out
+
+        assert 'Repository Method' in output
+        assert 'FooRepository.get' in output
+        assert '4.00 ms' in output
+        assert 'Slowest Statement' in output
+        assert 'SELECT * FROM foo' in output
+        assert 'SELECT ' + 'a' * 70 + '...' in output
+
+        self.performance.stop_query_profiler()
+        profiler.stop.assert_called_once_with()
+
+        # Replacing the profiler stops the old one
+        self.performance.set_query_profiler(mocker.MagicMock())
+        assert profiler.stop.call_count == 2
+
+    def test_get_query_table_without_queries(self):
+        table = self.performance.formatter.get_query_table({'callers': [], 'slowest': []})
+
+        assert 'Total' in table
+        assert '--' in table
+
+    def test_point_record_keeps_timeline_compact(self):
+        point = Point('Foo', sampler=NullSampler())
+        for idx in range(10):
+            point.record(point.start_time + idx, 50 if idx == 5 else idx, limit=4)
+
+        assert len(point.timeline) <= 4
+        assert point.peak_memory == 50
+        assert max(sample[1] for sample in point.timeline) == 50
+
+    def test_export_with_monitor(self):
+        self.performance.set_sampler('off')
+        with self.performance.point('Foo Label'):
+            pass
+
+        export = self.performance.export()
+        assert 'timeline' not in export[0]
+
+        self.performance.set_monitor(0.001)
+        assert self.performance.monitor.sampler is self.performance.sampler
+
+        with self.performance.point('Foo Label') as point:
+            point.record(point.start_time + 1, 42)
+            point.message('some msg')
+
+        self.performance.stop_monitor()
+        export = self.performance.export()
+        assert export[1]['peak_memory'] == 42
+        assert json.loads(export[1]['timeline'])[0] == [1, 42]
+        assert export[2]['timeline'] is None
+
+    def test_mean_and_standard_deviation(self):
+        values = [2, 4, 4, 4, 5, 5, 7, 9]
+
+        assert Performance.mean(values) == 5.0
+        assert Performance.standard_deviation(values) == 2.0
+        assert isinstance(Performance.mean(values), float)
+
+    def test_running_stats(self):
+        values = [2, 4, 4, 4, 5, 5, 7, 9]
+        stats = RunningStats()
+        assert stats.std == 0
+
+        for value in values:
+            stats.add(value)
+
+        assert stats.count == 8
+        assert stats.mean == pytest.approx(Performance.mean(values))
+        assert stats.std == pytest.approx(Performance.standard_deviation(values))
+        assert stats.min == 2
+        assert stats.max == 9
+
+    def test_export_streaming(self):
+        streaming = Performance('off', streaming=True)
+
+        for i in streaming.iterate(1, 3):
+            for perf in [self.performance, streaming]:
+                with perf.point('Foo Label') as point:
+                    point.message('some msg')
+                    with perf.point('Sub Foo Label'):
+                        pass
+
+        assert len(self.performance.points) == 3
+        assert streaming.points == []
+        assert len(streaming._frames[streaming._current[0]]) == 1
+
+        export = streaming.export(metrics=True)
+        assert [point['label'] for point in export] == ['Foo Label', 'some msg', 'Sub Foo Label']
+        assert export[0]['count'] == 3
+        assert export[0]['min_time'] <= export[0]['mean_time'] <= export[0]['max_time']
+        assert sorted(export[0].keys()) == sorted(self.performance.export(metrics=True)[0].keys())
+        assert export[0]['median_time'] is None
+        assert export[0]['p99_memory'] is None
+
+    def test_results_with_streaming(self, capsys):
+        streaming = Performance('off', streaming=True)
+        with streaming.point('Foo Label'):
+            pass
+
+        streaming.results()
+        output = capsys.readouterr().out
+        assert 'Median Time' in output
+        assert '--' in output
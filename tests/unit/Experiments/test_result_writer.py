@@ -0,0 +1,41 @@
+from experimentum.Experiments import ResultWriter
+import pytest
+
+
+class TestResultWriter(object):
+    def test_save_in_batches(self, mocker):
+        repo = mocker.MagicMock()
+        writer = ResultWriter(repo, batch_size=2, flush_interval=60).start()
+
+        for i in range(5):
+            writer.put({'iteration': i})
+        writer.close()
+
+        assert repo.bulk_create.call_args_list == [
+            mocker.call([{'iteration': 0}, {'iteration': 1}]),
+            mocker.call([{'iteration': 2}, {'iteration': 3}]),
+            mocker.call([{'iteration': 4}]),
+        ]
+
+    def test_save_after_flush_interval(self, mocker):
+        import time
+        repo = mocker.MagicMock()
+        writer = ResultWriter(repo, batch_size=100, flush_interval=0.01).start()
+
+        writer.put({'iteration': 1})
+        time.sleep(0.2)
+        repo.bulk_create.assert_called_once_with([{'iteration': 1}])
+
+        writer.close()
+        repo.bulk_create.assert_called_once_with([{'iteration': 1}])
+
+    def test_error_is_raised(self, mocker):
+        repo = mocker.MagicMock()
+        repo.bulk_create.side_effect = Exception('something went horribly wrong')
+        writer = ResultWriter(repo, batch_size=1, max_queue=1).start()
+
+        writer.put({'iteration': 1})
+        with pytest.raises(Exception) as exc:
+            writer.close()
+
+        assert 'something went horribly wrong' in str(exc.value)
@@ -83,6 +83,7 @@ class TestPlot(object):
 
         assert plt == plot.plot
         plot.draw.assert_called_once_with({'y': 0, 'x': 0, 'z': 0})
+        plot.repo.get.assert_called_once_with(['name', None], load={'tests': 'selectin'})
 
     def test_plotting_multiple(self, mocker):
         plot = self.setup_plot(mocker)
@@ -1,4 +1,5 @@
 from experimentum.Storage.Migrations import Blueprint, ForeignKey
+import pytest
 
 
 class TestBlueprint(object):
@@ -256,6 +257,31 @@ class TestBlueprint(object):
         assert isinstance(key.get('key'), ForeignKey)
         assert isinstance(fkey, ForeignKey)
 
+    def test_add_foreign_key_index(self):
+        blueprint = Blueprint('some_table')
+        blueprint.foreign('col_name')
+        assert blueprint.indexes == [
+            {'col': 'col_name', 'type': 'index', 'name': 'some_table_col_name_index'}
+        ]
+
+        # an index with the same name replaces the index of the foreign key
+        blueprint.index('col_name')
+        assert len(blueprint.indexes) == 1
+
+    @pytest.mark.parametrize('indexes, index, expected', [
+        ([['col_name', 'unique']], True, 1),
+        ([[['col_name', 'other'], 'index']], True, 1),
+        ([[['other', 'col_name'], 'index']], True, 2),
+        ([], False, 0),
+    ])
+    def test_add_foreign_key_without_index(self, indexes, index, expected):
+        blueprint = Blueprint('some_table')
+        for col, idx_type in indexes:
+            blueprint._add_idx(col, idx_type)
+
+        blueprint.foreign('col_name', index=index)
+        assert len(blueprint.indexes) == expected
+
     def test_drop_primary(self):
         blueprint = Blueprint('some_table')
         blueprint.drop_primary('col_name')
@@ -1,6 +1,9 @@
 from experimentum.Storage.Migrations import Migrator, Migration
 from datetime import datetime
+from contextlib import contextmanager
 import pytest
+import sys
+import os
 
 _STUB_ = """
 from experimentum.Storage.Migrations import Migration
@@ -50,6 +53,35 @@ class TestMigrator(object):
         for name, migration in migrator.migrations.items():
             assert isinstance(migration, Migration)
 
+    def test_init_does_not_import_migrations(self, tmpdir, mocker):
+        self._create_migration_file(0, tmpdir)
+        load_source = mocker.spy(sys.modules[Migrator.__module__].imp, 'load_source')
+
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        migrator.status(printing=False)
+
+        assert load_source.call_count == 0
+        assert len(migrator.migrations) == 1
+        assert migrator.migrations.get('foo') is None
+
+    def test_migrations_are_cached(self, tmpdir, mocker):
+        fname = self._create_migration_file(2, tmpdir)
+        load_source = mocker.spy(sys.modules[Migrator.__module__].imp, 'load_source')
+
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        migration = migrator.migrations[fname[:-3]]
+        assert migrator.migrations[fname[:-3]] is migration
+
+        other = self._create_migrator(tmpdir.strpath, mocker).migrations[fname[:-3]]
+        assert type(other) is type(migration)
+        assert load_source.call_count == 1
+
+        # changed files are loaded again
+        mtime = os.stat(tmpdir.join(fname).strpath).st_mtime
+        os.utime(tmpdir.join(fname).strpath, (mtime + 1, mtime + 1))
+        self._create_migrator(tmpdir.strpath, mocker).migrations[fname[:-3]]
+        assert load_source.call_count == 2
+
     def test_status_not_migrated(self, tmpdir, mocker, capsys):
         fname = self._create_migration_file(0, tmpdir)
         migrator = self._create_migrator(tmpdir.strpath, mocker)
@@ -104,6 +136,66 @@ class TestMigrator(object):
         assert pytest_wrapped_e.type == SystemExit
         assert pytest_wrapped_e.value.code == 1
 
+    def _mock_transaction(self, migrator, transactional):
+        @contextmanager
+        def transaction():
+            yield transactional
+
+        migrator.app.make.return_value.transaction = transaction
+
+    @pytest.mark.parametrize('transactional', [True, False])
+    def test_upgrade_all(self, tmpdir, mocker, capsys, transactional):
+        self._create_migration_file(0, tmpdir)
+        self._create_migration_file(100, tmpdir)
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        self._mock_transaction(migrator, transactional)
+
+        migrator.upgrade()
+
+        assert capsys.readouterr().out.count('Migrated') == 2
+        assert tmpdir.join('.version').read() == '|{}|{}'.format(
+            datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S'),
+            datetime.utcfromtimestamp(100).strftime('%Y%m%d%H%M%S')
+        )
+
+        migrator.upgrade()
+        assert 'Migrations are all up to date' in capsys.readouterr().out
+
+    def test_upgrade_to_target(self, tmpdir, mocker):
+        self._create_migration_file(0, tmpdir)
+        self._create_migration_file(100, tmpdir)
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        self._mock_transaction(migrator, True)
+
+        migrator.upgrade(datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S'))
+        assert tmpdir.join('.version').read() == '|' + datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S')
+
+    def test_upgrade_to_unknown_target(self, tmpdir, mocker):
+        self._create_migration_file(0, tmpdir)
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+
+        with pytest.raises(SystemExit):
+            migrator.upgrade('19991231235959')
+
+        assert tmpdir.join('.version').read() == ''
+
+    @pytest.mark.parametrize('transactional, expected', [
+        (True, ''),
+        (False, '|' + datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S'))
+    ])
+    def test_upgrade_fails(self, tmpdir, mocker, capsys, transactional, expected):
+        self._create_migration_file(0, tmpdir)
+        fname = self._create_migration_file(100, tmpdir)
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        self._mock_transaction(migrator, transactional)
+        migrator.migrations[fname[:-3]].up = mocker.MagicMock(side_effect=ValueError('foo'))
+
+        with pytest.raises(SystemExit):
+            migrator.upgrade()
+
+        assert tmpdir.join('.version').read() == expected
+        assert ('rolled back' in capsys.readouterr().err) is transactional
+
     def test_downgrade_latest_migration(self, tmpdir, mocker):
         self._create_migration_file(0, tmpdir)
         self._create_migration_file(100, tmpdir)
@@ -151,4 +243,63 @@ class TestMigrator(object):
         migrator.refresh()
 
         migrator.down.assert_called_with(migrator.migrations.get(migration))
-        migrator.up.assert_called_with(migrator.migrations.get(migration))
\ No newline at end of file
+        migrator.up.assert_called_with(migrator.migrations.get(migration))
+    def test_squash(self, tmpdir, mocker, capsys):
+        first = self._create_migration_file(0, tmpdir)
+        last = self._create_migration_file(100, tmpdir)
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        snapshot = mocker.patch.object(sys.modules[Migrator.__module__], 'Snapshot')
+        snapshot.return_value.render_up.return_value = '        pass'
+        snapshot.return_value.render_down.return_value = '        pass'
+
+        migrator.squash('My Snapshot')
+
+        revision = datetime.utcfromtimestamp(100).strftime('%Y%m%d%H%M%S')
+        assert 'Squashed 2 migrations' in capsys.readouterr().out
+        assert tmpdir.join('squashed', first).check() is True
+        assert tmpdir.join('squashed', last).check() is True
+        assert migrator.get_migration_files(tmpdir.strpath) == [revision + '_my_snapshot']
+
+        # running the snapshot records all squashed revisions
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        migrator.up()
+        assert tmpdir.join('.version').read() == '|{}|{}'.format(
+            datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S'), revision
+        )
+
+        migrator.down()
+        assert tmpdir.join('.version').read() == ''
+
+    def test_squash_data_migration(self, tmpdir, mocker, capsys):
+        first = self._create_migration_file(0, tmpdir)
+        tmpdir.join('19700101000140_data_migration.py').write(
+            'from experimentum.Storage.Migrations import Migration\n'
+            'class DataMigration(Migration):\n'
+            '    revision = "19700101000140"\n'
+            '    def up(self):\n'
+            '        self.schema.app.repositories.get("FooRepository").create()\n'
+        )
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+
+        with pytest.raises(SystemExit):
+            migrator.squash()
+
+        assert 'Only schema changes can be squashed' in capsys.readouterr().err
+        assert tmpdir.join(first).check() is True
+        assert migrator.app.repositories.get.called is False
+
+    def test_squash_without_migrations(self, tmpdir, mocker, capsys):
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+        migrator.squash()
+        assert 'There are no migrations to squash' in capsys.readouterr().out
+
+    def test_squash_partially_migrated(self, tmpdir, mocker):
+        self._create_migration_file(0, tmpdir)
+        self._create_migration_file(100, tmpdir)
+        tmpdir.join('.version').write('|' + datetime.utcfromtimestamp(0).strftime('%Y%m%d%H%M%S'))
+        migrator = self._create_migrator(tmpdir.strpath, mocker)
+
+        with pytest.raises(SystemExit):
+            migrator.squash()
+
+        assert len(migrator.get_migration_files(tmpdir.strpath)) == 2
@@ -0,0 +1,115 @@
+from experimentum.Storage.Migrations import Snapshot, Blueprint
+import pytest
+
+
+class TestSnapshot(object):
+    def _setup(self, mocker):
+        mock_app = mocker.patch('experimentum.Experiments.App')
+        mock_app.make = lambda alias, *args: Blueprint(*args)
+        self.snapshot = Snapshot(mock_app)
+
+        with self.snapshot.create('users') as table:
+            table.increments('id')
+            table.primary('id')
+            table.string('name').nullable()
+            table.integer('age').default(3).unsigned()
+            table.unique('name')
+
+    def test_create(self, mocker):
+        self._setup(mocker)
+
+        assert self.snapshot.has_table('users') is True
+        assert self.snapshot.has_column('users', 'age') is True
+        assert self.snapshot.has_column('users', 'foo') is False
+        assert self.snapshot.render_up(0).split('\n') == [
+            "with self.schema.create('users') as table:",
+            "    table.add_column('integer', 'id', autoincrement=True)",
+            "    table.add_column('string', 'name', length=None).nullable()",
+            "    table.add_column('integer', 'age').default(3).unsigned()",
+            "    table.primary('id', 'users_id_primary')",
+            "    table.unique('name', 'users_name_unique')",
+        ]
+
+    def test_refuses_data_changes(self, mocker):
+        self._setup(mocker)
+
+        with pytest.raises(TypeError):
+            self.snapshot.store.execute('DELETE FROM users')
+        with pytest.raises(TypeError):
+            self.snapshot.app.repositories
+        with pytest.raises(TypeError):
+            self.snapshot.app.make('store')
+        with pytest.raises(TypeError):
+            self.snapshot.store.make('blueprint', 'users')
+
+    def test_alter(self, mocker):
+        self._setup(mocker)
+
+        with self.snapshot.table('users') as table:
+            table.drop_column('age')
+            table.drop_unique('name')
+            table.drop_primary('id')
+            table.string('email', 100)
+            table.index('email')
+            table.index('id')
+
+        lines = self.snapshot.render_up(0).split('\n')
+        assert lines[1:] == [
+            "    table.add_column('integer', 'id', autoincrement=True)",
+            "    table.add_column('string', 'name', length=None).nullable()",
+            "    table.add_column('string', 'email', length=100)",
+            "    table.index('email', 'users_email_index')",
+            "    table.index('id', 'users_id_index')",
+        ]
+
+    def test_rename_and_order(self, mocker):
+        self._setup(mocker)
+
+        with self.snapshot.create('posts') as table:
+            table.increments('id')
+            table.integer('author_id')
+            table.foreign('author_id').references('id').on('authors').on_delete('cascade')
+
+        with self.snapshot.create('authors') as table:
+            table.increments('id')
+
+        self.snapshot.rename('users', 'people')
+        self.snapshot.rename('authors', 'writers')
+
+        lines = self.snapshot.render_up(0).split('\n')
+        assert [line for line in lines if line.startswith('with')] == [
+            "with self.schema.create('people') as table:",
+            "with self.schema.create('writers') as table:",
+            "with self.schema.create('posts') as table:",
+        ]
+        assert "    table.index('author_id', 'posts_author_id_index')" in lines
+        assert "    table.foreign('author_id', 'posts_author_id_foreign').references('id')" \
+            ".on('writers').on_delete('cascade')" in lines
+        assert self.snapshot.render_down(0).split('\n') == [
+            "self.schema.drop_if_exists('posts')",
+            "self.schema.drop_if_exists('writers')",
+            "self.schema.drop_if_exists('people')",
+        ]
+
+    def test_foreign_key_without_index(self, mocker):
+        self._setup(mocker)
+
+        with self.snapshot.create('posts') as table:
+            table.integer('author_id')
+            table.foreign('author_id', index=False).references('id').on('users')
+
+        assert "    table.foreign('author_id', 'posts_author_id_foreign', index=False)" \
+            ".references('id').on('users')" in self.snapshot.render_up(0).split('\n')
+
+    def test_drop(self, mocker):
+        self._setup(mocker)
+
+        self.snapshot.drop_if_exists('foo')
+        self.snapshot.drop('users')
+
+        assert self.snapshot.has_table('users') is False
+        assert self.snapshot.render_up(4) == '    pass'
+        assert self.snapshot.render_down(4) == '    pass'
+
+        with pytest.raises(TypeError):
+            self.snapshot.drop('users')
@@ -1,5 +1,8 @@
 from experimentum.Storage.SQLAlchemy import Platform
-from sqlalchemy import Column, Text, ForeignKey, create_engine
+from sqlalchemy import Column, Text, ForeignKey, create_engine, Integer, Index, MetaData, Table,\
+    select
+import pytest
+import sys
 
 
 class TestPlatform(object):
@@ -44,6 +47,16 @@ class TestPlatform(object):
         assert self.platform.is_mssql() is True
         self.platform.engine.dialect = dialect
 
+    @pytest.mark.parametrize('version, expected', [
+        ((2, 7, 18), False),
+        ((3, 5, 9), False),
+        ((3, 6, 0), True),
+    ])
+    def test_supports_transactional_ddl_sqlite(self, mocker, version, expected):
+        self._setup_platform(mocker)
+        mocker.patch.object(sys.modules[Platform.__module__], 'sys', version_info=version)
+        assert self.platform.supports_transactional_ddl() is expected
+
     def test_get_add_column_sql(self, mocker):
         self._setup_platform(mocker)
         sql = self.platform.get_add_column_sql('foo_table', Column('bar_col', Text))
@@ -97,6 +110,41 @@ class TestPlatform(object):
         assert self._drop_key(mocker, 'index', 'is_mysql') == 'ALTER TABLE foo DROP INDEX foo_bar_index;'
         assert self._drop_key(mocker, 'index', 'is_mssql') == 'DROP INDEX foo_bar_index ON foo;'
 
+    def test_explain_sqlite(self, mocker):
+        self._setup_platform(mocker)
+        meta = MetaData()
+        table = Table('foo', meta, Column('bar', Integer))
+        table.create(self.engine)
+
+        plan = self.platform.explain(select([table]).where(table.c.bar == 1))
+        assert plan[0].startswith('SCAN')
+        assert self.platform.is_full_scan(plan) is True
+
+        Index('foo_bar_index', table.c.bar).create(self.engine)
+        plan = self.platform.explain(select([table]).where(table.c.bar == 1))
+        assert self.platform.is_full_scan(plan) is False
+        table.drop(self.engine)
+
+    def test_explain_not_supported(self, mocker):
+        self._setup_platform(mocker)
+        self.platform.is_sqlite = mocker.MagicMock(return_value=False)
+        table = Table('foo', MetaData(), Column('bar', Integer))
+
+        assert self.platform.explain(select([table])) == []
+
+    @pytest.mark.parametrize('dialect, plan, expected', [
+        ('is_postgresql', ['Seq Scan on foo  (cost=0.00..1.01 rows=1 width=4)'], True),
+        ('is_postgresql', ['Index Scan using foo_bar_index on foo'], False),
+        ('is_mysql', ['foo: type=ALL, key=None'], True),
+        ('is_mysql', ['foo: type=ref, key=foo_bar_index'], False),
+    ])
+    def test_is_full_scan(self, mocker, dialect, plan, expected):
+        self._setup_platform(mocker)
+        self.platform.is_sqlite = mocker.MagicMock(return_value=False)
+        setattr(self.platform, dialect, mocker.MagicMock(return_value=True))
+
+        assert self.platform.is_full_scan(plan) is expected
+
     def _get_key(self, mocker, *args, **kwargs):
         self._setup_platform(mocker)
         col = Column('foobar', Text, *args, **kwargs)
@@ -0,0 +1,110 @@
+from experimentum.Storage.SQLAlchemy import QueryProfiler, Repository
+from sqlalchemy.orm.strategies import AbstractRelationshipLoader
+from sqlalchemy import create_engine
+from sqlalchemy.event import contains
+import sys
+
+
+class FooRepository(Repository):
+    pass
+
+
+def _caller_in(module, code, **local_vars):
+    """Get the caller of a statement which is executed by code of another module."""
+    namespace = {'__name__': module, 'sys': sys, 'QueryProfiler': QueryProfiler}
+    exec('def run({args}):\n    {code}'.format(args=', '.join(local_vars), code=code), namespace)
+    return namespace['run'](**local_vars)
+
+
+class TestQueryProfiler(object):
+    def test_start_and_stop(self):
+        engine = create_engine('sqlite://')
+        profiler = QueryProfiler()
+        profiler.start(engine)
+
+        assert profiler.engine is engine
+        assert contains(engine, 'before_cursor_execute', profiler._before_execute)
+        assert contains(engine, 'after_cursor_execute', profiler._after_execute)
+
+        profiler.stop()
+        assert profiler.engine is None
+        assert not contains(engine, 'before_cursor_execute', profiler._before_execute)
+        assert not contains(engine, 'after_cursor_execute', profiler._after_execute)
+
+        # Stopping twice does nothing
+        profiler.stop()
+
+    def test_export(self):
+        engine = create_engine('sqlite://')
+        profiler = QueryProfiler(slowest=2)
+        profiler.start(engine)
+
+        engine.execute('CREATE TABLE foo (id INTEGER)')
+        engine.execute('INSERT INTO foo VALUES (1)')
+        engine.execute('SELECT   *\n   FROM foo')
+        profiler.stop()
+        engine.execute('SELECT * FROM foo')
+
+        data = profiler.export()
+        assert len(data['callers']) == 1
+        assert data['callers'][0]['caller'] == 'other'
+        assert data['callers'][0]['count'] == 3
+        assert data['callers'][0]['total_time'] > 0
+        assert data['callers'][0]['mean_time'] == data['callers'][0]['total_time'] / 3
+        assert data['callers'][0]['max_time'] == max(row['time'] for row in data['slowest'])
+
+        assert len(data['slowest']) == 2
+        assert data['slowest'][0]['time'] >= data['slowest'][1]['time']
+        assert all(row['caller'] == 'other' for row in data['slowest'])
+        assert set(row['statement'] for row in data['slowest']) <= set([
+            'CREATE TABLE foo (id INTEGER)', 'INSERT INTO foo VALUES (1)', 'SELECT * FROM foo'
+        ])
+
+    def test_export_sorted_by_total_time(self, mocker):
+        profiler = QueryProfiler(slowest=0)
+        conn = mocker.MagicMock(info={})
+        timer = mocker.patch.object(sys.modules[QueryProfiler.__module__], 'default_timer')
+        timer.side_effect = [0, 1, 0, 3, 0, 1]
+
+        for caller in ['Foo.get', 'Foo.create', 'Foo.get']:
+            mocker.patch.object(QueryProfiler, 'get_caller', return_value=caller)
+            profiler._before_execute(conn, None, 'SELECT 1', None, None, False)
+            profiler._after_execute(conn, None, 'SELECT 1', None, None, False)
+
+        assert profiler.export() == {
+            'callers': [
+                {'caller': 'Foo.create', 'count': 1, 'total_time': 3, 'mean_time': 3, 'max_time': 3},
+                {'caller': 'Foo.get', 'count': 2, 'total_time': 2, 'mean_time': 1, 'max_time': 1}
+            ],
+            'slowest': []
+        }
+
+    def test_reset(self):
+        engine = create_engine('sqlite://')
+        profiler = QueryProfiler()
+        profiler.start(engine)
+        engine.execute('SELECT 1')
+
+        profiler.reset()
+        assert profiler.export() == {'callers': [], 'slowest': []}
+
+    def test_get_caller_other(self):
+        assert QueryProfiler.get_caller(sys._getframe()) == 'other'
+
+    def test_get_caller_repository_method(self):
+        code = 'return QueryProfiler.get_caller(sys._getframe())'
+        module = Repository.__module__
+
+        assert _caller_in(module, code, cls=FooRepository) == 'FooRepository.run'
+        assert _caller_in(module, code, self=FooRepository()) == 'FooRepository.run'
+        assert _caller_in(module, code, self=object()) == 'other'
+        assert _caller_in('foo', code, cls=FooRepository) == 'other'
+
+    def test_get_caller_relationship(self, mocker):
+        loader = mocker.MagicMock(spec=AbstractRelationshipLoader, key='bars')
+        loader.parent.class_ = FooRepository
+        code = 'return QueryProfiler.get_caller(sys._getframe())'
+
+        assert _caller_in('sqlalchemy.orm.strategies', code, self=loader) == \
+            'FooRepository.bars (relationship)'
+        assert _caller_in('sqlalchemy.orm.strategies', code, self=object()) == 'other'
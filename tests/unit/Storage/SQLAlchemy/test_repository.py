@@ -1,8 +1,9 @@
 from experimentum.Storage.SQLAlchemy import Repository
 from alchemy_mock.mocking import UnifiedAlchemyMagicMock
-from sqlalchemy import or_
+from sqlalchemy import column, or_
 from sqlalchemy.event import contains
 import pytest
+import sys
 
 
 class mock_foo_relation(Repository):
@@ -60,6 +61,36 @@ class TestAbstractStore(object):
             Repository, Repository, table, properties={'foo': mocker.ANY, 'bar': mocker.ANY}
         )
 
+    def test_mapping_relationship_loading_strategy(self, mocker):
+        store = mocker.patch('experimentum.Storage.SQLAlchemy.Store')
+        mocker.patch.object(Repository, 'map_to_table')
+        relationship = mocker.patch.object(sys.modules[Repository.__module__], 'relationship')
+
+        Repository.__relationships__ = {'foo': [mock_foo_relation, 'selectin']}
+        Repository.mapping(Repository, store)
+
+        relationship.assert_called_once_with(mock_foo_relation, lazy='selectin')
+
+    def test_bulk_insert_many_to_one(self, mocker):
+        from sqlalchemy.orm.interfaces import MANYTOONE
+        store = mocker.patch('experimentum.Storage.SQLAlchemy.Store')
+        inspect = mocker.patch.object(sys.modules[Repository.__module__], 'inspect')
+        inspect.return_value.relationships = {'foo': mocker.MagicMock(direction=MANYTOONE)}
+        Repository.store = store
+        Repository.__relationships__ = {'foo': [mock_foo_relation]}
+        conn = mocker.MagicMock()
+
+        with pytest.raises(TypeError):
+            Repository._bulk_insert(conn, [{'bar': 1, 'foo': {'baz': 2}}], 10)
+
+        conn.execute.assert_not_called()
+
+    def test_same_keys(self):
+        rows = [{'a': 1}, {'a': 2}, {'a': 3, 'b': 4}, {'a': 5}]
+        groups = list(sys.modules[Repository.__module__]._same_keys(rows))
+
+        assert groups == [[{'a': 1}, {'a': 2}], [{'a': 3, 'b': 4}], [{'a': 5}]]
+
     def test_mapping_fail(self, mocker, caplog):
         store = mocker.patch('experimentum.Storage.SQLAlchemy.Store')
         Repository.__relationships__ = {}
@@ -136,6 +167,49 @@ class TestAbstractStore(object):
             mocker.call(or_(Repository.id != 2))
         ])
 
+    def test_get_select_group_order_limit(self, mocker):
+        repo = self.setup_repo(mocker)
+        mocker.patch.object(Repository, 'label', create=True)
+        mocker.patch.object(Repository, 'time', create=True)
+        repo.store.session = mocker.MagicMock()
+        query = repo.store.session.query.return_value
+
+        repo.get(
+            select=['label', ['avg', 'time']], group_by='label', order_by=['-avg_time', 'label'],
+            limit=10, offset=5
+        )
+        assert repo.store.session.query.call_args[0][0] is Repository
+        query.with_entities.assert_called_once()
+        query = query.with_entities.return_value.filter.return_value.filter.return_value
+        query.group_by.assert_called_once_with(Repository.label)
+        query.group_by.return_value.order_by.assert_called_once()
+        query = query.group_by.return_value.order_by.return_value
+        query.limit.assert_called_once_with(10)
+        query.limit.return_value.offset.assert_called_once_with(5)
+
+    def test_get_select_unknown_aggregate(self, mocker):
+        repo = self.setup_repo(mocker)
+        with pytest.raises(TypeError):
+            repo.get(select=[['median', 'id']])
+
+    @pytest.mark.parametrize('operator, value, expected', [
+        ('in', [1, 2], 'id IN (:id_1, :id_2)'),
+        ('NOT IN', [1, 2], 'id NOT IN (:id_1, :id_2)'),
+        ('between', [1, 2], 'id BETWEEN :id_1 AND :id_2'),
+        ('like', 'foo%', 'id LIKE :id_1'),
+        ('not like', 'foo%', 'id NOT LIKE :id_1'),
+        ('is', None, 'id IS NULL'),
+        ('is not', None, 'id IS NOT NULL'),
+    ])
+    def test_compare_operators(self, operator, value, expected):
+        compare = sys.modules[Repository.__module__]._compare
+        assert str(compare(column('id'), operator, value)) == expected
+
+    def test_compare_unknown_operator(self):
+        compare = sys.modules[Repository.__module__]._compare
+        with pytest.raises(TypeError):
+            compare(column('id'), 'foo', 1)
+
     def test_first(self, mocker):
         repo = self.setup_repo(mocker)
         repo.first()
@@ -1,6 +1,8 @@
-from experimentum.Storage.SQLAlchemy.SQLitePlatform import SQLitePlatform, prepare_columns
-from sqlalchemy import Column, Text, Table, create_engine, MetaData
-from sqlalchemy import inspect, ForeignKey, Index
+from experimentum.Storage.SQLAlchemy.SQLitePlatform import SQLitePlatform, prepare_columns, \
+    get_pragmas, set_pragmas, PRAGMAS
+from sqlalchemy import Column, Text, Integer, Table, create_engine, MetaData
+from sqlalchemy import inspect, ForeignKey, Index, event
+import pytest
 
 
 class TestSQLitePlatform(object):
@@ -110,6 +112,134 @@ class TestSQLitePlatform(object):
         self.platform.alter_table('foo', [], {'columns': [], 'indexes': [{'type': 'index', 'col': 'bar', 'name': 'foo_bar_index'}]})
         assert inspector.get_indexes('foo') == []
 
+    def _setup_table(self, rows=0):
+        self._setup_platform()
+        table = Table(
+            'foo', self.platform.meta, Column('id', Integer, primary_key=True), Column('bar', Text),
+            Column('baz', Text), Index('foo_bar_index', 'bar')
+        )
+        table.create(self.platform.engine)
+        for idx in range(rows):
+            self.platform.engine.execute(table.insert(), {'id': idx + 1, 'bar': str(idx)})
+        return table
+
+    def test_alter_table_native(self, mocker):
+        self._setup_table(3)
+        rebuild = mocker.spy(self.platform, '_rebuild_table')
+
+        self.platform.alter_table('foo', [
+            Column('qux', Integer, ForeignKey('foo.id', name='foo_qux_foreign'), nullable=True),
+            Index('foo_qux_unique', 'qux', unique=True)
+        ], {'columns': ['baz'], 'indexes': [{'type': 'index', 'col': 'bar', 'name': 'foo_bar_index'}]})
+
+        inspector = inspect(self.platform.engine)
+        assert rebuild.call_count == 0
+        assert [col['name'] for col in inspector.get_columns('foo')] == ['id', 'bar', 'qux']
+        assert inspector.get_foreign_keys('foo')[0]['referred_table'] == 'foo'
+        assert [idx['name'] for idx in inspector.get_indexes('foo')] == ['foo_qux_unique']
+        assert self.platform.engine.execute('SELECT COUNT(*) FROM foo').scalar() == 3
+
+    @pytest.mark.parametrize('cols, dropped', [
+        ([], {'columns': ['id'], 'indexes': []}),
+        ([], {'columns': ['bar'], 'indexes': []}),
+        ([], {'columns': [], 'indexes': [{'type': 'primary', 'col': 'id', 'name': 'foo_id_primary'}]}),
+        ([Column('bar', Integer)], {'columns': [], 'indexes': []}),
+        ([Column('qux', Integer, primary_key=True)], {'columns': [], 'indexes': []}),
+    ])
+    def test_supports_native_alter(self, cols, dropped):
+        table = self._setup_table()
+        assert self.platform.supports_native_alter(table, cols, dropped) is False
+
+    def test_supports_native_drop_column_version(self, mocker):
+        table = self._setup_table()
+        dropped = {'columns': ['baz'], 'indexes': []}
+        assert self.platform.supports_native_alter(table, [], dropped) is True
+
+        dbapi = mocker.patch.object(self.platform.engine.dialect, 'dbapi')
+        dbapi.sqlite_version_info = (3, 34, 1)
+        assert self.platform.supports_native_alter(table, [], dropped) is False
+
+    def test_alter_table_rebuild(self, mocker, capsys):
+        self._setup_table(5)
+        self.platform.chunk_size = 2
+        copy_rows = mocker.spy(self.platform, '_copy_rows')
+
+        self.platform.alter_table(
+            'foo', [Column('qux', Integer, nullable=True)],
+            {'columns': ['baz'], 'indexes': [{'type': 'primary', 'col': 'id', 'name': 'foo_id_primary'}]}
+        )
+
+        inspector = inspect(self.platform.engine)
+        assert copy_rows.call_count == 1
+        assert inspector.get_table_names() == ['foo']
+        assert [col['name'] for col in inspector.get_columns('foo')] == ['id', 'bar', 'qux']
+        assert inspector.get_pk_constraint('foo')['constrained_columns'] == []
+        assert [idx['name'] for idx in inspector.get_indexes('foo')] == ['foo_bar_index']
+        assert self.platform.engine.execute('SELECT bar FROM foo').fetchall() == [
+            (str(idx),) for idx in range(5)
+        ]
+        assert 'Copying foo:' in capsys.readouterr().out
+        self.platform.chunk_size = 100000
+
+    def test_copy_rows_with_sparse_rowids(self, capsys):
+        engine = create_engine('sqlite://')
+        engine.execute('CREATE TABLE foo (bar INTEGER)')
+        engine.execute('CREATE TABLE baz (bar INTEGER)')
+        for rowid in [-5, 1, 2, 10 ** 6, 2 ** 40]:
+            engine.execute('INSERT INTO foo (rowid, bar) VALUES (?, ?)', (rowid, rowid))
+
+        statements = []
+        event.listen(
+            engine, 'before_cursor_execute', lambda *args: statements.append(args[2])
+        )
+        platform = SQLitePlatform()
+        platform.chunk_size = 2
+
+        with engine.begin() as conn:
+            platform._copy_rows(conn, 'foo', 'baz', ['bar'])
+
+        assert [row[0] for row in engine.execute('SELECT bar FROM baz ORDER BY bar')] == \
+            [-5, 1, 2, 10 ** 6, 2 ** 40]
+
+        # 5 rows are copied in 3 chunks, the progress bar counts rows
+        inserts = [sql for sql in statements if sql.startswith('INSERT INTO baz')]
+        assert len(inserts) == 3
+        assert 'Copying foo:' in capsys.readouterr().out
+
+    def test_copy_rows_empty_table(self):
+        engine = create_engine('sqlite://')
+        engine.execute('CREATE TABLE foo (bar INTEGER)')
+        engine.execute('CREATE TABLE baz (bar INTEGER)')
+
+        with engine.begin() as conn:
+            SQLitePlatform()._copy_rows(conn, 'foo', 'baz', ['bar'])
+
+        assert engine.execute('SELECT COUNT(*) FROM baz').scalar() == 0
+
+    def test_alter_table_twice(self):
+        self._setup_table(1)
+        dropped = {'columns': [], 'indexes': [{'type': 'primary', 'col': 'id', 'name': 'foo_id_primary'}]}
+
+        self.platform.alter_table('foo', [], dropped)
+        self.platform.alter_table('foo', [], {'columns': ['baz'], 'indexes': []})
+
+        inspector = inspect(self.platform.engine)
+        assert [col['name'] for col in inspector.get_columns('foo')] == ['id', 'bar']
+        assert inspector.get_pk_constraint('foo')['constrained_columns'] == []
+
+    def test_alter_table_rebuild_rollback(self):
+        self._setup_table(2)
+
+        with pytest.raises(Exception):
+            self.platform.alter_table('foo', [Column('qux', Integer, nullable=False)], {
+                'columns': [], 'indexes': [{'type': 'primary', 'col': 'id', 'name': 'foo_id_primary'}]
+            })
+
+        inspector = inspect(self.platform.engine)
+        assert inspector.get_table_names() == ['foo']
+        assert [col['name'] for col in inspector.get_columns('foo')] == ['id', 'bar', 'baz']
+        assert self.platform.engine.execute('SELECT COUNT(*) FROM foo').scalar() == 2
+
     def test_prepare_columns_drop(self):
         key = ForeignKey('bar', name='fkey_bar')
         col = Column('bar', Text, key)
@@ -118,3 +248,37 @@ class TestSQLitePlatform(object):
         assert prepare_columns(
             [col], [key], {'indexes': idx, 'columns': ['bar']}
         ) == {'columns': [], 'names': []}
+
+
+class TestSQLiteProfile(object):
+    def test_get_default_pragmas(self):
+        assert get_pragmas() == PRAGMAS
+
+    def test_get_custom_pragmas(self):
+        pragmas = get_pragmas({'synchronous': 'FULL', 'mmap_size': None, 'foreign_keys': 'ON'})
+
+        assert ('synchronous', 'FULL') in pragmas
+        assert 'mmap_size' not in dict(pragmas)
+        assert pragmas[-1] == ('foreign_keys', 'ON')
+        assert pragmas[0] == ('journal_mode', 'WAL')
+
+    @pytest.mark.parametrize('profile', [
+        {'synchronous': 'OFF; DROP TABLE foo'},
+        {'foo bar': 1},
+    ])
+    def test_invalid_pragmas(self, profile):
+        with pytest.raises(TypeError):
+            get_pragmas(profile)
+
+    def test_set_pragmas(self, tmpdir):
+        engine = create_engine('sqlite:///' + tmpdir.join('test.db').strpath)
+        set_pragmas(engine, {'cache_size': -1000})
+
+        with engine.connect() as conn:
+            assert conn.execute('PRAGMA journal_mode').scalar() == 'wal'
+            assert conn.execute('PRAGMA synchronous').scalar() == 1
+            assert conn.execute('PRAGMA cache_size').scalar() == -1000
+            assert conn.execute('PRAGMA temp_store').scalar() == 2
+            assert conn.execute('PRAGMA busy_timeout').scalar() == 5000
+
+        engine.dispose()
@@ -1,10 +1,14 @@
-from experimentum.Storage.SQLAlchemy import Store
+from experimentum.Storage.SQLAlchemy import Store, Platform
 from experimentum.Storage.Migrations import Blueprint
 from sqlalchemy import create_engine, MetaData, Table, Column, Integer, inspect, Index
-from sqlalchemy.orm.session import Session
+from sqlalchemy.orm import mapper
+from sqlalchemy.orm.scoping import scoped_session
 from sqlalchemy.dialects.mysql import INTEGER, BIGINT, DOUBLE, LONGTEXT, MEDIUMINT, MEDIUMTEXT
 from sqlalchemy.types import ARRAY, BigInteger, Boolean, Date, DateTime, Enum,\
     LargeBinary, Numeric, SmallInteger, String, Text, Time, CHAR, Float, JSON, TIMESTAMP
+import threading
+import pytest
+import sys
 
 
 class TestStore(object):
@@ -27,7 +31,183 @@ class TestStore(object):
         store.set_engine(engine)
         assert store.engine is engine
         assert isinstance(store.meta, MetaData)
-        assert isinstance(store.session, Session)
+        assert isinstance(store.session, scoped_session)
+
+    def test_session_per_thread(self, mocker):
+        store = self._init_store(mocker)
+        sessions = []
+
+        thread = threading.Thread(target=lambda: sessions.append(store.session()))
+        thread.start()
+        thread.join()
+
+        assert store.session() is store.session()
+        assert sessions[0] is not store.session()
+
+    def test_remove_session(self, mocker):
+        store = self._init_store(mocker)
+        session = store.session()
+
+        store.remove_session()
+        assert store.session() is not session
+
+    def test_set_session_policy(self, mocker):
+        store = self._init_store(mocker)
+        assert store.session_policy == 'expunge'
+
+        store.set_session_policy('recycle', 10)
+        assert store.session_policy == 'recycle'
+        assert store.recycle_after == 10
+
+        with pytest.raises(TypeError):
+            store.set_session_policy('foo')
+
+    @pytest.mark.parametrize('policy, expired', [
+        ('expunge', False), ('recycle', False), ('keep', True)
+    ])
+    def test_set_session_policy_expire_on_commit(self, mocker, policy, expired):
+        store = self._init_store(mocker)
+        foo = Table('foo', store.meta, Column('id', Integer, primary_key=True),
+                    Column('bar', Integer))
+        foo.create(store.engine)
+
+        class Foo(object):
+            pass
+
+        mapper(Foo, foo)
+        session = store.session()
+        store.set_session_policy(policy)
+        assert store.session() is not session
+
+        entry = Foo()
+        entry.bar = 1
+        store.session.add(entry)
+        store.session.commit()
+
+        assert ('bar' in inspect(entry).unloaded) is expired
+        assert entry.bar == 1
+
+    def test_release_recycle(self, mocker):
+        store = self._init_store(mocker)
+        collect = mocker.patch('gc.collect')
+        store.set_session_policy('recycle', 2)
+        session = store.session()
+
+        store.release(mocker.MagicMock())
+        assert store.session() is session
+        store.release(mocker.MagicMock())
+        assert store.session() is not session
+        collect.assert_called_once_with()
+
+    def test_release_keep(self, mocker):
+        store = self._init_store(mocker)
+        store.set_session_policy('keep')
+        session = store.session()
+
+        store.release(mocker.MagicMock())
+        assert store.session() is session
+
+    def test_metadata_cache(self, mocker, tmpdir):
+        app = mocker.patch('experimentum.Experiments.App')
+        engine = create_engine('sqlite:///' + tmpdir.join('foo.db').strpath)
+        cache = tmpdir.join('.metadata')
+        Table('foo', MetaData(), Column('id', Integer)).create(engine)
+
+        Store(app).set_engine(engine, cache=cache.strpath, revision='1')
+        assert cache.check()
+
+        reflect = mocker.patch.object(MetaData, 'reflect')
+        store = Store(app)
+        store.set_engine(engine, cache=cache.strpath, revision='1')
+        reflect.assert_not_called()
+        assert 'foo' in store.meta.tables
+        assert store.meta.bind is engine
+
+        store.set_engine(engine, cache=cache.strpath, revision='2')
+        reflect.assert_called_once_with(bind=engine)
+
+    def test_metadata_cache_invalidated(self, mocker, tmpdir):
+        app = mocker.patch('experimentum.Experiments.App')
+        engine = create_engine('sqlite:///' + tmpdir.join('foo.db').strpath)
+        cache = tmpdir.join('.metadata')
+        store = Store(app)
+        store.set_engine(engine, cache=cache.strpath)
+        assert store.has_table('foo') is False
+
+        blueprint = Blueprint('foo')
+        blueprint.add_column('integer', 'id')
+        store.create(blueprint)
+
+        assert not cache.check()
+        assert store.has_table('foo') is True
+
+    def test_metadata_cache_corrupt(self, mocker, tmpdir):
+        app = mocker.patch('experimentum.Experiments.App')
+        cache = tmpdir.join('.metadata')
+        cache.write('foo')
+
+        store = Store(app)
+        store.set_engine(create_engine('sqlite:///'), cache=cache.strpath)
+        assert isinstance(store.meta, MetaData)
+
+    def test_transaction(self, mocker, tmpdir):
+        app = mocker.patch('experimentum.Experiments.App')
+        engine = create_engine('sqlite:///' + tmpdir.join('foo.db').strpath)
+        store = Store(app)
+        store.set_engine(engine)
+
+        with store.transaction() as transactional:
+            assert transactional is True
+            assert store.engine is not engine
+            blueprint = Blueprint('foo')
+            blueprint.add_column('integer', 'id')
+            store.create(blueprint)
+
+        assert store.engine is engine
+        assert 'foo' in inspect(engine).get_table_names()
+
+    def test_transaction_rollback(self, mocker, tmpdir):
+        app = mocker.patch('experimentum.Experiments.App')
+        engine = create_engine('sqlite:///' + tmpdir.join('foo.db').strpath)
+        store = Store(app)
+        store.set_engine(engine)
+
+        with pytest.raises(ValueError):
+            with store.transaction():
+                blueprint = Blueprint('foo')
+                blueprint.add_column('integer', 'id')
+                store.create(blueprint)
+                raise ValueError()
+
+        assert store.engine is engine
+        assert 'foo' not in inspect(engine).get_table_names()
+        assert 'foo' not in store.meta.tables
+
+    def test_transaction_not_supported(self, mocker):
+        store = self._init_store(mocker)
+        store.platform.supports_transactional_ddl = mocker.MagicMock(return_value=False)
+        engine = store.engine
+
+        with store.transaction() as transactional:
+            assert transactional is False
+            assert store.engine is engine
+
+    def test_transaction_not_supported_by_sqlite3(self, mocker, caplog):
+        store = self._init_store(mocker)
+        mocker.patch.object(sys.modules[Platform.__module__], 'sys', version_info=(2, 7, 18))
+
+        with store.transaction() as transactional:
+            assert transactional is False
+
+        assert 'commits before schema changes' in caplog.text
+
+    def test_profile(self, mocker):
+        store = self._init_store(mocker)
+        profiler = store.profile(slowest=3)
+
+        assert profiler.slowest == 3
+        assert profiler.engine is store.engine
+        profiler.stop()
 
     def test_has_table(self, mocker):
         store = self._init_store(mocker)
@@ -37,6 +217,7 @@ class TestStore(object):
         assert store.has_table('foo') is True
 
         table.drop(store.engine)
+        store.invalidate_cache()
         assert store.has_table('foo') is False
 
     def test_has_column(self, mocker):
@@ -47,6 +228,7 @@ class TestStore(object):
         assert store.has_column('foo', 'id') is True
 
         table.drop(store.engine)
+        store.invalidate_cache()
         assert store.has_column('foo', 'id') is False
 
     def test_drop_table(self, mocker):
@@ -145,10 +327,71 @@ class TestStore(object):
         store.engine = mocker.MagicMock()
         store.alter(blueprint)
 
-        idx.create.assert_called_once_with()
+        idx.create.assert_called_once_with(store.engine)
         store.engine.execute.assert_any_call('ALTER TABLE foo ADD COLUMN foo.bar INTEGER;')
         store.engine.execute.assert_any_call('ALTER TABLE foo ADD COLUMN foo.baz INTEGER;')
         store.engine.execute.assert_any_call('ALTER TABLE foo ADD PRIMARY KEY(foo.bar);')
         store.engine.execute.assert_any_call('ALTER TABLE foo DROP COLUMN id;')
         store.engine.execute.assert_any_call('ALTER TABLE foo DROP CONSTRAINT foo_id_primary;')
         assert store.engine.execute.call_count == 5
+
+    def _create_tables(self, store, index=True):
+        blueprint = Blueprint('foo')
+        blueprint.increments('id')
+        blueprint.primary('id')
+        store.create(blueprint)
+
+        blueprint = Blueprint('bar')
+        blueprint.increments('id')
+        blueprint.primary('id')
+        blueprint.integer('foo_id')
+        blueprint.foreign('foo_id', index=index).references('id').on('foo')
+        store.create(blueprint)
+
+    def test_alter_table_index_existing_column(self, mocker):
+        store = self._init_store(mocker)
+        self._create_tables(store, index=False)
+
+        blueprint = Blueprint('bar')
+        blueprint.index('foo_id')
+        store.alter(blueprint)
+
+        assert inspect(store.engine).get_indexes('bar') == [
+            {'name': 'bar_foo_id_index', 'column_names': ['foo_id'], 'unique': 0}
+        ]
+
+    @pytest.mark.parametrize('index, missing', [(True, False), (False, True)])
+    def test_analyze(self, mocker, index, missing):
+        store = self._init_store(mocker)
+        self._create_tables(store, index=index)
+
+        lookups = store.analyze()
+        assert len(lookups) == 1
+        assert lookups[0]['table'] == 'bar'
+        assert lookups[0]['columns'] == ['foo_id']
+        assert lookups[0]['missing'] is missing
+        assert lookups[0]['plan'][0].startswith('SEARCH' if index else 'SCAN')
+
+    def test_analyze_relationships(self, mocker):
+        store = self._init_store(mocker)
+        self._create_tables(store)
+        repo, mapper, relation = mocker.MagicMock(), mocker.MagicMock(), mocker.MagicMock()
+        relation.local_remote_pairs = [(store.meta.tables['bar'].c.foo_id, store.meta.tables['foo'].c.id)]
+        mapper.relationships = [relation]
+        mocker.patch.object(
+            sys.modules[Store.__module__], 'inspect',
+            side_effect=lambda obj, raiseerr=True: mapper if obj is repo else inspect(obj, raiseerr)
+        )
+
+        lookups = store.analyze([repo, object])
+        assert [(lookup['table'], lookup['columns']) for lookup in lookups] == [
+            ('bar', ['foo_id']), ('foo', ['id'])
+        ]
+        assert not any(lookup['missing'] for lookup in lookups)
+
+    def test_analyze_without_query_plan(self, mocker):
+        store = self._init_store(mocker)
+        self._create_tables(store, index=False)
+        store.platform.explain = mocker.MagicMock(return_value=[])
+
+        assert store.analyze()[0]['missing'] is True
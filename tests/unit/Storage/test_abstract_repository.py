@@ -1,6 +1,7 @@
 from experimentum.Storage import AbstractRepository
 import pytest
 import json
+import sys
 
 
 def err(self, foo):
@@ -132,6 +133,32 @@ class TestAbstractRepository(object):
         with pytest.raises(NotImplementedError):
             AbstractRepository.all()
 
+    def test_abstract_iterate(self):
+        with pytest.raises(NotImplementedError):
+            AbstractRepository.iterate()
+
+    def test_abstract_to_arrays(self):
+        with pytest.raises(NotImplementedError):
+            AbstractRepository.to_arrays(['id'])
+
+    def test_to_dataframe(self, mocker):
+        pandas = mocker.MagicMock()
+        mocker.patch.dict(sys.modules, {'pandas': pandas})
+        mocker.patch.object(AbstractRepository, 'to_arrays')
+
+        df = AbstractRepository.to_dataframe(['id'], ['id', '>', 1], order_by='id')
+        AbstractRepository.to_arrays.assert_called_once_with(
+            ['id'], ['id', '>', 1], structured=True, order_by='id'
+        )
+        pandas.DataFrame.assert_called_once_with(AbstractRepository.to_arrays.return_value)
+        assert df == pandas.DataFrame.return_value
+
+    def test_to_dataframe_without_pandas(self, mocker):
+        mocker.patch.dict(sys.modules, {'pandas': None})
+
+        with pytest.raises(TypeError):
+            AbstractRepository.to_dataframe(['id'])
+
     def test_abstract_find(self):
         with pytest.raises(NotImplementedError):
             AbstractRepository.find(1)
@@ -45,4 +45,23 @@ class TestAbstractStore(object):
         store = AbstractStore()
 
         with pytest.raises(NotImplementedError):
-            store.alter('blueprint')
\ No newline at end of file
+            store.alter('blueprint')
+    def test_transaction(self, mocker):
+        mocker.patch.multiple(AbstractStore, __abstractmethods__=set())
+        store = AbstractStore()
+
+        with store.transaction() as transactional:
+            assert transactional is False
+
+    def test_profile(self, mocker):
+        mocker.patch.multiple(AbstractStore, __abstractmethods__=set())
+        store = AbstractStore()
+
+        assert store.profile() is None
+
+    def test_abstract_analyze(self, mocker):
+        mocker.patch.multiple(AbstractStore, __abstractmethods__=set())
+        store = AbstractStore()
+
+        with pytest.raises(NotImplementedError):
+            store.analyze()
@@ -47,3 +47,9 @@ class TestRepositoryLoader(object):
             loader.get('foobar')
         assert pytest_wrapped_e.type == SystemExit
         assert pytest_wrapped_e.value.code == 1
+
+    def test_all_repos(self):
+        loader = RepositoryLoader('App', 'Implementation', 'Store')
+        loader._repos = {'foo': 'FooRepository', 'bar': 'BarRepository'}
+
+        assert loader.all() == ['BarRepository', 'FooRepository']
@@ -4,10 +4,9 @@ from sqlalchemy.exc import InvalidRequestError
 
 def test_dashboard(app, client, mocker):
     # Mocks
-    rows_mock = mocker.MagicMock()
-    rows_mock.name = 'Foo'
-    rows_mock.config_file = 'foo.json'
-    app.config['container'].repositories['ExperimentRepository'].all.return_value = [rows_mock]
+    app.config['container'].repositories['ExperimentRepository'].get.return_value = [
+        ('Foo', 'foo.json', 1, 1)
+    ]
 
     # Get dashboard
     response = client.get('/')
@@ -28,10 +27,18 @@ def test_dashboard(app, client, mocker):
 
 
 def test_dashboard_error(app, client, mocker):
-    app.config['container'].repositories['ExperimentRepository'].all.side_effect = InvalidRequestError()
+    app.config['container'].repositories['ExperimentRepository'].get.side_effect = InvalidRequestError()
     response = client.get('/')
 
     # Error
     assert 'href="/experiments/run/' not in response.data.decode('utf-8', errors='ignore')
     assert 'There seems to be an error with your database.' in response.data.decode('utf-8', errors='ignore')
     assert 'Please try to refresh your migrations and restart the webgui to resolve this problem.' in response.data.decode('utf-8', errors='ignore')
+
+
+def test_session_is_removed_after_request(app, client, mocker):
+    store = app.config['container'].store
+    mocker.spy(store, 'remove_session')
+
+    client.get('/')
+    store.remove_session.assert_called_once_with()
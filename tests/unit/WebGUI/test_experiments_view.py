@@ -10,6 +10,7 @@ class TestExperimentsView(object):
         assert 'Run Experiment' in response.data.decode('utf-8', errors='ignore')
         assert 'name="iterations"' in response.data.decode('utf-8', errors='ignore')
         assert 'name="config"' in response.data.decode('utf-8', errors='ignore')
+        assert 'name="sql"' in response.data.decode('utf-8', errors='ignore')
 
     def test_run_experiment_show_results(self, client, app, mocker):
         exp_mock = mocker.patch('experimentum.Experiments.Experiment')
@@ -24,6 +25,16 @@ class TestExperimentsView(object):
         assert 'Generating Plots' in response.data.decode('utf-8', errors='ignore')
         assert "log_stream('/experiments/run/test?config=&iterations=1', '/plots/generate_ajax/test');" in response.data.decode('utf-8', errors='ignore')
 
+    def test_run_experiment_show_results_with_queries(self, client, app, mocker):
+        exp_mock = mocker.patch('experimentum.Experiments.Experiment')
+        app.config['container'].make = mocker.MagicMock(return_value=exp_mock)
+        response = client.post(
+            '/experiments/run/test', data={'iterations': 1, 'config': '', 'sql': '1'}
+        )
+
+        assert "log_stream('/experiments/run/test?config=&iterations=1&sql=1'" in \
+            response.data.decode('utf-8', errors='ignore')
+
     def test_run_experiment_event_stream(self, client, app, mocker):
         import datetime
         exp_mock = mocker.patch('experimentum.Experiments.Experiment')
@@ -32,12 +43,14 @@ class TestExperimentsView(object):
         exp_mock.repos['experiment'].config_file = 'foo.json'
         exp_mock.repos['experiment'].config_content = '{"foo": "bar"}'
         exp_mock.performance.formatter.get_table = mocker.MagicMock(return_value='FOO TABLE')
+        exp_mock.performance.queries = None
         app.config['container'].make = mocker.MagicMock(return_value=exp_mock)
         response = client.get('/experiments/run/test?config=bar.json&iterations=2', headers={'accept': 'text/event-stream'})
 
         assert response.content_type == 'text/event-stream'
         assert exp_mock.config_file == 'bar.json'
         assert exp_mock.show_progress is True
+        assert exp_mock.profile_queries is False
         assert 'data: {"type": "started"}' in response.data.decode('utf-8', errors='ignore')
         assert '"table": "FOO TABLE"' in response.data.decode('utf-8', errors='ignore')
         assert '"type": "table"' in response.data.decode('utf-8', errors='ignore')
@@ -47,6 +60,24 @@ class TestExperimentsView(object):
         assert '"config_file": "foo.json"' in response.data.decode('utf-8', errors='ignore')
         assert '"config_content": "{\\"foo\\": \\"bar\\"}' in response.data.decode('utf-8', errors='ignore')
 
+    def test_run_experiment_event_stream_queries(self, client, app, mocker):
+        import datetime
+        exp_mock = mocker.patch('experimentum.Experiments.Experiment')
+        exp_mock.repos['experiment'].start = datetime.datetime(1970, 1, 1)
+        exp_mock.repos['experiment'].finished = datetime.datetime(1970, 1, 1)
+        exp_mock.repos['experiment'].config_file = 'foo.json'
+        exp_mock.repos['experiment'].config_content = '{"foo": "bar"}'
+        exp_mock.performance.formatter.get_table = mocker.MagicMock(return_value='FOO TABLE')
+        exp_mock.performance.formatter.get_query_table = mocker.MagicMock(return_value='SQL TABLE')
+        app.config['container'].make = mocker.MagicMock(return_value=exp_mock)
+        response = client.get('/experiments/run/test?sql=1', headers={'accept': 'text/event-stream'})
+
+        assert exp_mock.profile_queries is True
+        assert '"table": "FOO TABLESQL TABLE"' in response.data.decode('utf-8', errors='ignore')
+        exp_mock.performance.formatter.get_query_table.assert_called_once_with(
+            exp_mock.performance.queries.export.return_value, 'html'
+        )
+
     def test_run_experiment_event_stream_content(self, client, app, mocker):
         import datetime
         import sys
@@ -64,6 +95,7 @@ class TestExperimentsView(object):
         exp_mock.repos['experiment'].config_file = 'foo.json'
         exp_mock.repos['experiment'].config_content = '{"foo": "bar"}'
         exp_mock.performance.formatter.get_table = mocker.MagicMock(return_value='FOO TABLE')
+        exp_mock.performance.queries = None
         app.config['container'].make = mocker.MagicMock(return_value=exp_mock)
         response = client.get('/experiments/run/test', headers={'accept': 'text/event-stream'})
 
@@ -0,0 +1,28 @@
+from experimentum.utils import find_files, get_basenames
+import experimentum.utils
+import os
+
+
+class TestUtils(object):
+    def test_find_files(self, tmpdir):
+        tmpdir.join('FooExperiment.py').write('#Foo')
+        tmpdir.join('_hidden.py').write('#Hidden')
+
+        files = find_files(tmpdir.strpath, '.')
+        assert [os.path.basename(f) for f in files] == ['FooExperiment.py']
+        assert find_files(tmpdir.strpath, '.', 'foo', 'experiment.py') == files
+        assert find_files(tmpdir.strpath, 'missing') == []
+
+    def test_listing_is_cached_until_folder_changes(self, tmpdir, mocker):
+        tmpdir.join('FooExperiment.py').write('#Foo')
+        glob = mocker.spy(experimentum.utils.glob, 'glob')
+
+        assert get_basenames(tmpdir.strpath, '.', 'experiment.py') == ['Foo']
+        assert get_basenames(tmpdir.strpath, '.', 'experiment.py') == ['Foo']
+        assert glob.call_count == 1
+
+        # Adding a file modifies the folder
+        tmpdir.join('BarExperiment.py').write('#Bar')
+        os.utime(tmpdir.strpath, (0, 0))
+        assert sorted(get_basenames(tmpdir.strpath, '.', 'experiment.py')) == ['Bar', 'Foo']
+        assert glob.call_count == 2